@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Time Caputo derivatives of a family of functions f(t; theta).
+
+One batched call, which evaluates f(nodes, theta) once and reduces the
+weights with a single matrix-vector product, is compared with one call
+of ``caputo`` per parameter.
+
+    PYTHONPATH=. python benchmarks/bench_batch.py
+'''
+import time
+import numpy as np
+from pyfod.fod import caputo
+
+
+def fbatch(t, theta):
+    return np.exp(np.outer(theta, t))
+
+
+def loop(theta):
+    return np.array([caputo(lambda t: np.exp(c*t), 0.0, 1.0,
+                            alpha=0.5)['fd'] for c in theta])
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # compile kernels before timing
+    caputo(fbatch, 0.0, 1.0, alpha=0.5, theta=np.ones(2))
+    loop(np.ones(2))
+    print('{:>10s}  {:>12s}  {:>12s}'.format('theta', 'batched', 'loop'))
+    for n in (10, 100, 1000, 10000):
+        theta = np.linspace(0.5, 2.0, n)
+        batched = timed(caputo, fbatch, 0.0, 1.0, alpha=0.5, theta=theta)
+        single = timed(loop, theta)
+        print('{:>10d}  {:>10.4f} s  {:>10.4f} s'.format(n, batched, single))
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Time and compare plain and compensated reductions of large Riemann-Sum
+rules.
+
+The Riemann-Liouville derivative is a difference of two integrals
+divided by dt, so summation error in either integral is amplified by
+1/dt.  The compensated reduction removes it at a small fraction of the
+cost of extended precision.
+
+    PYTHONPATH=. python benchmarks/bench_compensated.py
+'''
+import time
+import numpy as np
+from pyfod.fod import riemannliouville
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+def timed(**kwargs):
+    start = time.perf_counter()
+    fd = riemannliouville(f, 0.0, 1.0, alpha=0.5, quadrature='rs',
+                          **kwargs)['fd']
+    return fd, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # compile kernels before timing
+    timed(n=10, compensated=True)
+    print('{:>10s}  {:>12s}  {:>12s}  {:>12s}'.format(
+        'nodes', 'plain', 'compensated', 'difference'))
+    for n in (10**3, 10**4, 10**5, 10**6):
+        plain, tp = timed(n=n, dt=1e-6)
+        comp, tc = timed(n=n, dt=1e-6, compensated=True)
+        print('{:>10d}  {:>10.4f} s  {:>10.4f} s  {:>12.3e}'.format(
+            n, tp, tc, abs(plain - comp)))
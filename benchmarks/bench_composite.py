@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Time the parameter sweeps of the tutorials with hybrid quadratures and
+with their composite rules.
+
+Each sweep computes Riemann-Liouville difference quotients of exp(2t),
+alpha = 0.9 unless swept, with Gauss-Legendre, Riemann-Sum quadrature
+(ndom = 6, percent = 0.95).  The hybrid object is rebuilt per call as in
+the tutorials, remapped with ``rebase``, or replaced by the composite
+rule, which only rescales cached unit weights.
+
+    PYTHONPATH=. python benchmarks/bench_composite.py
+'''
+import time
+import numpy as np
+from pyfod.quadrature import GaussLegendreRiemannSum
+
+
+SETTINGS = dict(ndom=6, percent=0.95, alpha=0.9)
+DT = 1e-4
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+def quotient(quad, upper, **kwargs):
+    i1 = quad.rebase(0.0, upper, **kwargs).integrate(f=f)
+    i2 = quad.rebase(0.0, upper - DT, **kwargs).integrate(f=f)
+    return (i1 - i2)/DT
+
+
+def rebuilt(nrs, upper, **kwargs):
+    settings = dict(SETTINGS, nrs=nrs)
+    settings.update(kwargs)
+    i1 = GaussLegendreRiemannSum(upper=upper, f=f, **settings).integrate()
+    i2 = GaussLegendreRiemannSum(upper=upper - DT, f=f,
+                                 **settings).integrate()
+    return (i1 - i2)/DT
+
+
+def switched(quad, ts):
+    # hybrids keep a user-defined switch time in ts
+    quad.ts = ts
+    return quotient(quad, 1.0)
+
+
+def sweeps(nrs):
+    # (rebuilt, rebase, composite) for each sweep
+    quad = GaussLegendreRiemannSum(nrs=nrs, **SETTINGS)
+    comp = quad.composite()
+    uppers = np.linspace(0.1, 1.0, 200)
+    alphas = np.linspace(0.05, 0.95, 50)
+    switches = np.linspace(0.5, 0.99, 50)
+    return dict(
+        time=(lambda: [rebuilt(nrs, t) for t in uppers],
+              lambda: [quotient(quad, t) for t in uppers],
+              lambda: [quotient(comp, t) for t in uppers]),
+        alpha=(lambda: [rebuilt(nrs, 1.0, alpha=a) for a in alphas],
+               lambda: [quotient(quad, 1.0, alpha=a) for a in alphas],
+               lambda: [quotient(comp, 1.0, alpha=a) for a in alphas]),
+        switch=(lambda: [rebuilt(nrs, 1.0, ts=ts) for ts in switches],
+                lambda: [switched(quad, ts) for ts in switches],
+                lambda: [quotient(comp, 1.0, switch_time=ts)
+                         for ts in switches]))
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # compile kernels before timing
+    GaussLegendreRiemannSum(nrs=8).composite().integrate(f=f)
+    print('{:>6s}  {:>7s}  {:>12s}  {:>12s}  {:>12s}'.format(
+        'nrs', 'sweep', 'rebuilt', 'rebase', 'composite'))
+    for nrs in (2**3, 2**6, 2**9, 2**12):
+        for name, funcs in sweeps(nrs).items():
+            print('{:>6d}  {:>7s}  {:>10.4f} s  {:>10.4f} s  '
+                  '{:>10.4f} s'.format(nrs, name,
+                                       *[timed(func) for func in funcs]))
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Compare direct and FFT-blocked history sums of the fractional ODE solver.
+
+A block size larger than the number of steps sums every history directly,
+which costs O(N^2) over a trajectory.
+
+    PYTHONPATH=. python benchmarks/bench_fde.py
+'''
+import time
+from pyfod.fde import solve_fde
+
+
+def g(t, y):
+    return -y
+
+
+def bench(n, block):
+    start = time.perf_counter()
+    solve_fde(g, 1.0, 0.0, 1.0, n=n, alpha=0.5, block=block)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    # exclude one-time setup from the first measurement
+    bench(100, block=32)
+    print('{:>8s} {:>12s} {:>12s}'.format('n', 'direct [s]', 'fft [s]'))
+    for n in (1000, 4000, 16000, 64000):
+        print('{:8d} {:12.3f} {:12.3f}'.format(
+            n, bench(n, block=n + 1), bench(n, block=32)))
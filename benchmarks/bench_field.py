@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Time the Caputo derivative of a space-time field u(x, t) at every point
+of a spatial mesh.
+
+The field is evaluated for chunks of mesh points at once and reduced
+along the time axis with one matrix-vector product per chunk.  A loop
+with one ``caputo`` call per mesh point is timed on the first thousand
+points and extrapolated.
+
+    PYTHONPATH=. python benchmarks/bench_field.py
+'''
+import time
+import numpy as np
+from pyfod.fod import caputo
+
+
+def field(t, x):
+    # u(x, t) = sin(x) exp(-x t), shape (n_space, n_nodes)
+    return np.sin(x)[:, None]*np.exp(-np.outer(x, t))
+
+
+def loop(x):
+    return np.array([caputo(lambda t: field(t, np.array([c]))[0], 0.0, 1.0,
+                            alpha=0.5)['fd'] for c in x])
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    caputo(field, 0.0, 1.0, alpha=0.5, theta=np.ones(2))
+    print('{:>10s}  {:>12s}  {:>12s}  {:>12s}'.format(
+        'points', 'chunk', 'field', 'loop'))
+    for n in (10**4, 10**5, 10**6):
+        x = np.linspace(0.0, 1.0, n)
+        loop_time = timed(loop, x[:1000])*n/1000
+        for chunk_size in (10**4, 10**5):
+            field_time = timed(caputo, field, 0.0, 1.0, alpha=0.5, theta=x,
+                               chunk_size=chunk_size)
+            print('{:>10d}  {:>12d}  {:>10.4f} s  {:>10.2f} s'.format(
+                n, chunk_size, field_time, loop_time))
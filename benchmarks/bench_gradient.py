@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Time the gradient of a Caputo derivative with respect to alpha and p
+model parameters.
+
+One call with ``jacobian``, which reduces the weights and their
+derivative against f and its Jacobian in one matrix product, is compared
+with central differences over whole ``caputo`` calls.
+
+    PYTHONPATH=. python benchmarks/bench_gradient.py
+'''
+import time
+import numpy as np
+from pyfod.fod import caputo
+
+
+def model(p):
+    # sum of exponentials with rates p
+    def f(t):
+        return np.exp(np.outer(t, p)).sum(axis=1)
+
+    def jacobian(t):
+        return t[:, None]*np.exp(np.outer(t, p))
+    return f, jacobian
+
+
+def central(p, alpha, h=1e-6, **kwargs):
+    def fd(p, alpha):
+        return caputo(model(p)[0], 0.0, 1.0, alpha=alpha, **kwargs)['fd']
+    grad = [(fd(p, alpha + h) - fd(p, alpha - h))/(2*h)]
+    for k in range(p.size):
+        step = np.zeros(p.size)
+        step[k] = h
+        grad.append((fd(p + step, alpha) - fd(p - step, alpha))/(2*h))
+    return np.array(grad)
+
+
+def analytic(p, alpha, **kwargs):
+    f, jacobian = model(p)
+    return caputo(f, 0.0, 1.0, alpha=alpha, jacobian=jacobian, **kwargs)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    for _ in range(20):
+        func(*args, **kwargs)
+    return (time.perf_counter() - start)/20
+
+
+if __name__ == '__main__':
+    analytic(np.ones(2), 0.5)
+    print('{:>10s}  {:>12s}  {:>12s}'.format(
+        'params', 'jacobian', 'central'))
+    for n in (1, 4, 16, 64):
+        p = np.linspace(0.5, 2.0, n)
+        print('{:>10d}  {:>10.5f} s  {:>10.5f} s'.format(
+            n, timed(analytic, p, 0.5, nrs=1000),
+            timed(central, p, 0.5, nrs=1000)))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Number of Riemann-Sum grid points needed to reach a target accuracy on
+uniform and graded grids.
+
+The test integral is the Riemann-Liouville derivative of exp(2t) at
+t = 1, with the reference computed from a fine graded grid.
+
+    PYTHONPATH=. python benchmarks/bench_grid.py
+'''
+import numpy as np
+from pyfod.fod import riemannliouville
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+def fd(n, alpha, grading):
+    return riemannliouville(f, 0.0, 1.0, alpha=alpha, quadrature='rs',
+                            n=n, grading=grading, dt=1e-4)['fd']
+
+
+def points_needed(alpha, grading, tol, exact):
+    # smallest power of two reaching tol
+    n = 8
+    while abs(fd(n, alpha, grading) - exact) > tol:
+        n *= 2
+        if n > 2**21:
+            return None
+    return n
+
+
+if __name__ == '__main__':
+    tol = 1e-4
+    print('Grid points for error < {:g}'.format(tol))
+    print('\t{:>6s}  {:>10s}  {:>10s}  {:>10s}'.format(
+        'alpha', 'r = 1', 'r = 2', 'r = 3'))
+    for alpha in (0.1, 0.5, 0.9):
+        exact = fd(2**20, alpha, 3.0)
+        row = [points_needed(alpha, r, tol, exact) for r in (1.0, 2.0, 3.0)]
+        print('\t{:>6.1f}  '.format(alpha) + '  '.join(
+            '{:>10}'.format(str(n)) for n in row))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Measure import time of pyfod modules in a fresh interpreter.
+
+Optional dependencies (sympy, mpmath, scipy) are reported if they were
+loaded by the import or by a float integration.
+
+    PYTHONPATH=. python benchmarks/bench_import.py
+'''
+import subprocess
+import sys
+
+SCRIPT = '''
+import sys
+import time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+{statement}
+loaded = [m for m in ('sympy', 'mpmath', 'scipy') if m in sys.modules]
+print('{{:.1f}} {{}}'.format(elapsed*1e3, ','.join(loaded) or '-'))
+'''
+
+FLOAT_INTEGRAL = str(
+    'import numpy as np\n'
+    'pyfod.fod.riemannliouville(np.exp, 0.0, 1.0, alpha=0.5)')
+
+
+def bench(module, statement='', repeat=5):
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c',
+             SCRIPT.format(module=module, statement=statement)],
+            capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(out[0]))
+    return min(times), out[1]
+
+
+if __name__ == '__main__':
+    print('{:<40s} {:>10s}  {}'.format('import', 'ms', 'loaded'))
+    cases = (('numpy', ''),
+             ('sympy', ''),
+             ('mpmath', ''),
+             ('pyfod', ''),
+             ('pyfod.quadrature', ''),
+             ('pyfod.fod', ''),
+             ('pyfod.fod', FLOAT_INTEGRAL))
+    for module, statement in cases:
+        label = module + (' + float integral' if statement else '')
+        best, loaded = bench(module, statement)
+        print('{:<40s} {:10.1f}  {}'.format(label, best, loaded))
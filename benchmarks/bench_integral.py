@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Time fractional integrals at every point of a uniform grid.
+
+The series mode (one FFT convolution) is compared with one scalar
+Riemann-Sum evaluation per grid point on the same grid, which costs
+O(N^2) in total.
+
+    PYTHONPATH=. python benchmarks/bench_integral.py
+'''
+import time
+import numpy as np
+from pyfod import quadrature as qm
+from pyfod.integral import fractional_integral
+
+
+def loop(t, order):
+    # one scalar integral per output point on the grid up to t[m]
+    out = np.zeros(t.size)
+    for m in range(1, t.size):
+        quad = qm.RiemannSum(n=m + 1, lower=t[0], upper=t[m],
+                             alpha=1 - order)
+        out[m] = quad.integrate(f=np.sin)
+    return out
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    order = 0.5
+    # compile kernels before timing
+    fractional_integral(np.sin, 0.0, 1.0, order, mode='series', steps=8)
+    loop(np.linspace(0.0, 1.0, 3), order)
+    print('{:>10s}  {:>12s}  {:>12s}'.format('points', 'series', 'loop'))
+    for n in (10**3, 10**4, 10**5, 10**6):
+        series = timed(fractional_integral, np.sin, 0.0, 10.0, order,
+                       mode='series', steps=n)
+        scalar = (timed(loop, np.linspace(0.0, 10.0, n + 1), order)
+                  if n <= 10**4 else float('nan'))
+        print('{:>10d}  {:>10.4f} s  {:>10.4f} s'.format(n, series, scalar))
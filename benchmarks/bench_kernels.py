@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Compare the default NumPy kernels with the opt-in numba kernels for
+weight generation and reduction.
+
+The first integral of a fresh interpreter includes imports and, with
+numba, compilation.  Small rules measure per-call latency, large rules
+measure throughput.
+
+    PYTHONPATH=. python benchmarks/bench_kernels.py
+'''
+import subprocess
+import sys
+import timeit
+import numpy as np
+from pyfod import kernels
+from pyfod import quadrature as qm
+
+
+FIRST_CALL = '''
+import time
+import numpy as np
+from pyfod import kernels
+from pyfod.quadrature import RiemannSum
+kernels.use_numba({flag})
+start = time.perf_counter()
+RiemannSum(n=100, alpha=0.5).integrate(f=np.exp)
+print(time.perf_counter() - start)
+'''
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+def first_call(flag):
+    out = subprocess.run([sys.executable, '-c', FIRST_CALL.format(flag=flag)],
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def bench(label, stmt, number):
+    # best of five repeats, reported per call
+    best = min(timeit.repeat(stmt, number=number, repeat=5))/number
+    if number > 1:
+        print('\t{:<40s} {:12.3f} us'.format(label, best*1e6))
+
+
+def run(n, number):
+    gleg = qm.GaussLegendre(ndom=max(n//4, 1), deg=4, alpha=0.5)
+    rs = qm.RiemannSum(n=n + 1, alpha=0.5)
+    # bypass weight cache so every call regenerates the weights
+    gleg._weight_cache.maxsize = 0
+    rs._weight_cache.maxsize = 0
+    alphas = iter(np.tile(np.linspace(0.1, 0.9, 97), 10**6))
+    bench('GaussLegendre.update_weights',
+          lambda: gleg.update_weights(alpha=next(alphas)), number)
+    bench('RiemannSum.update_weights',
+          lambda: rs.update_weights(alpha=next(alphas)), number)
+    feval = f(rs.points)
+    bench('reduction', lambda: qm._reduce(rs.weights, feval), number)
+    bench('RiemannSum.integrate', lambda: rs.integrate(f=f), number)
+
+
+if __name__ == '__main__':
+    for flag in (False, True):
+        active = kernels.use_numba(flag)
+        print('Backend: {}'.format('numba, use_numba()' if active
+                                   else 'numpy, default'))
+        if flag and not active:
+            print('\tnumba is not installed')
+            continue
+        print('\t{:<40s} {:12.3f} us'.format(
+            'first integral', first_call(flag)*1e6))
+        # compile kernels before timing, nothing is reported
+        run(n=16, number=1)
+        for n, number in ((16, 20000), (10**6, 20)):
+            print('  n = {}'.format(n))
+            run(n=n, number=number)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Caputo derivative of exp(2t) at many target times with the spectral
+engine and with the Gauss-Legendre, Riemann-Sum quadrature.
+
+    PYTHONPATH=. python benchmarks/bench_spectral.py
+'''
+import time
+import numpy as np
+from pyfod import spectral
+from pyfod.fod import caputo
+from pyfod.spectral import SpectralDerivative
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+if __name__ == '__main__':
+    alpha = 0.5
+    targets = np.linspace(0.01, 1.0, 1000)
+    ref = SpectralDerivative(degree=48).derivative(
+        f, alpha, targets=targets)['fd']
+    print('{:>24s}  {:>10s}  {:>10s}'.format('method', 'time', 'max error'))
+    for degree in (8, 16, 32):
+        SD = SpectralDerivative(degree=degree)
+        spectral.MATRICES.clear()
+        start = time.perf_counter()
+        fd = SD.derivative(f, alpha, targets=targets)['fd']
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        fd = SD.derivative(f, alpha, targets=targets)['fd']
+        cached = time.perf_counter() - start
+        print('{:>24s}  {:>7.2f} ms  {:>10.2e}'.format(
+            'spectral {} (build)'.format(degree), 1e3*build,
+            np.abs(fd - ref).max()))
+        print('{:>24s}  {:>7.2f} ms'.format(
+            'spectral {} (cached)'.format(degree), 1e3*cached))
+    # compile kernels before timing
+    caputo(f, 0.0, 1.0, alpha=alpha)
+    for nrs in (100, 1000):
+        start = time.perf_counter()
+        fd = np.array([caputo(f, 0.0, t, alpha=alpha, nrs=nrs)['fd']
+                       for t in targets])
+        print('{:>24s}  {:>7.2f} ms  {:>10.2e}'.format(
+            'GLegRS nrs={}'.format(nrs), 1e3*(time.perf_counter() - start),
+            np.abs(fd - ref).max()))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+'''
+Measure per-call validation overhead of small quadrature rules.
+
+Validation runs when a quadrature object is built or a new value is
+supplied.  The overhead column compares each call with the bare
+evaluation and reduction it wraps.
+
+    PYTHONPATH=. python benchmarks/bench_validation.py
+'''
+import timeit
+import numpy as np
+from pyfod import quadrature as qm
+from pyfod import utilities as ut
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+def bench(stmt, number=100000):
+    # best of seven repeats, reported per call in ns
+    return min(timeit.repeat(stmt, number=number, repeat=7))/number*1e9
+
+
+if __name__ == '__main__':
+    print('Checks')
+    for label, stmt in (
+            ('check_value', lambda: ut.check_value(0.5, None)),
+            ('check_alpha', lambda: ut.check_alpha(0.5))):
+        print('\t{:<36s} {:10.1f} ns'.format(label, bench(stmt)))
+    for quad in (qm.GaussLegendre(ndom=1, deg=4, alpha=0.5, f=f),
+                 qm.RiemannSum(n=9, alpha=0.5, f=f)):
+        print(type(quad).__name__)
+        bare = bench(lambda: qm._reduce(quad.weights,
+                                        qm._evaluate(f, quad.points)))
+        print('\t{:<36s} {:10.1f} ns'.format('evaluate + reduce', bare))
+        for label, stmt in (
+                ('integrate()', lambda: quad.integrate()),
+                ('integrate(f)', lambda: quad.integrate(f))):
+            t = bench(stmt)
+            print('\t{:<36s} {:10.1f} ns  overhead {:7.1f} ns'.format(
+                label, t, t - bare))
+        print('\t{:<36s} {:10.1f} ns'.format(
+            'update_weights() (cached)', bench(quad.update_weights)))
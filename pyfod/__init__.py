@@ -1 +1,13 @@
 __version__ = "0.1.1"
+
+
+def __getattr__(name):
+    # solvers are imported on first access to keep ``import pyfod`` light
+    if name == 'solve_fde':
+        from pyfod.fde import solve_fde
+        return solve_fde
+    if name == 'fractional_integral':
+        from pyfod.integral import fractional_integral
+        return fractional_integral
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+'''
+This module evaluates fractional derivatives of integrands that are
+coroutines, e.g., calls into a remote or latency-bound simulation
+service.
+
+An integrand is written as :code:`async def f(points)` and receives a
+chunk of quadrature nodes at a time.  The nodes of a quadrature object
+are split into chunks that are awaited concurrently, with at most
+**concurrency** calls in flight, and the weighted sum of each chunk is
+taken as soon as its values arrive.  The partial sums are added in
+chunk order, so the result does not depend on the order in which calls
+complete and repeated runs agree to the last bit.  For
+:func:`~riemannliouville` both integrals share the same limit on
+concurrent calls.
+
+Only float precision is supported.  Vector-valued integrands returning
+arrays of shape (n, k) for n nodes are supported as in :mod:`~.fod`.
+
+Functions:
+    * :func:`~integrate`
+    * :func:`~riemannliouville`
+    * :func:`~caputo`
+'''
+import asyncio
+import numpy as np
+from pyfod import fod
+from pyfod import quadrature as qm
+from pyfod.utilities import ValidationError
+from pyfod.utilities import check_input
+from pyfod.utilities import check_node_type
+
+
+async def integrate(quadrature, f, chunk_size=None, concurrency=8):
+    '''
+    Evaluate the integral of an asynchronous integrand.
+
+    Args:
+        * **quadrature**: Quadrature object or :class:`~.QuadratureRule`.
+        * **f** (async def): Integrand, awaited with an array of nodes.
+
+    Kwargs: name (type) - default
+        * **chunk_size** (:py:class:`int`) - `None`: Number of nodes per
+          call of **f**.  If `None`, the nodes are split evenly among
+          **concurrency** calls.
+        * **concurrency** (:py:class:`int`) - `8`: Maximum number of
+          calls of **f** awaited at the same time.
+
+    Returns:
+        * :py:class:`float`, or :class:`~numpy.ndarray` of shape (k,) for
+          vector-valued integrands.
+    '''
+    rule = _rule(quadrature)
+    concurrency = _concurrency(concurrency)
+    chunk_size = _chunk_size(chunk_size, rule, concurrency)
+    return await _integrate(rule, f, chunk_size,
+                            asyncio.Semaphore(concurrency))
+
+
+async def riemannliouville(f, lower, upper, dt=1e-4, alpha=0.0,
+                           quadrature='GLegRS', chunk_size=None,
+                           concurrency=8, **kwargs):
+    '''
+    Riemann-Liouville fractional derivative of an asynchronous integrand.
+
+    See :func:`~.fod.riemannliouville` for the definition.  The
+    integrals :math:`F(t - k\\Delta t)`, :math:`k = 0,...,n`, are evaluated
+    concurrently.
+
+    Args:
+        * **f** (async def): Function handle, awaited with an array of
+          nodes.
+        * **lower** (:py:class:`float`): Lower limit - should be zero.
+        * **upper** (:py:class:`float`): Upper limit, i.e., point at which
+          fractional derivative is being evaluated.
+
+    Kwargs: name (type) - default
+        * **dt** (:py:class:`float`) - `1e-4`: Time step, :math:`t_{j+1}-t_j`.
+        * **alpha** (:py:class:`float`) - `0`: Order of fractional derivative.
+        * **quadrature** (:py:class:`str`) - `'glegrs'`: Quadrature method
+          or an existing quadrature object.
+        * **chunk_size** (:py:class:`int`) - `None`: Number of nodes per
+          call of **f**, see :func:`~integrate`.
+        * **concurrency** (:py:class:`int`) - `8`: Maximum number of
+          calls of **f** awaited at the same time.
+        * **kwargs**: Quadrature specific settings.
+
+    Returns: :py:class:`dict`
+        * `fd`: Fractional derivative
+        * `i1`: Value of integral :math:`F(t_{j+1})`.
+        * `i2`: Value of integral :math:`F(t_j)`.
+        * `q1`: Quadrature rule for :math:`F(t_{j+1})`.
+        * `q2`: Quadrature rule for :math:`F(t_{j})`.
+        * `integrals`: Values of :math:`F(t - k\\Delta t)`,
+          :math:`k = 0,...,n`.
+    '''
+    check_input(f, 'f')
+    n, beta = fod._order(alpha)
+    uppers = [upper - k*dt for k in range(n + 1)]
+    if isinstance(quadrature, str):
+        quad = fod._select_quadrature_method(quadrature)
+        rules = [quad(lower=lower, upper=tk, alpha=beta, **kwargs).rule()
+                 for tk in uppers]
+    else:
+        # snapshots keep each limit while the object is remapped
+        rules = [quadrature.rebase(lower=lower, upper=tk, alpha=beta).rule()
+                 for tk in uppers]
+    q1 = rules[0]
+    _check_float(q1)
+    concurrency = _concurrency(concurrency)
+    chunk_size = _chunk_size(chunk_size, q1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    integrals = await asyncio.gather(
+        *[_integrate(rule, f, chunk_size, semaphore) for rule in rules])
+    fd = fod._result(fod._difference(integrals, n)/(
+        dt**n*fod._gamma(1 - beta, q1)), q1)
+    # assemble output
+    return dict(fd=fd, i1=integrals[0], i2=integrals[1], q1=q1, q2=rules[1],
+                integrals=integrals)
+
+
+async def caputo(f, lower, upper, dt=1e-4, alpha=0.0, df=None,
+                 quadrature='GLegRS', derivative=None, chunk_size=None,
+                 concurrency=8, **kwargs):
+    '''
+    Caputo fractional derivative of an asynchronous integrand.
+
+    See :func:`~.fod.caputo` for the definition.  By default the backward
+    finite difference awaits :math:`f(s - k\\Delta t)`, :math:`k = 0,...,n`,
+    in a single call per chunk.
+
+    Args:
+        * **f** (async def): Function handle, awaited with an array of
+          nodes.
+        * **lower** (:py:class:`float`): Lower limit - should be zero.
+        * **upper** (:py:class:`float`): Upper limit, i.e., point at which
+          fractional derivative is being evaluated.
+
+    Kwargs: name (type) - default
+        * **dt** (:py:class:`float`) - `1e-4`: Time step, :math:`t_{j+1}-t_j`.
+        * **alpha** (:py:class:`float`) - `0`: Order of fractional derivative.
+        * **df** (async def) - `None`: n-th derivative, awaited with an
+          array of nodes.  The m-th derivative for integer orders
+          :math:`\\alpha = m \\ge 1`, see :func:`~.fod.caputo`.
+        * **quadrature** (:py:class:`str`) - `'glegrs'`: Quadrature method
+          or an existing quadrature object.
+        * **derivative** (:py:class:`str`) - `None`: Source of
+          :math:`f(s)^{(1)}`; `'fd'` (finite difference) or `'parts'`
+          (integration by parts).  Ignored if **df** is provided.
+        * **chunk_size** (:py:class:`int`) - `None`: Number of nodes per
+          call of **f**, see :func:`~integrate`.
+        * **concurrency** (:py:class:`int`) - `8`: Maximum number of
+          calls of **f** awaited at the same time.
+        * **kwargs**: Quadrature specific settings.
+
+    Returns: :py:class:`dict`
+        * `fd`: Fractional derivative.
+        * `i1`: Value of integral.  For `derivative='parts'` this is the
+          integral of the difference quotient.
+        * `q1`: Quadrature rule.
+    '''
+    check_input(f, 'f')
+    n, beta = fod._order(alpha)
+    if isinstance(quadrature, str):
+        quad = fod._select_quadrature_method(quadrature)
+        q1 = quad(lower=lower, upper=upper, alpha=beta, **kwargs).rule()
+    else:
+        q1 = quadrature.rebase(lower=lower, upper=upper, alpha=beta).rule()
+    _check_float(q1)
+    concurrency = _concurrency(concurrency)
+    chunk_size = _chunk_size(chunk_size, q1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    if df is None and derivative == 'parts':
+        fod._check_parts(n)
+        async with semaphore:
+            fa, ft = qm._columns(await f(np.array([lower, upper])), 2)
+
+        async def quotient(s):
+            fs = qm._columns(await f(s), s.size)
+            if fs.ndim > 1:
+                # one column per channel
+                s = s.reshape(-1, 1)
+            return (ft - fs)/(upper - s)
+        integral = await _integrate(q1, quotient, chunk_size, semaphore)
+        total = (ft - fa)*(upper - lower)**(-alpha) + alpha*integral
+    elif fod._integer_order(alpha) and (df is not None
+                                        or derivative in (None, 'fd')):
+        # classical derivative at upper, the kernel is not integrable
+        m = fod._integer_order(alpha)
+        async with semaphore:
+            if df is not None:
+                integral = qm._columns(await df(np.array([upper])), 1)[0]
+            else:
+                feval = qm._columns(await f(upper - dt*np.arange(m + 1)),
+                                    m + 1)
+                integral = fod._difference(list(feval), m)/dt**m
+        total = integral
+    elif df is None and derivative in (None, 'fd'):
+        async def difference(s):
+            # evaluate f at every point of the stencil in a single call
+            feval = qm._columns(await f(np.concatenate(
+                [s - k*dt for k in range(n + 1)])), (n + 1)*s.size)
+            return fod._difference(
+                [feval[k*s.size:(k + 1)*s.size] for k in range(n + 1)],
+                n)/dt**n
+        integral = await _integrate(q1, difference, chunk_size, semaphore)
+        total = integral
+    elif df is not None:
+        integral = await _integrate(q1, df, chunk_size, semaphore)
+        total = integral
+    else:
+        raise ValidationError(str('Invalid derivative source: {}. '
+                                  'Please specify fd or parts.'.format(
+                                      derivative)))
+
+    fd = fod._result(total/fod._gamma(1 - beta, q1), q1)
+    # assemble output
+    return dict(fd=fd, i1=integral, q1=q1)
+
+
+async def _integrate(rule, f, chunk_size, semaphore):
+    '''
+    Weighted chunks of **rule**, reduced as their values arrive and
+    summed in chunk order.
+    '''
+    n = rule.points.size
+
+    async def partial(start):
+        stop = min(start + chunk_size, n)
+        async with semaphore:
+            feval = await f(rule.points[start:stop])
+        return qm._reduce(rule.weights[start:stop],
+                          qm._columns(feval, stop - start))
+
+    # gather keeps submission order, floating point sums depend on it
+    partials = await asyncio.gather(
+        *[partial(start) for start in range(0, n, chunk_size)])
+    total = 0.0
+    for value in partials:
+        total = total + value
+    return total
+
+
+def _rule(quadrature):
+    # snapshot of nodes and weights in float precision
+    if isinstance(quadrature, qm.QuadratureRule):
+        rule = quadrature
+    else:
+        rule = quadrature.rule()
+    _check_float(rule)
+    return rule
+
+
+def _check_float(rule):
+    if rule.precision != 'float':
+        raise ValidationError(str(
+            'Asynchronous integrands require float precision, '
+            'precision = {}'.format(rule.precision)))
+
+
+def _chunk_size(chunk_size, rule, concurrency):
+    # nodes are split evenly among concurrent calls by default
+    if chunk_size is None:
+        return max(-(-rule.points.size//concurrency), 1)
+    return max(check_node_type(chunk_size), 1)
+
+
+def _concurrency(concurrency):
+    concurrency = check_node_type(concurrency)
+    if concurrency < 1:
+        raise ValidationError(str('Invalid value! concurrency must be at '
+                                  'least 1. concurrency = {}'.format(
+                                      concurrency)))
+    return concurrency
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+'''
+This module memoizes expensive integrands across calls.
+
+Sweeps over :code:`upper` or :code:`alpha` often evaluate the integrand
+on node sets that coincide or overlap with those of earlier calls, e.g.,
+Riemann-Sum grids at a fixed spacing.  Wrapping the integrand in an
+:class:`~EvaluationCache` is opt-in; the wrapper is passed wherever a
+function handle is expected,
+
+.. code-block:: python
+
+    f = EvaluationCache(expensive_model, maxsize=10**5)
+    for upper in np.arange(0.1, 1.0, 0.1):
+        riemannliouville(f, 0.0, upper, alpha=0.5, quadrature='rs',
+                         n=1000)
+    print(f.info())
+
+Values are stored per node in a bounded LRU cache.  Nodes are matched
+exactly, or on a grid of spacing **resolution**, in which case a stored
+value is reused for any node within half a spacing of the node it was
+evaluated at.  On each call only the missing nodes are passed to the
+integrand, in one vectorized batch.
+
+Classes:
+    * :class:`~EvaluationCache`
+'''
+import numpy as np
+from pyfod import quadrature as qm
+from pyfod.utilities import LRUCache
+from pyfod.utilities import ValidationError
+from pyfod.utilities import check_input
+
+
+class EvaluationCache(object):
+    '''
+    Memoizing wrapper of a vectorized integrand.
+
+    Args:
+        * **f** (def): Function handle, evaluated on arrays of nodes.
+
+    Kwargs: name (type) - default
+        * **maxsize** (:py:class:`int`) - `100000`: Maximum number of
+          stored nodes.
+        * **resolution** (:py:class:`float`) - `None`: Spacing on which
+          nodes are quantized.  If `None`, nodes are matched exactly.
+
+    Extended precision (:code:`mpf`) nodes are passed to **f** without
+    caching.
+    '''
+    def __init__(self, f, maxsize=100000, resolution=None):
+        check_input(f, 'f')
+        if resolution is not None and not resolution > 0:
+            raise ValidationError(str('Invalid value! resolution must be '
+                                      'positive. resolution = {}'.format(
+                                          resolution)))
+        self.f = f
+        self.resolution = resolution
+        self.store = LRUCache(maxsize=maxsize)
+
+    def __call__(self, points):
+        points = np.asarray(points)
+        if points.dtype == object:
+            return qm._numeric(self.f)(points)
+        flat = points.astype(float).ravel()
+        keys = self._keys(flat)
+        get = self.store.get
+        values = [get(key) for key in keys]
+        missing = [ii for ii, value in enumerate(values) if value is None]
+        if missing:
+            self._fill(flat, keys, values, missing)
+        values = np.array(values)
+        if points.ndim == 0:
+            return values[0]
+        return values.reshape(points.shape + values.shape[1:])
+
+    @property
+    def hit_rate(self):
+        '''
+        Fraction of node lookups served from the cache.
+        '''
+        total = self.store.hits + self.store.misses
+        return self.store.hits/total if total else 0.0
+
+    def info(self):
+        '''
+        Cache statistics.
+
+        Returns: :py:class:`dict`
+            * `hits`: Nodes served from the cache.
+            * `misses`: Nodes passed to the integrand.
+            * `hit_rate`: :code:`hits/(hits + misses)`.
+            * `size`: Number of stored nodes.
+            * `maxsize`: Maximum number of stored nodes.
+        '''
+        return dict(hits=self.store.hits, misses=self.store.misses,
+                    hit_rate=self.hit_rate, size=len(self.store),
+                    maxsize=self.store.maxsize)
+
+    def clear(self):
+        '''
+        Remove all stored values and reset statistics.
+        '''
+        self.store.clear()
+
+    def _keys(self, flat):
+        if self.resolution is None:
+            return flat.tolist()
+        return np.rint(flat/self.resolution).astype(np.int64).tolist()
+
+    def _fill(self, flat, keys, values, missing):
+        # evaluate each missing key once, in a single call
+        first = dict()
+        for ii in missing:
+            first.setdefault(keys[ii], ii)
+        index = np.fromiter(first.values(), dtype=int, count=len(first))
+        feval = qm._columns(qm._numeric(self.f)(flat[index]), index.size)
+        put = self.store.put
+        for key, value in zip(first, feval):
+            put(key, value)
+            first[key] = value
+        for ii in missing:
+            values[ii] = first[keys[ii]]
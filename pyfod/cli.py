@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+'''
+This module provides the `pyfod` console script, which evaluates batches
+of fractional derivatives described in a task file.
+
+.. code-block:: bash
+
+    pyfod tasks.json -o results.npz --workers 4
+
+Each task evaluates one definition of :mod:`~.fod` for every order in
+**alpha** and every time in **time**.  Tasks are read from a JSON file,
+a list of objects or an object with a `tasks` list, or from a CSV file
+with one task per row.  The following fields are recognized:
+
+    * `name`: Task name, used to label the results.  Defaults to
+      `task<k>`.
+    * `method`: `'riemannliouville'`, `'caputo'` or `'grunwaldletnikov'`.
+    * `function`: Expression in `t`, parsed with sympy, or
+    * `data`: Path to sampled data, two columns (t, f) in a `.csv`,
+      `.txt` or `.npy` file, or arrays `t` and `f` in a `.npz` file.
+      Relative paths are relative to the task file.  The samples are
+      interpolated linearly.
+    * `alpha`: Order or list of orders.
+    * `time`: Time or list of times, or `{"start", "stop", "num"}`.
+    * `lower`: Lower limit, `0.0` by default.
+    * `quadrature`: Quadrature method, `'GLegRS'` by default.
+    * `settings`: Quadrature settings, e.g., `{"nrs": 1000}`.
+
+Any other field, e.g., `dt` or `derivative`, is passed to the
+definition.  In CSV files `alpha` and `time` are separated by
+semicolons or spaces, `time` may be given as `start:stop:num`, and
+`settings` holds a JSON object.
+
+Tasks with identical quadrature settings form a group and share one
+quadrature object, which is remapped with :code:`rebase` for every order
+and time.  Groups are distributed over a pool of worker processes and
+their results are streamed to the output file as they complete.  NPZ
+output holds the arrays `<name>_fd` of shape (alpha, time),
+`<name>_alpha` and `<name>_time`.  CSV output has one row per
+derivative.  The output file is only created once a task has
+completed.  A task that fails, e.g., because of an invalid setting, is
+reported and skipped, and the console script then exits with status 1.
+Progress and a timing summary are written to standard error.
+
+.. note::
+    Expressions are parsed with :code:`sympy.sympify`, which evaluates
+    Python code.  Task files must come from a trusted source.
+
+Functions:
+    * :func:`~load_tasks`
+    * :func:`~group_tasks`
+    * :func:`~run`
+    * :func:`~main`
+'''
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import sys
+import time
+import zipfile
+import numpy as np
+from pyfod import __version__
+from pyfod import fod
+from pyfod.utilities import ValidationError
+
+
+# Definitions available to tasks
+METHODS = dict(riemannliouville=fod.riemannliouville, caputo=fod.caputo,
+               grunwaldletnikov=fod.grunwaldletnikov)
+# Task fields that are not passed to the definition
+FIELDS = ('name', 'method', 'function', 'data', 'alpha', 'time', 'lower',
+          'quadrature', 'settings')
+# Errors of a single task, reported without stopping the batch
+TASK_ERRORS = (ArithmeticError, LookupError, OSError, TypeError, ValueError)
+
+
+def load_tasks(file):
+    '''
+    Read tasks from a JSON or CSV file.
+
+    Args:
+        * **file** (:py:class:`str`): Path to a `.json` or `.csv` file.
+
+    Returns:
+        * :py:class:`list` of :py:class:`dict`, validated tasks with
+          arrays for `alpha` and `time`.
+    '''
+    root = os.path.dirname(os.path.abspath(file))
+    if file.lower().endswith('.csv'):
+        with open(file, newline='') as stream:
+            rows = [_parse_row(row) for row in csv.DictReader(stream)]
+    else:
+        with open(file) as stream:
+            rows = json.load(stream)
+        if isinstance(rows, dict):
+            rows = rows.get('tasks', [])
+    return [_check_task(row, k, root) for k, row in enumerate(rows)]
+
+
+def run(tasks, output, workers=1, progress=sys.stderr):
+    '''
+    Evaluate tasks and stream the results to a file.
+
+    Args:
+        * **tasks** (:py:class:`list`): Tasks from :func:`load_tasks`.
+        * **output** (:py:class:`str`): Path of the `.npz` or `.csv`
+          result file.
+
+    Kwargs: name (type) - default
+        * **workers** (:py:class:`int`) - `1`: Number of worker
+          processes.  Groups are evaluated in this process for `1`.
+        * **progress** (file) - `sys.stderr`: Stream for progress and
+          timing summary, or `None`.
+
+    Returns: :py:class:`dict`
+        * `tasks`: Number of tasks.
+        * `groups`: Number of quadrature groups.
+        * `derivatives`: Number of derivatives evaluated.
+        * `failed`: Names of the tasks that raised an error.
+        * `wall`: Elapsed time in seconds.
+        * `busy`: Time spent evaluating tasks, summed over workers.
+    '''
+    if workers < 1:
+        raise ValidationError(str('Invalid number of workers! Expect '
+                                  'workers >= 1. workers = {}'.format(
+                                      workers)))
+    groups = group_tasks(tasks)
+    start = time.perf_counter()
+    summary = dict(tasks=len(tasks), groups=len(groups), derivatives=0,
+                   failed=[], wall=0.0, busy=0.0)
+    done = 0
+    with _ResultWriter(output) as write:
+        for results in _evaluate(groups, workers):
+            for result in results:
+                done += 1
+                if 'error' in result:
+                    summary['failed'].append(result['name'])
+                    _report(progress, '[{}/{}] {}: failed: {}'.format(
+                        done, len(tasks), result['name'], result['error']))
+                    continue
+                write(result)
+                summary['derivatives'] += result['fd'].size
+                summary['busy'] += result['elapsed']
+                _report(progress, '[{}/{}] {}: {} derivatives in {:.3f} s'
+                        .format(done, len(tasks), result['name'],
+                                result['fd'].size, result['elapsed']))
+    summary['wall'] = time.perf_counter() - start
+    _report(progress, str('{tasks} tasks in {groups} quadrature groups, '
+                          '{derivatives} derivatives, {wall:.3f} s wall, '
+                          '{busy:.3f} s in tasks'.format(**summary)))
+    if summary['failed']:
+        _report(progress, '{} tasks failed: {}'.format(
+            len(summary['failed']), ', '.join(summary['failed'])))
+    return summary
+
+
+def group_tasks(tasks):
+    '''
+    Group tasks by quadrature configuration.
+
+    Args:
+        * **tasks** (:py:class:`list`): Tasks from :func:`load_tasks`.
+
+    Returns:
+        * :py:class:`list` of task lists, in order of first appearance.
+    '''
+    groups = dict()
+    for task in tasks:
+        groups.setdefault(_group_key(task), []).append(task)
+    return list(groups.values())
+
+
+def main(argv=None):
+    '''
+    Entry point of the `pyfod` console script.
+
+    Args:
+        * **argv** (:py:class:`list`) - `None`: Command line arguments,
+          :code:`sys.argv[1:]` by default.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='pyfod', description=str('Evaluate batches of fractional '
+                                      'derivatives from a task file.'))
+    parser.add_argument('tasks', help='JSON or CSV task file')
+    parser.add_argument('-o', '--output', default='results.npz',
+                        help='NPZ or CSV result file (default: %(default)s)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='worker processes (default: %(default)s)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='no progress or timing summary')
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s {}'.format(__version__))
+    args = parser.parse_args(argv)
+    try:
+        tasks = load_tasks(args.tasks)
+        summary = run(tasks, args.output, workers=args.workers,
+                      progress=None if args.quiet else sys.stderr)
+    except (OSError, ValueError) as error:
+        parser.exit(1, 'pyfod: error: {}\n'.format(error))
+    if summary['failed']:
+        parser.exit(1, 'pyfod: error: tasks failed: {}\n'.format(
+            ', '.join(summary['failed'])))
+    return 0
+
+
+def _parse_row(row):
+    # CSV cells are strings, lists are separated by semicolons or spaces
+    task = dict()
+    for key, value in row.items():
+        if key is None or value is None or value.strip() == '':
+            continue
+        key, value = key.strip(), value.strip()
+        if key == 'settings':
+            task[key] = json.loads(value)
+        elif key == 'time' and value.count(':') == 2:
+            start, stop, num = value.split(':')
+            task[key] = dict(start=float(start), stop=float(stop),
+                             num=int(num))
+        elif key in ('alpha', 'time'):
+            task[key] = [float(v) for v in value.replace(';', ' ').split()]
+        elif key in ('name', 'method', 'function', 'data', 'quadrature',
+                     'derivative'):
+            task[key] = value
+        else:
+            task[key] = json.loads(value)
+    return task
+
+
+def _check_task(task, index, root):
+    task = dict(task)
+    task.setdefault('name', 'task{}'.format(index))
+    name = task['name']
+    if task.get('method') not in METHODS:
+        raise ValidationError(str('Task {}: invalid method {!r}. Please '
+                                  'specify one of the following: {}'.format(
+                                      name, task.get('method'),
+                                      ', '.join(METHODS))))
+    if ('function' in task) == ('data' in task):
+        raise ValidationError(str('Task {}: specify either function or '
+                                  'data.'.format(name)))
+    if 'data' in task and not os.path.isabs(task['data']):
+        task['data'] = os.path.join(root, task['data'])
+    for key in ('alpha', 'time'):
+        if key not in task:
+            raise ValidationError('Task {}: missing {}.'.format(name, key))
+    task['alpha'] = np.atleast_1d(np.asarray(task['alpha'], dtype=float))
+    grid = task['time']
+    if isinstance(grid, dict):
+        grid = np.linspace(grid['start'], grid['stop'], int(grid['num']))
+    task['time'] = np.atleast_1d(np.asarray(grid, dtype=float))
+    task.setdefault('lower', 0.0)
+    task.setdefault('quadrature', 'GLegRS')
+    task.setdefault('settings', dict())
+    return task
+
+
+def _group_key(task):
+    # the Grunwald-Letnikov definition does not use quadrature
+    if task['method'] == 'grunwaldletnikov':
+        return ('grunwaldletnikov',)
+    return (task['quadrature'].lower(),
+            json.dumps(task['settings'], sort_keys=True))
+
+
+def _evaluate(groups, workers):
+    # results of each group, as soon as the group completes
+    if workers == 1:
+        for group in groups:
+            yield _run_group(group)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_group, group) for group in groups]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def _run_group(group):
+    '''
+    Evaluate tasks sharing one quadrature configuration.
+
+    Errors raised by a task are recorded in its result, so the other
+    tasks of the group and of the batch still complete.
+    '''
+    quadobj = None
+    results = []
+    for task in group:
+        start = time.perf_counter()
+        try:
+            quadobj, fd = _run_task(task, quadobj)
+        except TASK_ERRORS as error:
+            results.append(dict(name=task['name'], method=task['method'],
+                                error='{}: {}'.format(
+                                    type(error).__name__, error),
+                                elapsed=time.perf_counter() - start))
+            continue
+        results.append(dict(name=task['name'], method=task['method'],
+                            alpha=task['alpha'], time=task['time'], fd=fd,
+                            elapsed=time.perf_counter() - start))
+    return results
+
+
+def _run_task(task, quadobj):
+    # derivatives of one task, and the quadrature object of its group
+    func = _function(task)
+    method = METHODS[task['method']]
+    options = {key: value for key, value in task.items()
+               if key not in FIELDS}
+    if task['method'] != 'grunwaldletnikov':
+        if quadobj is None:
+            quad = fod._select_quadrature_method(task['quadrature'])
+            quadobj = quad(lower=task['lower'], upper=task['time'][0],
+                           **task['settings'])
+        options['quadrature'] = quadobj
+    fd = np.empty((task['alpha'].size, task['time'].size))
+    for ii, alpha in enumerate(task['alpha']):
+        for jj, upper in enumerate(task['time']):
+            fd[ii, jj] = method(func, task['lower'], upper, alpha=alpha,
+                                **options)['fd']
+    return quadobj, fd
+
+
+def _function(task):
+    # sympy expression in t, compiled by the definition for the backend
+    # of its quadrature, or interpolant of samples
+    if 'function' in task:
+        import sympy as sp
+        t = sp.Symbol('t')
+        return sp.sympify(task['function'], locals=dict(t=t))
+    ts, fs = _samples(task['data'])
+
+    def interpolant(t):
+        return np.interp(t, ts, fs)
+    return interpolant
+
+
+def _samples(path):
+    if path.lower().endswith('.npz'):
+        with np.load(path) as data:
+            return np.asarray(data['t'], float), np.asarray(data['f'], float)
+    if path.lower().endswith('.npy'):
+        data = np.load(path)
+    else:
+        data = np.loadtxt(path, delimiter=',', ndmin=2)
+    return data[:, 0], data[:, 1]
+
+
+class _ResultWriter(object):
+    '''
+    Context manager streaming results to NPZ or CSV.
+
+    NPZ members are written one array at a time, so completed tasks do
+    not stay in memory.  The file is opened by the first write, so no
+    output is left behind if every task fails.
+    '''
+    def __init__(self, output):
+        self.output = output
+        self.csv = output.lower().endswith('.csv')
+        self.stream = None
+
+    def __enter__(self):
+        return self.write
+
+    def __exit__(self, *exc):
+        if self.stream is not None:
+            self.stream.close()
+        return False
+
+    def _open(self):
+        if self.csv:
+            self.stream = open(self.output, 'w', newline='')
+            self.rows = csv.writer(self.stream)
+            self.rows.writerow(['task', 'method', 'alpha', 'time', 'fd'])
+        else:
+            self.stream = zipfile.ZipFile(self.output, mode='w',
+                                          compression=zipfile.ZIP_STORED,
+                                          allowZip64=True)
+
+    def write(self, result):
+        if self.stream is None:
+            self._open()
+        if self.csv:
+            for ii, alpha in enumerate(result['alpha']):
+                for jj, upper in enumerate(result['time']):
+                    self.rows.writerow([result['name'], result['method'],
+                                        repr(float(alpha)), repr(float(upper)),
+                                        repr(float(result['fd'][ii, jj]))])
+            self.stream.flush()
+            return
+        for key in ('fd', 'alpha', 'time'):
+            member = '{}_{}.npy'.format(result['name'], key)
+            with self.stream.open(member, mode='w', force_zip64=True) as out:
+                np.lib.format.write_array(out, np.asarray(result[key]))
+
+
+def _report(stream, message):
+    if stream is not None:
+        print(message, file=stream, flush=True)
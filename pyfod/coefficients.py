@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+'''
+This module stores coefficients that depend only on the fractional order.
+
+The normalizing constant :math:`\\Gamma(1-\\alpha)` and the
+Grünwald-Letnikov weights
+
+.. math::
+
+    w_m = (-1)^m\\binom{\\alpha}{m}, \\quad
+    w_m = w_{m-1}\\Big(1 - \\frac{\\alpha + 1}{m}\\Big),
+
+are computed once per :math:`\\alpha` and precision, and kept in bounded
+LRU caches.  Weight vectors are extended in place of being recomputed
+when more terms are requested.  Stored arrays are read-only.
+
+Functions:
+    * :func:`~gamma`
+    * :func:`~gl_weights`
+    * :func:`~clear`
+'''
+import math
+import numpy as np
+from pyfod.utilities import LRUCache
+from pyfod.utilities import check_node_type
+from pyfod.utilities import check_precision
+
+
+# Gamma function values keyed by (x, precision, n_digits)
+GAMMA = LRUCache(maxsize=128)
+# Grunwald-Letnikov weight vectors keyed by (alpha, precision, n_digits)
+GL_WEIGHTS = LRUCache(maxsize=16)
+
+
+def gamma(x, precision='float', n_digits=30):
+    '''
+    Cached gamma function.
+
+    Args:
+        * **x** (:py:class:`float`): Argument.
+
+    Kwargs: name (type) - default
+        * **precision** (:py:class:`str`) - `'float'`: `'float'` or
+          `'mp'`.
+        * **n_digits** (:py:class:`int`) - `30`: Digits used for `'mp'`.
+
+    Returns:
+        * :py:class:`float`, or :code:`mpf` for `'mp'` precision.
+    '''
+    key = _key(x, precision, n_digits)
+    value = GAMMA.get(key)
+    if value is None:
+        if key[1] == 'float':
+            value = math.gamma(x)
+        else:
+            import mpmath
+            with mpmath.workdps(n_digits):
+                value = mpmath.gamma(x)
+        GAMMA.put(key, value)
+    return value
+
+
+def gl_weights(alpha, n, precision='float', n_digits=30):
+    '''
+    Cached Grünwald-Letnikov weights, :math:`(-1)^m\\binom{\\alpha}{m}`.
+
+    Args:
+        * **alpha** (:py:class:`float`): Order of fractional derivative.
+        * **n** (:py:class:`int`): Number of weights, :math:`m = 0,...,n-1`.
+
+    Kwargs: name (type) - default
+        * **precision** (:py:class:`str`) - `'float'`: `'float'` or
+          `'mp'`.
+        * **n_digits** (:py:class:`int`) - `30`: Digits used for `'mp'`.
+
+    Returns:
+        * Read-only :class:`~numpy.ndarray` of shape (n,), with
+          :code:`mpf` entries for `'mp'` precision.
+    '''
+    n = check_node_type(n)
+    key = _key(alpha, precision, n_digits)
+    weights = GL_WEIGHTS.get(key)
+    if weights is None or weights.size < n:
+        # grow geometrically so repeated extensions stay cheap
+        size = n if weights is None else max(n, 2*weights.size)
+        weights = _extend(weights, alpha, size, key[1], n_digits)
+        GL_WEIGHTS.put(key, weights)
+    return weights[:n]
+
+
+def clear():
+    '''
+    Remove all stored coefficients.
+    '''
+    GAMMA.clear()
+    GL_WEIGHTS.clear()
+
+
+def _key(x, precision, n_digits):
+    precision = check_precision(precision)
+    if precision == 'float':
+        return (float(x), precision, None)
+    return (x, precision, n_digits)
+
+
+def _extend(weights, alpha, size, precision, n_digits):
+    # continue the recurrence from the last stored weight
+    start = 0 if weights is None else weights.size
+    if precision == 'float':
+        out = np.empty(size)
+        if start:
+            out[:start] = weights
+        else:
+            out[0] = 1.0
+            start = 1
+        m = np.arange(start, size)
+        out[start:] = out[start-1]*np.cumprod((m - 1 - alpha)/m)
+    else:
+        import mpmath
+        out = np.empty(size, dtype=object)
+        with mpmath.workdps(n_digits):
+            if start:
+                out[:start] = weights
+            else:
+                out[0] = mpmath.mpf(1)
+                start = 1
+            alpha = mpmath.mpf(alpha)
+            for m in range(start, size):
+                out[m] = out[m-1]*(m - 1 - alpha)/m
+    out.flags.writeable = False
+    return out
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+'''
+This module solves fractional differential equations of the form
+
+.. math::
+
+    D_C^\\alpha[y(t)] = g(t, y(t)), \\quad y(t_0) = y_0,
+
+for :math:`\\alpha \\in (0, 1)` with the Adams-Bashforth-Moulton
+predictor-corrector method :cite:`diethelm2002predictor`.  The equation is
+written as the Volterra integral equation
+
+.. math::
+
+    y(t) = y_0 + \\frac{1}{\\Gamma(\\alpha)}\\int_{t_0}^t
+    (t-s)^{\\alpha-1}g(s, y(s))ds,
+
+and the integral is approximated with product rectangle (predictor) and
+product trapezoidal (corrector) rules on a uniform grid.  Both rules are
+built from the closed form weights of :class:`~.quadrature.RiemannSum`.
+
+The history sums are discrete convolutions.  Rather than summing the whole
+history at every step, the trajectory is split recursively into blocks;
+the contribution of each finished block to the following block is
+computed with a single FFT convolution.  This reduces the cost of a full
+trajectory from :math:`O(N^2)` to :math:`O(N\\log^2 N)`.
+
+Functions:
+    * :func:`~solve_fde`
+'''
+import math
+import numpy as np
+from pyfod.quadrature import RiemannSum
+from pyfod.utilities import ValidationError
+from pyfod.utilities import check_input
+from pyfod.utilities import check_node_type
+from pyfod.utilities import fft_convolve
+
+
+def solve_fde(g, y0, lower, upper, n=100, alpha=0.5,
+              corrector=1, block=32):
+    '''
+    Solve a fractional differential equation with the Adams-Bashforth-
+    Moulton predictor-corrector method.
+
+    Args:
+        * **g** (def): Right hand side, :code:`g(t, y)`.  For a system of
+          equations **g** should return an array with the shape of **y0**.
+        * **y0** (:py:class:`float` or array): Initial condition.
+        * **lower** (:py:class:`float`): Initial time.
+        * **upper** (:py:class:`float`): Final time.
+
+    Kwargs: name (type) - default
+        * **n** (:py:class:`int`) - `100`: Number of time steps.
+        * **alpha** (:py:class:`float`) - `0.5`: Order of fractional
+          derivative, :math:`\\alpha \\in (0, 1)`.
+        * **corrector** (:py:class:`int`) - `1`: Number of corrector
+          iterations per step.
+        * **block** (:py:class:`int`) - `32`: Number of steps below which
+          history sums are evaluated directly rather than by FFT.
+
+    Returns: :py:class:`dict`
+        * `t`: Time points, shape (n+1,).
+        * `y`: Solution, shape (n+1,) or (n+1, k) for a system of size k.
+    '''
+    check_input(g, 'g')
+    check_input(y0, 'y0')
+    if not 0 < alpha < 1:
+        raise ValidationError(str('Invalid value! alpha must be in (0, 1). '
+                                  'alpha = {}'.format(alpha)))
+    n = check_node_type(n)
+    block = max(check_node_type(block), 1)
+    h = (upper - lower)/n
+    t = lower + h*np.arange(n + 1)
+    y0 = np.asarray(y0, dtype=float)
+    y = np.empty((n + 1,) + y0.shape)
+    gv = np.empty_like(y)
+    y[0] = y0
+    gv[0] = g(t[0], y0)
+    # history sums, filled one block of sources at a time
+    hist_p = np.zeros_like(y)
+    hist_c = np.zeros_like(y)
+    wp, wc, wc0, wcn = _abm_weights(n, h, alpha)
+    scale = 1/math.gamma(alpha)
+
+    def step(m):
+        # complete history of target m with the remaining sources
+        yp = y0 + scale*hist_p[m]
+        base = y0 + scale*(hist_c[m] + (wc0[m] - wc[m])*gv[0])
+        ym = yp
+        for _ in range(corrector):
+            ym = base + scale*wcn*g(t[m], ym)
+        y[m] = ym
+        gv[m] = g(t[m], ym)
+
+    def solve(lo, hi):
+        # steps lo, ..., hi-1 with history of sources < lo in place
+        if hi - lo <= block:
+            for m in range(max(lo, 1), hi):
+                hist_p[m] += np.tensordot(wp[m-lo:0:-1], gv[lo:m], axes=1)
+                hist_c[m] += np.tensordot(wc[m-lo:0:-1], gv[lo:m], axes=1)
+                step(m)
+            return
+        mid = (lo + hi)//2
+        solve(lo, mid)
+        # sources lo, ..., mid-1 acting on targets mid, ..., hi-1
+        src = gv[lo:mid]
+        hist_p[mid:hi] += fft_convolve(wp[1:hi-lo], src)[mid-lo-1:hi-lo-1]
+        hist_c[mid:hi] += fft_convolve(wc[1:hi-lo], src)[mid-lo-1:hi-lo-1]
+        solve(mid, hi)
+
+    solve(0, n + 1)
+    return dict(t=t, y=y)
+
+
+def _abm_weights(n, h, alpha):
+    '''
+    Convolution weights of the predictor and corrector.
+
+    Entry k of the weight vectors multiplies :math:`g(t_{m-k})` in the
+    history sum of step m.  The corrector weight of the initial point is
+    not of convolution type and is returned separately, as is the weight
+    of the new point.
+    '''
+    grid = h*np.arange(n + 2)
+    # rectangle weights: Riemann-Sum weights of the kernel (t-s)^(alpha-1)
+    rect = RiemannSum._rs_weights(grid, grid[-1], alpha=1 - alpha)[::-1]
+    wp = np.concatenate(([0.0], rect[:n]))
+    # trapezoidal weights: differences of Riemann-Sum weights of (t-s)^alpha
+    rs = RiemannSum._rs_weights(grid, grid[-1], alpha=-alpha)[::-1]
+    wc = np.concatenate(([rs[0]], np.diff(rs)))/(alpha*h)
+    k = np.arange(n + 1, dtype=float)
+    k[0] = 1.0
+    wc0 = h**alpha/(alpha*(alpha + 1))*(
+        (k - 1)**(alpha + 1) - (k - 1 - alpha)*k**alpha)
+    return wp, wc, wc0, wc[0]
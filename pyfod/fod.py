@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 '''
 This module provides support for three common definitions of fractional
-derivative in the limiting case of :math:`\\alpha \\in [0,1)`.  The
-definitions available include:
+derivative of order :math:`\\alpha \\ge 0`.  The definitions available
+include:
 
     * Riemann-Liouville - :func:`riemannliouville`
     * Caputo - :func:`caputo`
@@ -14,24 +14,77 @@ please see :cite:`podlubny1998fractional`.
 .. note::
     In each method you are required to provide a function handle.  Depending
     on the method being used, you may need to define your function using
-    sympy_ to allow for extended numerical precision.
+    sympy_ to allow for extended numerical precision.  Passing
+    `precision='mp'` as a quadrature setting evaluates the derivative with
+    mpmath and returns an :code:`mpf`.
+
+.. note::
+    Vector-valued functions returning arrays of shape (n, k) for n time
+    points are supported in float precision.  All k channels share one
+    set of quadrature nodes and `fd` is returned as an array of shape
+    (k,).
+
+.. note::
+    Families of functions :math:`f(t; \\theta)` are evaluated in one pass
+    by passing a batch of parameters, **theta**.  The function is then
+    called as :code:`f(t, theta)` and should return an array of shape
+    (n_theta, n) for n time points.  The quadrature weights are reduced
+    with a single matrix-vector product and `fd` is returned as an array
+    of shape (n_theta,).  For space-time fields, **theta** holds the n_space
+    points of a spatial mesh and `fd` is the time-fractional derivative at
+    every point.  With **chunk_size** the mesh is processed chunk_size
+    points at a time, which bounds the memory to chunk_size x n values
+    per call of **f**.
+
+.. note::
+    With `gradient=True`, :func:`riemannliouville` and :func:`caputo` also
+    return the derivative of `fd` with respect to :math:`\\alpha`.  The
+    derivatives of the weights, :code:`weight_derivative()`, and of
+    :math:`\\Gamma(1-\\alpha)^{-1}` are analytic, and both sets of
+    weights are reduced against the function values in one matrix
+    product.  If **jacobian** returns :math:`\\partial f/\\partial p` for
+    user parameters :math:`p`, it is evaluated on the same nodes and the
+    derivative of `fd` with respect to :math:`p` is returned as well.
+    Gradients require float precision.
+
+.. note::
+    With `auto_dt=True`, :func:`riemannliouville` and :func:`caputo`
+    choose the finite difference step themselves.  The noise of the
+    integrals is estimated from high order differences at a tiny spacing,
+    the truncation error from two difference quotients at a pilot step,
+    and the step balancing both is used.  The estimated error of `fd`
+    and the selected step are returned as `error` and `dt`; the error of
+    the quadrature itself is not included.  All
+    integrals share one quadrature object, so the estimate costs a few
+    additional integrals rather than repeated full calls.
 
 .. _sympy: https://www.sympy.org/en/index.html
 
 '''
-import sys
+import contextlib
+import math
 import numpy as np
-import sympy as sp
-from scipy.special import gamma as sc_gamma
+from pyfod import coefficients
 from pyfod import quadrature as qm
+from pyfod.utilities import ValidationError
 from pyfod.utilities import check_input as _check_input
+from pyfod.symbolic import as_function
+from pyfod.symbolic import compile_derivative
+from pyfod.symbolic import compile_integrand
+from pyfod.symbolic import is_expression
+
+
+# Pilot and noise-estimation steps of auto_dt, relative to upper - lower
+AUTO_DT_PILOT = 1e-2
+AUTO_DT_TINY = 1e-6
 
 
 def riemannliouville(f, lower, upper, dt=1e-4,
-                     alpha=0.0, quadrature='GLegRS', **kwargs):
+                     alpha=0.0, quadrature='GLegRS', theta=None,
+                     chunk_size=None, gradient=False, jacobian=None,
+                     auto_dt=False, **kwargs):
     '''
-    Riemann-Liouville fractional derivative calculator for
-    :math:`\\alpha \\in [0,1)`.
+    Riemann-Liouville fractional derivative calculator.
 
     The general definition for Riemann-Liouville fractional derivative
     is
@@ -41,7 +94,7 @@ def riemannliouville(f, lower, upper, dt=1e-4,
         D_{RL}^\\alpha[f(t)] = \\frac{1}{\\Gamma(n-\\alpha)}
         \\frac{d^n}{dt^n}\\int_0^t\\frac{f(s)}{(t-s)^{\\alpha+1-n}}ds,
 
-    where :math:`n = \\lceil\\alpha\\rceil`. In the limiting case where
+    where :math:`n = \\lfloor\\alpha\\rfloor + 1`. In the limiting case where
     :math:`\\alpha \\in [0, 1)` this further simplifies to
 
     .. math::
@@ -66,6 +119,18 @@ def riemannliouville(f, lower, upper, dt=1e-4,
     this approach please see :cite:`atangana2017numerical`
     and :cite:`miles2018numerical`.
 
+    For :math:`\\alpha \\ge 1` the same integral is taken with exponent
+    :math:`\\beta = \\alpha - n + 1 \\in [0, 1)`, and the n-th derivative is
+    approximated with the backward difference stencil
+
+    .. math::
+
+        \\frac{d^n}{dt^n}F[t] \\approx \\frac{1}{\\Delta t^n}\\sum_{k=0}^n
+        (-1)^k\\binom{n}{k}F(t - k\\Delta t).
+
+    Each of the n+1 integrals remaps one quadrature object, so the cost
+    grows linearly with n.
+
     Args:
         * **f** (def): Function handle.
         * **lower** (:py:class:`float`): Lower limit - should be zero.
@@ -75,40 +140,92 @@ def riemannliouville(f, lower, upper, dt=1e-4,
     Kwargs: name (type) - default
         * **dt** (:py:class:`float`) - `1e-4`: Time step, :math:`t_{j+1}-t_j`.
         * **alpha** (:py:class:`float`) - `0`: Order of fractional derivative.
-        * **quadrature** (:py:class:`str`) - `'glegrs'`: Quadrature method
+        * **quadrature** (:py:class:`str`) - `'glegrs'`: Quadrature method.
+          An existing quadrature object may be given instead, in which
+          case it is remapped with :code:`rebase` rather than rebuilt.
+        * **theta** (array_like) - `None`: Batch of parameters, **f** is
+          called as :code:`f(t, theta)` and `fd` has shape (n_theta,).
+        * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+          **theta** per call of **f**.
+        * **gradient** (:py:class:`bool`) - `False`: Also return the
+          derivative of `fd` with respect to **alpha**.
+        * **jacobian** (def) - `None`: Derivative of **f** with respect to
+          p user parameters, of shape (n, p) for n time points.  Implies
+          **gradient**.
+        * **auto_dt** (:py:class:`bool`) - `False`: Select **dt**
+          automatically and return an error estimate.  Requires float
+          precision.
         * **kwargs**: Quadrature specific settings.
 
     Returns: :py:class:`dict`
         * `fd`: Fractional derivative
         * `i1`: Value of integral :math:`F(t_{j+1})`.
         * `i2`: Value of integral :math:`F(t_j)`.
-        * `q1`: Quadrature object for :math:`F(t_{j+1})`.
-        * `q2`: Quadrature object for :math:`F(t_{j})`.
+        * `q1`: Quadrature object, remapped to :math:`F(t_{j+1})`.
+        * `q2`: Same object as `q1`.  All integrals share one object,
+          which is remapped with :code:`rebase` to each limit.
+        * `integrals`: Values of :math:`F(t - k\\Delta t)`,
+          :math:`k = 0,...,n`.
+        * `dfd_dalpha`: Derivative of `fd` with respect to **alpha**, if
+          **gradient**.
+        * `dfd_dparams`: Derivative of `fd` with respect to the user
+          parameters, shape (p,), if **jacobian** is given.
+        * `dt`: Selected time step, if **auto_dt**.
+        * `error`: Estimated absolute error of `fd`, if **auto_dt**.
     '''
-    quad = _select_quadrature_method(quadrature)
-    q1 = quad(lower=lower, upper=upper, alpha=alpha, **kwargs)
-    i1 = q1.integrate(f=f)
-    q2 = quad(lower=lower, upper=upper-dt, alpha=alpha, **kwargs)
-    i2 = q2.integrate(f=f)
-
-    if quadrature.lower() == 'glag':
-        extend_precision = True
-    else:
-        extend_precision = False
-
-    if extend_precision is True:
-        fd = float((i1-i2)/(dt*sp.gamma(1-alpha)))
-    else:
-        fd = (i1-i2)/(dt*sc_gamma(1 - alpha))
+    n, beta = _order(alpha)
+    gradient = gradient or jacobian is not None
+    if auto_dt:
+        if isinstance(quadrature, str):
+            quad = _select_quadrature_method(quadrature)
+            quadrature = quad(lower=lower, upper=upper, alpha=beta, **kwargs)
+        _check_auto_dt(quadrature, gradient or theta is not None)
+
+        def integral(x):
+            # all limits share the nodes of one remapped object
+            return quadrature.rebase(lower=lower, upper=upper - x,
+                                     alpha=beta).integrate(f=f)
+        quotient, dt, error, integrals = _auto_dt(integral, n,
+                                                  upper - lower)
+        scale = 1/_gamma(1 - beta, quadrature)
+        return dict(fd=_result(quotient*scale, quadrature), i1=integrals[0],
+                    i2=integrals[1], q1=quadrature, q2=quadrature,
+                    integrals=integrals, dt=dt,
+                    error=_result(error*scale, quadrature))
+    if isinstance(quadrature, str):
+        quad = _select_quadrature_method(quadrature)
+        quadrature = quad(lower=lower, upper=upper, alpha=beta, **kwargs)
+    # one object remapped to each limit shares its nodes, the last limit
+    # is upper, so the object is left at F(t_{j+1})
+    passes = [_integrate(quadrature.rebase(lower=lower, upper=upper - k*dt,
+                                           alpha=beta),
+                         f, theta, chunk_size, gradient, jacobian)
+              for k in reversed(range(n + 1))][::-1]
+    integrals = [integral for integral, _, _ in passes]
+    q1 = quadrature
+
+    with _working_precision(q1):
+        scale = 1/(dt**n*_gamma(1 - beta, q1))
+        fd = _result(_difference(integrals, n)*scale, q1)
     # assemble output
-    return dict(fd=fd, i1=i1, i2=i2, q1=q1, q2=q2)
+    out = dict(fd=fd, i1=integrals[0], i2=integrals[1], q1=q1, q2=q1,
+               integrals=integrals)
+    if gradient:
+        out['dfd_dalpha'] = _result(
+            _difference([da for _, da, _ in passes], n)*scale
+            + fd*_digamma(1 - beta), q1)
+    if jacobian is not None:
+        out['dfd_dparams'] = _result(
+            _difference([dp for _, _, dp in passes], n)*scale, q1)
+    return out
 
 
 def caputo(f, lower, upper, dt=1e-4, alpha=0.0,
-           df=None, quadrature='GLegRS', **kwargs):
+           df=None, quadrature='GLegRS', derivative=None, theta=None,
+           chunk_size=None, gradient=False, jacobian=None, auto_dt=False,
+           **kwargs):
     '''
-    Caputo fractional derivative calculator for
-    :math:`\\alpha \\in [0,1)`.
+    Caputo fractional derivative calculator.
 
     The general definition for Caputo fractional derivative
     is
@@ -118,7 +235,7 @@ def caputo(f, lower, upper, dt=1e-4, alpha=0.0,
         D_{C}^\\alpha[f(t)] = \\frac{1}{\\Gamma(n-\\alpha)}
         \\int_0^t\\frac{f(s)^{(n)}}{(t-s)^{\\alpha+1-n}}ds,
 
-    where :math:`n = \\lceil\\alpha\\rceil`. In the limiting case where
+    where :math:`n = \\lfloor\\alpha\\rfloor + 1`. In the limiting case where
     :math:`\\alpha \\in [0, 1)` this further simplifies to
 
     .. math::
@@ -126,8 +243,33 @@ def caputo(f, lower, upper, dt=1e-4, alpha=0.0,
         D_{C}^\\alpha[f(t)] = \\frac{1}{\\Gamma(1-\\alpha)}
         \\int_0^t\\frac{f(s)^{(1)}}{(t-s)^{\\alpha}}ds.
 
-    To evaluate this we simply need to define a finite-difference scheme
-    for approximating :math:`f(s)^{(1)}`.
+    To evaluate this we need a source for :math:`f(s)^{(1)}`.  By default a
+    backward finite-difference scheme is used, with both function
+    evaluations combined into a single vectorized call.  Alternatively,
+    the derivative can be provided by the user (**df**), obtained by
+    differentiating a sympy_ compatible **f** once and compiling it
+    with :code:`sympy.lambdify` (`derivative='sympy'`), or avoided
+    entirely by integrating by parts (`derivative='parts'`),
+
+    .. math::
+
+        D_{C}^\\alpha[f(t)] = \\frac{1}{\\Gamma(1-\\alpha)}\\Big[
+        \\frac{f(t)-f(t_0)}{(t-t_0)^{\\alpha}}
+        + \\alpha\\int_{t_0}^t\\frac{f(t)-f(s)}{t-s}
+        \\frac{1}{(t-s)^{\\alpha}}ds\\Big],
+
+    which only requires values of :math:`f` and introduces no
+    :math:`O(\\Delta t)` error.
+
+    For :math:`\\alpha \\ge 1` the integral is taken with exponent
+    :math:`\\alpha - n + 1 \\in [0, 1)` and :math:`f(s)^{(n)}` is obtained
+    from the backward difference stencil of order n, evaluated in a
+    single vectorized call, or from symbolic differentiation.  In this
+    case **df** must return :math:`f(s)^{(n)}` and `derivative='parts'`
+    is not available.  For integer :math:`\\alpha = m \\ge 1` the
+    derivative is classical and :math:`f^{(m)}(t)` is returned directly,
+    from the same source of derivative, i.e., **df** then returns
+    :math:`f^{(m)}`.
 
     Args:
         * **f** (def): Function handle.
@@ -138,37 +280,156 @@ def caputo(f, lower, upper, dt=1e-4, alpha=0.0,
     Kwargs: name (type) - default
         * **dt** (:py:class:`float`) - `1e-4`: Time step, :math:`t_{j+1}-t_j`.
         * **alpha** (:py:class:`float`) - `0`: Order of fractional derivative.
-        * **df** (def) - `None`: Finite difference function.  See tutorials
-          for examples of how to utilize this feature.
-        * **quadrature** (:py:class:`str`) - `'glegrs'`: Quadrature method
+        * **df** (def) - `None`: Derivative or finite difference function.
+          See tutorials for examples of how to utilize this feature.
+        * **quadrature** (:py:class:`str`) - `'glegrs'`: Quadrature method.
+          An existing quadrature object may be given instead, in which
+          case it is remapped with :code:`rebase` rather than rebuilt.
+        * **derivative** (:py:class:`str`) - `None`: Source of
+          :math:`f(s)^{(n)}`; one of `'fd'` (finite difference), `'sympy'`
+          (symbolic differentiation of **f**) or `'parts'` (integration by
+          parts). Ignored if **df** is provided.
+        * **theta** (array_like) - `None`: Batch of parameters, **f** and
+          **df** are called as :code:`f(t, theta)` and `fd` has shape
+          (n_theta,).  Symbolic differentiation is not available.
+        * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+          **theta** per call of **f**.
+        * **gradient** (:py:class:`bool`) - `False`: Also return the
+          derivative of `fd` with respect to **alpha**.
+        * **jacobian** (def) - `None`: Derivative of **f** with respect to
+          p user parameters, of shape (n, p) for n time points.  Implies
+          **gradient**.  Its n-th time derivative is taken with the
+          backward difference stencil, unless `derivative='parts'`.
+        * **auto_dt** (:py:class:`bool`) - `False`: Select **dt**
+          automatically and return an error estimate.  Requires float
+          precision and the finite
+          difference derivative.
         * **kwargs**: Quadrature specific settings.
 
     Returns: :py:class:`dict`
         * `fd`: Fractional derivative.
-        * `i1`: Value of integral.
+        * `i1`: Value of integral.  For `derivative='parts'` this is the
+          integral of the difference quotient, for integer orders
+          :math:`f^{(m)}(t)`.
         * `q1`: Quadrature object.
+        * `dfd_dalpha`: Derivative of `fd` with respect to **alpha**, if
+          **gradient**.
+        * `dfd_dparams`: Derivative of `fd` with respect to the user
+          parameters, shape (p,), if **jacobian** is given.
+        * `dt`: Selected time step, if **auto_dt**.
+        * `error`: Estimated absolute error of `fd`, if **auto_dt**.
     '''
-    # Check finite difference function
-    df = _setup_finite_difference(df, f, dt)
-
-    quad = _select_quadrature_method(quadrature)
-    quadobj = quad(lower=lower, upper=upper, alpha=alpha, **kwargs)
-    integral = quadobj.integrate(f=df)
-
-    if quadrature.lower() == 'glag':
-        extend_precision = True
+    n, beta = _order(alpha)
+    gradient = gradient or jacobian is not None
+    dtotal = dparams = None
+    if is_expression(f):
+        # f is called directly for finite differences and by parts
+        f = as_function(f)
+    if isinstance(quadrature, str):
+        quad = _select_quadrature_method(quadrature)
+        quadobj = quad(lower=lower, upper=upper, alpha=beta, **kwargs)
     else:
-        extend_precision = False
-
-    if extend_precision is True:
-        fd = float((integral)/(sp.gamma(1-alpha)))
+        quadobj = quadrature.rebase(lower=lower, upper=upper, alpha=beta)
+    precision = quadobj.precision
+    if theta is not None and df is None and derivative == 'sympy':
+        raise ValidationError(str('Batched parameters require derivative '
+                                  'fd or parts, or a df handle.'))
+    m = _integer_order(alpha)
+    if m:
+        if df is None and derivative == 'parts':
+            _check_parts(n)
+        return _classical(f, upper, dt, m, df, derivative, quadobj, theta,
+                          gradient or auto_dt)
+
+    if auto_dt:
+        _check_auto_dt(quadobj, gradient or theta is not None
+                       or df is not None or derivative not in (None, 'fd'))
+        func = qm._numeric(f)
+
+        def integral(x):
+            # f shifted by x on the nodes of the same rule
+            return quadobj.integrate(f=lambda s: func(s - x))
+        integral, dt, error, _ = _auto_dt(integral, n, upper - lower)
+        scale = 1/_gamma(1 - beta, quadobj)
+        return dict(fd=_result(integral*scale, quadobj), i1=integral,
+                    q1=quadobj, dt=dt, error=_result(error*scale, quadobj))
+
+    if df is None and derivative == 'parts' and theta is not None:
+        _check_parts(n)
+        if gradient:
+            raise ValidationError('Gradients are not available for batched '
+                                  'parameters.')
+        # one row per parameter set
+        fa = f(np.array([lower]), theta)[:, 0]
+        ft = f(np.array([upper]), theta)[:, 0]
+
+        def quotient(s, theta):
+            # theta may be a chunk of the batch
+            return (f(np.array([upper]), theta) - f(s, theta))/(upper - s)
+        integral = quadobj.integrate(f=quotient, theta=theta,
+                                     chunk_size=chunk_size)
+        total = (ft - fa)*(upper - lower)**(-alpha) + alpha*integral
+    elif df is None and derivative == 'parts':
+        _check_parts(n)
+        if precision != 'float':
+            f = compile_integrand(f, backend='mpmath')
+        with _working_precision(quadobj):
+            fa, ft = f(lower), f(upper)
+        if np.ndim(ft) > 1:
+            # vector-valued f maps a single time to shape (1, k)
+            fa, ft = np.ravel(fa), np.ravel(ft)
+
+        def quotient(s):
+            fs = f(s)
+            if np.ndim(fs) > 1:
+                # one column per channel
+                s = np.reshape(s, (-1, 1))
+            return (ft - fs)/(upper - s)
+        if jacobian is not None:
+            ja = np.ravel(jacobian(np.array([lower])))
+            jt = np.ravel(jacobian(np.array([upper])))
+
+            def jquotient(s):
+                return (jt - jacobian(s))/(upper - s)[:, None]
+        else:
+            jquotient = None
+        integral, dintegral, djac = _integrate(quadobj, quotient, None, None,
+                                               gradient, jquotient)
+        with _working_precision(quadobj):
+            length = (upper - lower)**(-alpha)
+            total = (ft - fa)*length + alpha*integral
+        if gradient:
+            dtotal = (-(ft - fa)*np.log(upper - lower)*length + integral
+                      + alpha*dintegral)
+        if jacobian is not None:
+            dparams = (jt - ja)*length + alpha*djac
     else:
-        fd = (integral)/(sc_gamma(1 - alpha))
+        # Check derivative function
+        df = _setup_derivative(df, f, dt, derivative, precision=precision,
+                               order=n)
+        jdf = None
+        if jacobian is not None:
+            jdf = _setup_finite_difference(None, jacobian, dt, order=n)
+        integral, dtotal, dparams = _integrate(quadobj, df, theta,
+                                               chunk_size, gradient, jdf)
+        total = integral
+
+    with _working_precision(quadobj):
+        scale = 1/_gamma(1 - beta, quadobj)
+        fd = _result(total*scale, quadobj)
     # assemble output
-    return dict(fd=fd, i1=integral, q1=quadobj)
-
-
-def grunwaldletnikov(f, lower, upper, n=100, dt=None, alpha=0.0):
+    out = dict(fd=fd, i1=integral, q1=quadobj)
+    if gradient:
+        out['dfd_dalpha'] = _result(dtotal*scale + fd*_digamma(1 - beta),
+                                    quadobj)
+    if jacobian is not None:
+        out['dfd_dparams'] = _result(dparams*scale, quadobj)
+    return out
+
+
+def grunwaldletnikov(f, lower, upper, n=100, dt=None, alpha=0.0,
+                     precision='float', n_digits=30, theta=None,
+                     chunk_size=None):
     '''
     Grünwald-Letnikov fractional derivative calculator.
 
@@ -179,12 +440,13 @@ def grunwaldletnikov(f, lower, upper, n=100, dt=None, alpha=0.0):
         D_G^\\alpha [f(t)]=\\lim_{h\\rightarrow 0}\\frac{1}{h^\\alpha}
         \\sum_{0\\leq m< \\infty}(-1)^m\\binom{\\alpha}{m}f(t-mh).
 
-    .. note::
-        The package as a whole was built for problems where
-        :math:`\\alpha \\in [0, 1)`; however, this definition for
-        Grünwald-Letnikov does not necessarily have the same constraints.
-        It has not been tested for values of :math:`\\alpha \\ge 1`,
-        but in principle it will work.
+    The definition holds for any :math:`\\alpha \\ge 0`, the weights of
+    orders :math:`\\alpha \\ge 1` follow from the same recurrence.
+
+    The weights :math:`(-1)^m\\binom{\\alpha}{m}` are taken from
+    :func:`~.coefficients.gl_weights`, so repeated calls with the same
+    :math:`\\alpha` reuse them, and **f** is evaluated on all points at
+    once.
 
     Args:
         * **f** (def): Function handle.
@@ -198,6 +460,14 @@ def grunwaldletnikov(f, lower, upper, n=100, dt=None, alpha=0.0):
         * **dt** (:py:class:`float`) - `1e-4`: Time step. If `dt is None`,
           then the value of `dt` will be `(upper - lower)/n`.
         * **alpha** (:py:class:`float`) - `0`: Order of fractional derivative.
+        * **precision** (:py:class:`str`) - `'float'`: `'float'`, or `'mp'`
+          to sum in mpmath arithmetic and return an :code:`mpf`.
+        * **n_digits** (:py:class:`int`) - `30`: Digits used for `'mp'`.
+        * **theta** (array_like) - `None`: Batch of parameters, **f** is
+          called as :code:`f(t, theta)` and `fd` has shape (n_theta,).
+          Requires `precision='float'`.
+        * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+          **theta** per call of **f**.
 
     Returns: :py:class:`dict`
         * `fd`: Fractional derivative.
@@ -207,32 +477,269 @@ def grunwaldletnikov(f, lower, upper, n=100, dt=None, alpha=0.0):
     _check_input(lower, 'lower')
     _check_input(upper, 'upper')
     # Evaluate fractional derivative
-    fd = 0.0
     if dt is not None:
         n = np.floor((upper - lower)/dt).astype(int)
     else:
         dt = (upper - lower)/n
-    for m in range(0, n):
-        tmp = (-1.0)**m * sp.binomial(alpha, m) * (
-                f(upper - m*dt))
-        fd += tmp
-    fd = fd/(dt**alpha)
+    weights = coefficients.gl_weights(alpha, n, precision, n_digits)
+    if theta is not None:
+        if precision != 'float':
+            raise ValidationError('Batched parameters require float '
+                                  'precision.')
+        fd = qm._apply(weights, f, upper - dt*np.arange(n), theta,
+                       chunk_size)/(dt**alpha)
+    elif precision == 'float':
+        points = upper - dt*np.arange(n)
+        feval = np.asarray(qm._numeric(f)(points))
+        if feval.dtype == object:
+            # scalar handles, e.g. returning sympy numbers, point by point
+            feval = np.array([f(t) for t in points], dtype=float)
+        feval = qm._columns(feval, n)
+        fd = qm._reduce(weights, feval)/(dt**alpha)
+    else:
+        import mpmath
+        func = compile_integrand(f, backend='mpmath')
+        with mpmath.workdps(n_digits):
+            upper, dt = mpmath.mpf(upper), mpmath.mpf(dt)
+            feval = [func(upper - m*dt) for m in range(n)]
+            fd = mpmath.fdot(weights, feval)/(dt**alpha)
     # assemble output
     return dict(fd=fd)
 
 
-def _setup_finite_difference(df, f, dt):
+def _setup_finite_difference(df, f, dt, order=1):
     '''
     Check if finite difference function is defined
     '''
-    def default_df(t):
-        return (f(t) - f(t-dt))/dt
+    def default_df(t, *theta):
+        if isinstance(t, np.ndarray):
+            # evaluate f at every point of the stencil in a single call,
+            # points run along the last axis of batched output
+            feval = f(np.concatenate([t - k*dt for k in range(order + 1)]),
+                      *theta)
+            feval = np.split(np.asarray(feval), order + 1,
+                             axis=-1 if theta else 0)
+            return _difference(feval, order)/dt**order
+        return _difference([f(t - k*dt) for k in range(order + 1)],
+                           order)/dt**order
     if df is None:
         return default_df
     else:
         return df
 
 
+def _setup_derivative(df, f, dt, derivative=None, precision='float',
+                      order=1):
+    '''
+    Select source of n-th derivative for Caputo definition.
+    '''
+    if df is not None or derivative in (None, 'fd'):
+        return _setup_finite_difference(df, f, dt, order=order)
+    if derivative == 'sympy':
+        return _sympy_derivative(f, precision=precision, order=order)
+    raise ValidationError(str('Invalid derivative source: {}. '
+                              'Please specify fd, sympy or parts.'.format(
+                                  derivative)))
+
+
+def _sympy_derivative(f, precision='float', order=1):
+    '''
+    Differentiate sympy compatible function once and compile it.
+
+    Float hybrids may still run the Gauss-Laguerre part in mpmath, so
+    the float derivative also accepts symbolic input.
+    '''
+    if precision == 'float':
+        return as_function(f, order=order)
+    return compile_derivative(f, backend='mpmath', order=order)
+
+
+def _integrate(quadobj, f, theta=None, chunk_size=None, gradient=False,
+               jacobian=None):
+    '''
+    Integral, and its derivatives with respect to alpha and the user
+    parameters if **gradient**, see :func:`~.quadrature._gradient`.
+    '''
+    if not gradient:
+        return (quadobj.integrate(f=f, theta=theta, chunk_size=chunk_size),
+                None, None)
+    if theta is not None:
+        raise ValidationError('Gradients are not available for batched '
+                              'parameters.')
+    return qm._gradient(quadobj, f, jacobian)
+
+
+def _check_auto_dt(quadobj, unsupported):
+    if quadobj.precision != 'float' or unsupported:
+        raise ValidationError(str(
+            'auto_dt requires float precision and a finite difference '
+            'derivative, without gradients or batched parameters.'))
+
+
+def _auto_dt(integral, n, span):
+    '''
+    Order n backward difference quotient of :code:`integral(x)` at
+    :math:`x = k\\Delta t` with the step balancing truncation and
+    cancellation error.
+
+    The truncation error of the first order stencil,
+    :math:`C\\Delta t`, is estimated from the quotients at a pilot step
+    and twice the pilot step.  The noise :math:`\\sigma` of the integrals
+    is estimated with :func:`_noise` and enters the quotient amplified by
+    :math:`\\sum_k|c_k|/\\Delta t^n`.  Minimizing the sum gives
+    :math:`\\Delta t = (n\\sigma\\sum_k|c_k|/C)^{1/(n+1)}`, limited to
+    the pilot step.  The quadrature error is not included.
+
+    Returns:
+        * Difference quotient, selected step, error estimate and the
+          integrals of the stencil.
+    '''
+    values = {}
+
+    def value(x):
+        # integrals are shared by the noise, pilot and final stencils
+        if x not in values:
+            values[x] = integral(x)
+        return values[x]
+
+    def stencil(h):
+        return [value(k*h) for k in range(n + 1)]
+
+    pilot = AUTO_DT_PILOT*span
+    tiny = AUTO_DT_TINY*span
+    noise = _noise([value(j*tiny) for j in range(7)])
+    amplification = sum(abs(c) for c in _stencil(n))
+    coarse = _difference(stencil(2*pilot), n)/(2*pilot)**n
+    fine = _difference(stencil(pilot), n)/pilot**n
+    truncation = np.max(np.abs(fine - coarse))/pilot
+    if truncation > 0:
+        dt = min((n*noise*amplification/truncation)**(1/(n + 1)), pilot)
+    else:
+        # exact difference quotient, use the least amplified step
+        dt = pilot
+    integrals = stencil(dt)
+    error = truncation*dt + noise*amplification/dt**n
+    return _difference(integrals, n)/dt**n, dt, error, integrals
+
+
+def _noise(values):
+    '''
+    Noise level of equally spaced values from their k-th differences,
+    :math:`\\sigma_k^2 = (k!)^2/(2k)!\\,\\mathrm{mean}(\\Delta^k)^2`
+    :cite:`more2011estimating`.  Low orders still contain the smooth
+    part, so the smallest level of order three or higher is used.  The
+    level is at least the rounding error of the values.
+    '''
+    diff = np.asarray(values, dtype=float).reshape(len(values), -1)
+    floor = np.finfo(float).eps*np.max(np.abs(diff))
+    levels = []
+    for k in range(1, len(values)):
+        diff = np.diff(diff, axis=0)
+        gamma = math.factorial(k)**2/math.factorial(2*k)
+        if k >= 3:
+            levels.append(np.sqrt(gamma*np.mean(diff**2)))
+    return max(min(levels), floor)
+
+
+def _digamma(x):
+    '''
+    Digamma function, :math:`d/d\\alpha\\,\\Gamma(1-\\alpha)^{-1} =
+    \\psi(1-\\alpha)\\Gamma(1-\\alpha)^{-1}`.
+    '''
+    from scipy.special import digamma
+    return float(digamma(x))
+
+
+def _order(alpha):
+    '''
+    Integer order n and kernel exponent :math:`\\alpha - n + 1 \\in [0, 1)`.
+    '''
+    n = max(int(math.floor(alpha)) + 1, 1)
+    return n, alpha - (n - 1)
+
+
+def _integer_order(alpha):
+    '''
+    Order m of a classical derivative, or 0 for fractional orders.
+    '''
+    if alpha >= 1 and float(alpha).is_integer():
+        return int(alpha)
+    return 0
+
+
+def _classical(f, upper, dt, m, df, derivative, quadobj, theta=None,
+               gradient=False):
+    '''
+    Caputo derivative of integer order m, i.e., :math:`f^{(m)}(t)`.
+
+    The kernel :math:`(t-s)^{m-\\alpha-1}` is not integrable at integer
+    orders, so the m-th derivative is evaluated at **upper** instead.
+    '''
+    if gradient:
+        raise ValidationError(str('Gradients and auto_dt are not available '
+                                  'at integer orders, alpha = {}.'.format(m)))
+    df = _setup_derivative(df, f, dt, derivative,
+                           precision=quadobj.precision, order=m)
+    with _working_precision(quadobj):
+        if quadobj.precision != 'float':
+            value = df(upper)
+        elif theta is not None:
+            value = np.asarray(df(np.array([upper]), theta))[..., 0]
+        else:
+            value = np.asarray(df(np.array([upper])))[0]
+    return dict(fd=_result(value, quadobj), i1=value, q1=quadobj)
+
+
+def _difference(values, n):
+    '''
+    Backward difference of order n, without the :math:`\\Delta t^{-n}`.
+    '''
+    return sum(c*value for c, value in zip(_stencil(n), values))
+
+
+def _stencil(n):
+    '''
+    Backward difference coefficients :math:`(-1)^k\\binom{n}{k}`.
+    '''
+    return [(-1)**k*math.comb(n, k) for k in range(n + 1)]
+
+
+def _check_parts(n):
+    if n > 1:
+        raise ValidationError(str('Integration by parts requires alpha < 1, '
+                                  'use derivative fd or sympy.'))
+
+
+def _working_precision(quadobj):
+    '''
+    Context with mpmath working precision of quadrature object.
+    '''
+    if quadobj.precision == 'float':
+        return contextlib.nullcontext()
+    import mpmath
+    return mpmath.workdps(quadobj.n_digits)
+
+
+def _gamma(x, quadobj):
+    '''
+    Gamma function evaluated in the precision of quadrature object.
+    '''
+    if quadobj.precision == 'float':
+        return coefficients.gamma(x)
+    return coefficients.gamma(x, precision='mp', n_digits=quadobj.n_digits)
+
+
+def _result(fd, quadobj):
+    '''
+    Return mpf for mp precision, float or array of floats otherwise.
+    '''
+    if quadobj.precision == 'mp':
+        return fd
+    if np.ndim(fd) > 0:
+        return np.asarray(fd, dtype=float)
+    return float(fd)
+
+
 def _select_quadrature_method(quadrature):
     methods = dict(
             glegrs=qm.GaussLegendreRiemannSum,
@@ -245,14 +752,14 @@ def _select_quadrature_method(quadrature):
         quad = methods[quadrature.lower()]
         return quad
     except KeyError:
-        print('Invalid quadrature method specified: {}'.format(quadrature))
-        print('Please specify one of the following:')
-        for method in methods:
-            print('\t{}'.format(method))
-        sys.exit('Invalid quadrature method')
+        raise ValidationError(str(
+            'Invalid quadrature method specified: {}. Please specify one '
+            'of the following: {}'.format(quadrature, ', '.join(methods))
+            )) from None
 
 
 if __name__ == '__main__':  # pragma: no cover
+    import sympy as sp
 
     def fcos(t):
         return np.cos(2*t)
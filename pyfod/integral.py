@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+'''
+This module evaluates the Riemann-Liouville fractional integral
+
+.. math::
+
+    I^\\nu[f(t)] = \\frac{1}{\\Gamma(\\nu)}\\int_{t_0}^t
+    (t-s)^{\\nu-1}f(s)ds, \\quad \\nu > 0,
+
+which is the integral approximated by the quadrature classes with
+:math:`\\alpha = 1 - \\nu`, scaled by :math:`\\Gamma(\\nu)^{-1}`.
+
+Two modes are available.  `'scalar'` evaluates :math:`I^\\nu` at the
+upper limit with any quadrature method of :mod:`~.quadrature`.
+`'series'` evaluates :math:`I^\\nu` at every point of a uniform grid with
+the product trapezoidal rule, whose weights are built from the
+closed forms of :class:`~.quadrature.RiemannSum` as in :mod:`~.fde`.
+The series is a discrete convolution and is computed with a single FFT
+in :math:`O(N\\log N)` operations, so millions of output points are
+practical.  In this mode **f** may also be an array of samples on the
+grid.
+
+Functions:
+    * :func:`~fractional_integral`
+'''
+import numpy as np
+from pyfod import coefficients
+from pyfod import fod
+from pyfod.fde import _abm_weights
+from pyfod.quadrature import _columns
+from pyfod.quadrature import _numeric
+from pyfod.symbolic import is_expression
+from pyfod.utilities import ValidationError
+from pyfod.utilities import check_input
+from pyfod.utilities import check_node_type
+from pyfod.utilities import fft_convolve
+
+
+def fractional_integral(f, lower, upper, order, mode='scalar', steps=1000,
+                        quadrature='GLegRS', **kwargs):
+    '''
+    Riemann-Liouville fractional integral.
+
+    Args:
+        * **f** (def): Function handle.  For `mode='series'` an array of
+          samples on the uniform grid may be given instead, shape
+          (steps+1,) or (steps+1, k).
+        * **lower** (:py:class:`float`): Lower limit - should be zero.
+        * **upper** (:py:class:`float`): Upper limit.
+        * **order** (:py:class:`float`): Order of integration,
+          :math:`\\nu > 0`.
+
+    Kwargs: name (type) - default
+        * **mode** (:py:class:`str`) - `'scalar'`: `'scalar'` for the
+          value at **upper**, or `'series'` for the values at all grid
+          points.
+        * **steps** (:py:class:`int`) - `1000`: Number of grid intervals
+          for `mode='series'`.  Ignored if samples are given.
+        * **quadrature** (:py:class:`str`) - `'glegrs'`: Quadrature method
+          for `mode='scalar'`, or an existing quadrature object, which is
+          remapped with :code:`rebase`.
+        * **kwargs**: Quadrature specific settings.
+
+    Returns: :py:class:`dict`
+        * `fi`: Fractional integral.  For `mode='series'` an array of
+          shape (steps+1,) or (steps+1, k).
+        * `q1`: Quadrature object, `mode='scalar'` only.
+        * `t`: Grid points, `mode='series'` only.
+    '''
+    check_input(f, 'f')
+    if not order > 0:
+        raise ValidationError(str('Invalid value! order must be positive. '
+                                  'order = {}'.format(order)))
+    if mode == 'scalar':
+        return _scalar(f, lower, upper, order, quadrature, **kwargs)
+    if mode == 'series':
+        return _series(f, lower, upper, order, steps)
+    raise ValidationError(str('Invalid mode: {}. '
+                              'Please specify scalar or series.'.format(mode)))
+
+
+def _scalar(f, lower, upper, order, quadrature, **kwargs):
+    # kernel (t-s)^(order-1) is the quadrature kernel with alpha = 1-order
+    if isinstance(quadrature, str):
+        quad = fod._select_quadrature_method(quadrature)
+        quadobj = quad(lower=lower, upper=upper, alpha=1 - order, **kwargs)
+    else:
+        quadobj = quadrature.rebase(lower=lower, upper=upper,
+                                    alpha=1 - order)
+    integral = quadobj.integrate(f=f)
+    with fod._working_precision(quadobj):
+        fi = fod._result(integral/fod._gamma(order, quadobj), quadobj)
+    return dict(fi=fi, q1=quadobj)
+
+
+def _series(f, lower, upper, order, n):
+    if callable(f) or is_expression(f):
+        n = check_node_type(n)
+        t = np.linspace(lower, upper, n + 1)
+        feval = _columns(_numeric(f)(t), n + 1)
+    else:
+        feval = np.asarray(f, dtype=float)
+        if feval.ndim == 0 or feval.shape[0] < 2:
+            raise ValidationError('Expect at least two samples.')
+        n = feval.shape[0] - 1
+        t = np.linspace(lower, upper, n + 1)
+    h = (upper - lower)/n
+    # weights of the corrector of the Adams-Bashforth-Moulton method
+    _, wc, wc0, _ = _abm_weights(n, h, order)
+    fi = fft_convolve(wc[:n + 1], feval)[:n + 1]
+    # the initial point enters with an endpoint weight
+    correction = wc0 - wc[:n + 1]
+    if feval.ndim > 1:
+        correction = correction[:, None]
+    fi += correction*feval[0]
+    fi[0] = 0.0
+    return dict(fi=fi/coefficients.gamma(order), t=t)
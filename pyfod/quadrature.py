@@ -20,25 +20,182 @@ We observe that by setting :math:`\\alpha = 0`, this integral is transformed to
 
 which is applicable to many problems.
 
+Each quadrature object caches its nodes on the unit interval, so it can be
+moved to new limits of integration with :code:`rebase` or :code:`shift`
+instead of being rebuilt.  Recently used weight vectors are kept in a small
+least-recently-used cache, which makes sweeping back and forth between a
+handful of targets (e.g., :math:`t` and :math:`t - \\Delta t`) essentially
+free.
+
+Every class accepts `precision='mp'`, in which case nodes and weights are
+stored as object arrays of mpmath_ :code:`mpf` values with **n_digits**
+significant digits, integrands are compiled for mpmath via
+:mod:`~.symbolic`, and reductions use :code:`mpmath.fdot`.  The base
+Gauss rules are cached across objects, so extended precision only pays for
+the rule generation once per degree and number of digits.
+
+Nodes and weights on the unit interval do not depend on :math:`\\alpha` or
+the limits of integration and are shared, read-only, by all objects with the
+same settings.  :code:`rule()` returns a compact, immutable
+:class:`~QuadratureRule` snapshot of the current nodes and weights, which
+is preferable to keeping whole quadrature objects when many configurations
+are held in memory.
+
+Sympy and mpmath are only imported once an extended precision rule is
+built or a sympy expression is integrated, so float quadrature does not
+pay their import time.
+
+.. _mpmath: http://mpmath.org
+
 Classes:
+    * :class:`~QuadratureRule`
     * :class:`~GaussLegendre`
     * :class:`~GaussLaguerre`
     * :class:`~RiemannSum`
     * :class:`~GaussLegendreRiemannSum`
     * :class:`~GaussLegendreGaussLaguerre`
+    * :class:`~CompositeRule`
 '''
+import contextlib
+import hashlib
 import numpy as np
-import sympy as sp
-from sympy.integrals.quadrature import gauss_gen_laguerre as sp_gauss_laguerre
 from pyfod.utilities import check_alpha
+from pyfod.utilities import check_grading
+from pyfod.utilities import check_grid
+from pyfod.utilities import check_precision
 from pyfod.utilities import check_value
 from pyfod.utilities import check_singularity
 from pyfod.utilities import check_node_type
 from pyfod.utilities import check_range
+from pyfod.utilities import LRUCache
+from pyfod.utilities import ValidationError
+from pyfod.symbolic import compile_integrand
+from pyfod.symbolic import is_expression
+from pyfod import kernels
+
+
+# Number of weight vectors each quadrature object keeps for reuse
+WEIGHT_CACHE_SIZE = 8
+# Extended precision Gauss rules keyed by (family, degree, digits)
+MP_RULES = LRUCache(maxsize=32)
+# Read-only nodes and weights on the unit interval shared across objects
+UNIT_RULES = LRUCache(maxsize=64)
+
+
+# ---------------------
+class _Persistent(object):
+    '''
+    Save and load support shared by quadrature classes and rules, see
+    :mod:`~.serialization`.
+    '''
+    __slots__ = ()
+
+    def save(self, file):
+        '''
+        Save to a versioned `.npz` file.  The integrand is not saved.
+
+        Args:
+            * **file** (:py:class:`str` or file): Destination.
+        '''
+        from pyfod.serialization import save
+        save(self, file)
+
+    @classmethod
+    def load(cls, file):
+        '''
+        Load object saved with :meth:`save`.
+
+        Args:
+            * **file** (:py:class:`str` or file): Source.
+        '''
+        from pyfod.serialization import load
+        obj = load(file)
+        if not isinstance(obj, cls):
+            raise ValidationError(str('File holds {}, not {}'.format(
+                type(obj).__name__, cls.__name__)))
+        return obj
+
+
+# ---------------------
+class QuadratureRule(_Persistent):
+    '''
+    Immutable nodes and weights of a quadrature rule.
+
+    A rule is a compact snapshot of a quadrature object, see
+    :code:`rule()`.  It only holds the evaluation points and weights, as
+    read-only arrays, together with the settings they were generated
+    for.  Rules have no instance dictionary and cannot be modified.
+    Hybrid methods are collapsed into a single set of points and weights,
+    so integration evaluates the integrand once.
+
+    Args:
+        * **points** (:class:`~numpy.ndarray`): Evaluation points.
+        * **weights** (:class:`~numpy.ndarray`): Quadrature weights.
+
+    Kwargs: name (type) - default
+        * **lower** (:py:class:`float`) - `None`: Lower limit of
+          integration.
+        * **upper** (:py:class:`float`) - `None`: Upper limit of
+          integration.
+        * **singularity** (:py:class:`float`) - `None`:
+          Location of singularity.
+        * **alpha** (:py:class:`float`) - `0.0`: Exponent of singular kernel.
+        * **precision** (:py:class:`str`) - `'float'`: Numerical precision,
+          `'float'`, `'mp'` or `'extended'` (mpf storage, float result).
+        * **n_digits** (:py:class:`int`) - `30`: Number of digits if
+          `precision` is not `'float'`.
+    '''
+    __slots__ = ('points', 'weights', 'lower', 'upper', 'singularity',
+                 'alpha', 'precision', 'n_digits')
+
+    def __init__(self, points, weights, lower=None, upper=None,
+                 singularity=None, alpha=0.0, precision='float',
+                 n_digits=30):
+        values = (_read_only(points), _read_only(weights), lower, upper,
+                  singularity, alpha, precision, n_digits)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('QuadratureRule is read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError('QuadratureRule is read-only')
+
+    def __reduce__(self):
+        return (QuadratureRule,
+                tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return str('QuadratureRule(n={}, lower={}, upper={}, alpha={}, '
+                   'precision={!r})'.format(self.points.size, self.lower,
+                                            self.upper, self.alpha,
+                                            self.precision))
+
+    def integrate(self, f, theta=None, chunk_size=None, compensated=False):
+        '''
+        Evaluate the integral.
+
+        Args:
+            * **f** (def): Function handle.  See the quadrature classes
+              for supported output shapes.
+
+        Kwargs: name (type) - default
+            * **theta** (array_like) - `None`: Batch of parameters passed
+              to **f** with the points.
+            * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+              **theta** per call of **f**.  By default all at once.
+            * **compensated** (:py:class:`bool`) - `False`: Compensated
+              reduction, see :func:`~.kernels.compensated_dot`.
+        '''
+        if self.precision != 'float':
+            return _mp_integrate(self, f, self.points, theta)
+        return _apply(self.weights, f, self.points, theta, chunk_size,
+                      compensated)
 
 
 # ---------------------
-class GaussLegendre:
+class GaussLegendre(_Persistent):
     '''
     Gauss-Legendre quadrature.
 
@@ -51,27 +208,90 @@ class GaussLegendre:
         * **f** (def) - `None`: Function handle.
         * **singularity** (:py:class:`float`) - `None`:
           Location of singularity.
+        * **precision** (:py:class:`str`) - `'float'`: Numerical precision,
+          `'float'` or `'mp'`.
+        * **n_digits** (:py:class:`int`) - `30`: Number of digits if
+          `precision='mp'`.
+        * **compensated** (:py:class:`bool`) - `False`: Reduce float
+          weights with :func:`~.kernels.compensated_dot`, as if in twice
+          the working precision.
     '''
     def __init__(self, ndom=5, deg=5, lower=0.0, upper=1.0,
-                 alpha=0.0, f=None, singularity=None):
+                 alpha=0.0, f=None, singularity=None, precision='float',
+                 n_digits=30, compensated=False):
         self.description = 'Gaussian-Legendre Quadrature'
+        self.compensated = compensated
         check_alpha(alpha)
         ndom = check_node_type(ndom)
         deg = check_node_type(deg)
-        h = (upper - lower)/ndom
         self.alpha = alpha
-        self.lower = lower
-        self.upper = upper
         self.f = f
         self.ndom = ndom
         self.deg = deg
-        self.singularity = check_singularity(singularity, self.upper)
-        self.points = self._gauss_points(ndom=ndom, deg=deg, h=h, lower=lower)
-        self.weights = self._gauss_weights(ndom=ndom, deg=deg, h=h)
-        self.initial_weights = self.weights.copy()
+        self.precision = check_precision(precision)
+        self.n_digits = n_digits
+        # nodes and weights on [0, 1], remapped affinely by rebase
+        if self.precision == 'float':
+            self._unit_points, self._unit_weights = _unit_rule(
+                self, ('legendre', ndom, deg, 'float', None),
+                lambda: (self._gauss_points(ndom=ndom, deg=deg,
+                                            h=1.0/ndom, lower=0.0),
+                         self._gauss_weights(ndom=ndom, deg=deg,
+                                             h=1.0/ndom)))
+        else:
+            self._unit_points, self._unit_weights = _unit_rule(
+                self, ('legendre', ndom, deg, 'mp', n_digits),
+                lambda: self._mp_gauss_rule(ndom=ndom, deg=deg,
+                                            n_digits=n_digits))
+        self._weight_cache = LRUCache(maxsize=WEIGHT_CACHE_SIZE)
+        self.points = np.empty_like(self._unit_points)
+        self.initial_weights = np.empty_like(self._unit_weights)
+        self.rebase(lower=lower, upper=upper, singularity=singularity)
+
+    def rebase(self, lower, upper, singularity=None, alpha=None):
+        '''
+        Remap quadrature to new limits of integration.
+
+        The nodes and initial weights are affinely remapped in place
+        from the cached rule on :math:`[0, 1]`, so no new arrays are
+        allocated.  Only the :math:`\\alpha`-dependent singular factor
+        is recomputed.
+
+        Args:
+            * **lower** (:py:class:`float`): Lower limit of integration.
+            * **upper** (:py:class:`float`): Upper limit of integration.
+
+        Kwargs: name (type) - default
+            * **singularity** (:py:class:`float`) - `None`:
+              Location of singularity.
+            * **alpha** (:py:class:`float`) - `None`: Exponent of
+              singular kernel.
+        '''
+        self.lower = lower
+        self.upper = upper
+        self.singularity = check_singularity(singularity, upper)
+        span = upper - lower
+        with _workdps(self):
+            np.multiply(self._unit_points, span, out=self.points)
+            self.points += lower
+            np.multiply(self._unit_weights, span, out=self.initial_weights)
         self.update_weights(alpha=alpha)
+        return self
 
-    def update_weights(self, alpha=None):
+    def shift(self, upper):
+        '''
+        Translate the window of integration so that it ends at **upper**.
+
+        The lower limit and singularity move by the same amount.
+
+        Args:
+            * **upper** (:py:class:`float`): New upper limit of integration.
+        '''
+        delta = upper - self.upper
+        return self.rebase(lower=self.lower + delta, upper=upper,
+                           singularity=self.singularity + delta)
+
+    def update_weights(self, alpha=None, out=None):
         '''
         Update quadrature weights.
 
@@ -82,14 +302,51 @@ class GaussLegendre:
 
         Args:
             * **alpha** (:py:class:`float`): Exponent of singular kernel.
+
+        Kwargs: name (type) - default
+            * **out** (:class:`~numpy.ndarray`) - `None`: Preallocated
+              array the weights are written to.  It becomes
+              :code:`weights` and bypasses the weight cache.
         '''
-        alpha = check_value(alpha, self.alpha, 'fractional order - alpha')
+        if alpha is None:
+            # validated when stored
+            alpha = self.alpha
+        else:
+            check_alpha(alpha)
         self.alpha = alpha
+
         # update weights based on alpha
-        self.weights = self.initial_weights*(
-            self.singularity - self.points)**(-alpha)
+        def compute(out):
+            _kernel('singular_weights', out)(
+                self.initial_weights, self.points, self.singularity,
+                alpha, out)
+        with _workdps(self):
+            self.weights = _reuse_weights(
+                cache=self._weight_cache,
+                key=(self.lower, self.upper, self.singularity, alpha),
+                like=self.points, compute=compute, out=out)
+
+    def rule(self):
+        '''
+        Immutable snapshot of the current nodes and weights.
 
-    def integrate(self, f=None):
+        Returns:
+            * :class:`~QuadratureRule`
+        '''
+        return _make_rule(self, self.points, self.weights)
+
+    def weight_derivative(self):
+        '''
+        Derivative of :code:`weights` with respect to :math:`\\alpha`,
+        :math:`-\\log(b-s_i)\\,w_i(b-s_i)^{-\\alpha}`.
+
+        Returns:
+            * :class:`~numpy.ndarray`, float precision only.
+        '''
+        _check_float(self)
+        return -np.log(self.singularity - self.points)*self.weights
+
+    def integrate(self, f=None, theta=None, chunk_size=None):
         '''
         Evaluate the integral.
 
@@ -98,15 +355,33 @@ class GaussLegendre:
 
         Kwargs: name (type) - default
             * **f** (def) - `None`: Function handle.
+            * **theta** (array_like) - `None`: Batch of parameters passed
+              to **f** with the points.
+            * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+              **theta** per call of **f**.  By default all at once.
 
         .. note::
             The function, **f**, should output an array, with
-            shape (n,) or (n, 1).
+            shape (n,) or (n, 1).  Vector-valued integrands may output
+            shape (n, k), in which case all k channels are reduced
+            with a single matrix product and an array of shape (k,) is
+            returned.  Extended precision requires scalar integrands.
+
+            If **theta** is given, **f** is called as
+            :code:`f(points, theta)` and should output an array of shape
+            (n_theta, n), one row per parameter set.  The rows are
+            reduced with a single matrix-vector product and an array of
+            shape (n_theta,) is returned.  For space-time fields **theta**
+            holds the spatial points, shape (n_space, ...), and
+            **chunk_size** bounds the memory to chunk_size x n values.
         '''
-        f = check_value(f, self.f, 'function - f')
+        if f is None:
+            f = check_value(f, self.f, 'function - f')
         self.f = f
-        feval = f(self.points).reshape(self.weights.shape)
-        return (self.weights*feval).sum()
+        if self.precision != 'float':
+            return _mp_integrate(self, f, self.points, theta)
+        return _apply(self.weights, f, self.points, theta, chunk_size,
+                      self.compensated)
 
     @classmethod
     def _base_gauss_points(cls, deg):
@@ -123,12 +398,9 @@ class GaussLegendre:
     @classmethod
     def _interval_gauss_points(cls, base_gpts, ndom, deg, h, lower):
         # determines the Gauss points for all ndom intervals.
-        gpts = np.zeros([deg*ndom])
-        for gct in range(ndom):
-            for ell in range(deg):
-                gpts[(gct)*deg + ell] = ((gct)*h
-                                         + base_gpts[ell]*h + lower)
-        return gpts
+        offsets = np.arange(ndom)[:, None]*h
+        gpts = offsets + base_gpts[:deg]*h + lower
+        return gpts.ravel()
 
     def _gauss_points(self, ndom, deg, h, lower):
         # base points
@@ -146,9 +418,20 @@ class GaussLegendre:
             weights = np.concatenate((weights, w))
         return weights
 
+    @classmethod
+    def _mp_gauss_rule(cls, ndom, deg, n_digits):
+        # composite rule on [0, 1] as mpf object arrays
+        import mpmath
+        base_gpts, base_gwts = _mp_rule('legendre', deg, n_digits)
+        with mpmath.workdps(n_digits):
+            offsets = np.arange(ndom, dtype=object)[:, None]
+            gpts = ((offsets + (base_gpts + 1)/2)/ndom).ravel()
+            gwts = np.tile(base_gwts/(2*ndom), ndom)
+        return gpts, gwts
+
 
 # ---------------------
-class GaussLaguerre:
+class GaussLaguerre(_Persistent):
     '''
     Gauss-Laguerre quadrature.
 
@@ -159,39 +442,66 @@ class GaussLaguerre:
         * **alpha** (:py:class:`float`) - `0.0`: Exponent of singular kernel.
         * **f** (def) - `None`: Function handle.
         * **extend_precision** (:py:class:`bool`) - `True`: Flag to use
-          sympy extended precision.
+          extended precision.  Nodes and weights are stored as for
+          `precision='mp'`, but :meth:`integrate` returns a
+          :py:class:`float`.
         * **n_digits** (:py:class:`int`) - `30`: Number of digits in extended
           precision.
         * **singularity** (:py:class:`float`) - `None`:
           Location of singularity.
+        * **precision** (:py:class:`str`) - `None`: Numerical precision,
+          `'float'` or `'mp'`.  Overrides **extend_precision** if defined.
+        * **compensated** (:py:class:`bool`) - `False`: Reduce float
+          weights with :func:`~.kernels.compensated_dot`, as if in twice
+          the working precision.
     '''
     def __init__(self, deg=5, lower=0.0, upper=1.0, alpha=0.0,
                  f=None, extend_precision=True, n_digits=30,
-                 singularity=None):
+                 singularity=None, precision=None, compensated=False):
         self.description = 'Gaussian-Laguerre Quadrature'
+        self.compensated = compensated
         deg = check_node_type(deg)
         self.lower = lower
         self.upper = upper
-        self.alpha = alpha
+        self.alpha = check_value(alpha, None, 'fractional order - alpha')
         self.deg = deg
         self.singularity = check_singularity(singularity, self.upper)
         self.f = f
-        if extend_precision is False:
-            points, weights = np.polynomial.laguerre.laggauss(deg=deg)
-            self.points = 1 - np.exp(-points)
+        self.n_digits = n_digits
+        if precision is not None:
+            self.precision = check_precision(precision)
+        elif extend_precision is False:
+            self.precision = 'float'
         else:
-            points, weights = sp_gauss_laguerre(
-                n=deg, n_digits=n_digits, alpha=0)
-            points = [-p for p in points]
-            points = sp.Array(points)
-            self.points = sp.Array(
-                np.ones(shape=len(points))) - points.applyfunc(sp.exp)
-            weights = sp.Array(weights)
-        self.weights = weights
-        self.initial_weights = weights.copy()
+            # mpf nodes and weights, float result
+            self.precision = 'extended'
+        self._weight_cache = LRUCache(maxsize=WEIGHT_CACHE_SIZE)
+        # nodes and weights are independent of limits and shared
+        if self.precision == 'float':
+            self.points, self.initial_weights = _unit_rule(
+                self, ('laguerre', deg, 'float', None),
+                lambda: self._laguerre_rule(deg))
+        else:
+            self.points, self.initial_weights = _unit_rule(
+                self, ('laguerre', deg, 'mp', n_digits),
+                lambda: self._mp_laguerre_rule(deg, n_digits))
+        self.weights = self.initial_weights
         self.update_weights(alpha=alpha)
 
-    def integrate(self, f=None):
+    @classmethod
+    def _laguerre_rule(cls, deg):
+        points, weights = np.polynomial.laguerre.laggauss(deg=deg)
+        return 1 - np.exp(-points), weights
+
+    @classmethod
+    def _mp_laguerre_rule(cls, deg, n_digits):
+        import mpmath
+        points, weights = _mp_rule('laguerre', deg, n_digits)
+        with mpmath.workdps(n_digits):
+            points = 1 - np.frompyfunc(mpmath.exp, 1, 1)(-points)
+        return points, weights
+
+    def integrate(self, f=None, theta=None, chunk_size=None):
         '''
         Evaluate the integral.
 
@@ -200,31 +510,40 @@ class GaussLaguerre:
 
         Kwargs: name (type) - default
             * **f** (def) - `None`: Function handle.
+            * **theta** (array_like) - `None`: Batch of parameters passed
+              to **f** with the points.
+            * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+              **theta** per call of **f**.  By default all at once.
 
         .. note::
             The function, **f**, should output an array, with
-            shape (n,) or (n, 1).
+            shape (n,) or (n, 1).  Vector-valued integrands may output
+            shape (n, k), in which case all k channels are reduced
+            with a single matrix product and an array of shape (k,) is
+            returned.  Extended precision requires scalar integrands.
+
+            If **theta** is given, **f** is called as
+            :code:`f(points, theta)` and should output an array of shape
+            (n_theta, n), one row per parameter set.  The rows are
+            reduced with a single matrix-vector product and an array of
+            shape (n_theta,) is returned.  For space-time fields **theta**
+            holds the spatial points, shape (n_space, ...), and
+            **chunk_size** bounds the memory to chunk_size x n values.
         '''
-        f = check_value(f, self.f, 'function - f')
+        if f is None:
+            f = check_value(f, self.f, 'function - f')
         self.f = f
         # transform kernel
         span = self.upper - self.lower
-        # check if sympy
-        if isinstance(self.points, sp.Array):
-            evalpoints = self.points.applyfunc(
-                lambda x: span*x + self.lower)
-            feval = evalpoints.applyfunc(f)
-            s = 0
-            for _, (w, f) in enumerate(zip(self.weights, feval)):
-                s += w*f
-            return np.float(s)
+        if self.precision != 'float':
+            with _workdps(self):
+                evalpoints = self.points*span + self.lower
+            return _mp_integrate(self, f, evalpoints, theta)
         else:
-            feval = f(span*self.points + self.lower).reshape(
-                    self.weights.shape)
-            s = (self.weights*(feval)).sum()
-            return s
+            return _apply(self.weights, f, span*self.points + self.lower,
+                          theta, chunk_size, self.compensated)
 
-    def update_weights(self, alpha=None):
+    def update_weights(self, alpha=None, out=None):
         '''
         Update quadrature weights.
 
@@ -235,55 +554,176 @@ class GaussLaguerre:
 
         Args:
             * **alpha** (:py:class:`float`): Exponent of singular kernel.
+
+        Kwargs: name (type) - default
+            * **out** (:class:`~numpy.ndarray`) - `None`: Preallocated
+              array the weights are written to.  It becomes
+              :code:`weights` and bypasses the weight cache.
         '''
-        alpha = check_value(alpha, self.alpha, 'fractional order - alpha')
+        if alpha is None:
+            alpha = self.alpha
         self.alpha = alpha
         span = self.singularity - self.lower
-        # check if sympy
-        if isinstance(self.points, sp.Array):
-            coef = self.points.applyfunc(
-                lambda x: span**(1-alpha)*(1-x)**(-alpha))
-            wtmp = []
-            for _, (c, w) in enumerate(zip(coef, self.initial_weights)):
-                wtmp.append(c*w)
-            self.weights = sp.Array(wtmp)
-        else:
-            coef = span**(1-alpha)*(1-self.points)**(-alpha)
-            self.weights = self.initial_weights*coef
+
+        def compute(out):
+            scale = _scalar(self, span)**(1-alpha)
+            _kernel('laguerre_weights', out)(
+                self.initial_weights, self.points, scale, alpha, out)
+        with _workdps(self):
+            self.weights = _reuse_weights(
+                cache=self._weight_cache, key=(span, alpha),
+                like=self.points, compute=compute, out=out)
+
+    def rule(self):
+        '''
+        Immutable snapshot of the current nodes and weights.
+
+        The nodes of the rule are the evaluation points on
+        [**lower**, **upper**].
+
+        Returns:
+            * :class:`~QuadratureRule`
+        '''
+        with _workdps(self):
+            points = self.points*(self.upper - self.lower) + self.lower
+        return _make_rule(self, points, self.weights)
+
+    def weight_derivative(self):
+        '''
+        Derivative of :code:`weights` with respect to :math:`\\alpha`,
+        :math:`-\\log(c(1-x_i))\\,w_i` for the weights
+        :math:`w_i = c^{1-\\alpha}\\hat{w}_i(1-x_i)^{-\\alpha}` with
+        :math:`c = b - t_0`.
+
+        Returns:
+            * :class:`~numpy.ndarray`, float precision only.
+        '''
+        _check_float(self)
+        span = self.singularity - self.lower
+        return -np.log(span*(1 - self.points))*self.weights
+
+    def rebase(self, lower, upper, singularity=None, alpha=None):
+        '''
+        Remap quadrature to new limits of integration.
+
+        The Gauss-Laguerre nodes are stored on :math:`[0, 1)` and mapped
+        to the limits of integration during :meth:`integrate`, so only
+        the singular factor of the weights needs to be recomputed.
+
+        Args:
+            * **lower** (:py:class:`float`): Lower limit of integration.
+            * **upper** (:py:class:`float`): Upper limit of integration.
+
+        Kwargs: name (type) - default
+            * **singularity** (:py:class:`float`) - `None`:
+              Location of singularity.
+            * **alpha** (:py:class:`float`) - `None`: Exponent of
+              singular kernel.
+        '''
+        self.lower = lower
+        self.upper = upper
+        self.singularity = check_singularity(singularity, upper)
+        self.update_weights(alpha=alpha)
+        return self
+
+    def shift(self, upper):
+        '''
+        Translate the window of integration so that it ends at **upper**.
+
+        The lower limit and singularity move by the same amount.
+
+        Args:
+            * **upper** (:py:class:`float`): New upper limit of integration.
+        '''
+        delta = upper - self.upper
+        return self.rebase(lower=self.lower + delta, upper=upper,
+                           singularity=self.singularity + delta)
 
 
 # ---------------------
-class RiemannSum(object):
+class RiemannSum(_Persistent):
     '''
     Riemann-Sum quadrature.
 
+    The grid is uniform by default.  With **grading** :math:`r > 1` the
+    grid points
+
+    .. math::
+
+        s_j = t_0 + (t - t_0)\\Big[1 - \\Big(1 - \\frac{j}{n-1}\\Big)^r\\Big]
+
+    cluster toward the upper limit, where the singularity is located by
+    default, so fewer intervals are needed for a given accuracy.  The
+    weights require a singularity at or beyond the upper limit, which is
+    then the point of the interval closest to it, so a graded grid with
+    a singularity inside the interval is rejected.  An
+    arbitrary strictly increasing **grid** may be given instead; it is
+    normalized to :math:`[0, 1]` and remapped to :math:`[t_0, t]`, so a
+    grid already spanning the limits of integration is used as is.  The
+    weights are exact for the singular kernel on any grid.
+
     Kwargs: name (type) - default
-        * **n** (:py:class:`int`) - `5`: Number of quadrature intervals.
+        * **n** (:py:class:`int`) - `5`: Number of grid points, i.e.,
+          n-1 quadrature intervals.
         * **lower** (:py:class:`float`) - `0.0`: Lower limit of integration.
         * **upper** (:py:class:`float`) - `1.0`: Upper limit of integration.
         * **alpha** (:py:class:`float`) - `0.0`: Exponent of singular kernel.
         * **f** (def) - `None`: Function handle.
         * **singularity** (:py:class:`float`) - `None`:
           Location of singularity.
+        * **precision** (:py:class:`str`) - `'float'`: Numerical precision,
+          `'float'` or `'mp'`.
+        * **n_digits** (:py:class:`int`) - `30`: Number of digits if
+          `precision='mp'`.
+        * **grading** (:py:class:`float`) - `1.0`: Grading exponent,
+          :math:`r`.  The grid is uniform for `1.0`, otherwise it is
+          graded toward **upper** and **singularity** must not be less
+          than **upper**.
+        * **grid** (array_like) - `None`: User-defined grid.  If provided,
+          **n** and **grading** are ignored.
+        * **compensated** (:py:class:`bool`) - `False`: Reduce float
+          weights with :func:`~.kernels.compensated_dot`, as if in twice
+          the working precision.
     '''
     def __init__(self, n=5, lower=0.0, upper=1.0, alpha=0.0, f=None,
-                 singularity=None):
+                 singularity=None, precision='float', n_digits=30,
+                 grading=1.0, grid=None, compensated=False):
         self.description = 'Riemann-Sum'
+        self.compensated = compensated
         check_alpha(alpha=alpha)
-        n = check_node_type(n)
         self.alpha = alpha
         self.f = f
-        self.n = n
-        self.lower = lower
-        self.upper = upper
-        self.singularity = check_singularity(singularity, self.upper)
-        self.grid = self._rs_grid(lower, upper, n)
-        self.points = self._rs_points(grid=self.grid)
-        self.weights = self._rs_weights(grid=self.grid,
-                                        singularity=self.singularity,
-                                        alpha=alpha)
-
-    def update_weights(self, alpha=None):
+        self.precision = check_precision(precision)
+        self.n_digits = n_digits
+        self.custom_grid = grid is not None
+        # grid on [0, 1], remapped affinely by rebase
+        if self.custom_grid:
+            unit = self._unit_grid_of(check_grid(grid), self.precision,
+                                      n_digits)
+            self.grading = 1.0
+            self.n = unit.size
+            self._unit_grid, = _unit_rule(
+                self, ('grid', unit.size, _digest(unit), self.precision,
+                       None if self.precision == 'float' else n_digits),
+                lambda: (unit,))
+        else:
+            self.grading = check_grading(grading)
+            self.n = n = check_node_type(n)
+            if self.precision == 'float':
+                self._unit_grid, = _unit_rule(
+                    self, ('grid', n, self.grading, 'float', None),
+                    lambda: (self._rs_grid(0.0, 1.0, n, self.grading),))
+            else:
+                self._unit_grid, = _unit_rule(
+                    self, ('grid', n, self.grading, 'mp', n_digits),
+                    lambda: (self._mp_rs_grid(n, n_digits, self.grading),))
+        self._weight_cache = LRUCache(maxsize=WEIGHT_CACHE_SIZE)
+        self._work = np.empty_like(self._unit_grid)
+        self.grid = np.empty_like(self._unit_grid)
+        self.points = self._rs_points(grid=self._unit_grid)
+        self.rebase(lower=lower, upper=upper, singularity=singularity)
+
+    def update_weights(self, alpha=None, out=None):
         '''
         Update quadrature weights.
 
@@ -294,15 +734,98 @@ class RiemannSum(object):
 
         Args:
             * **alpha** (:py:class:`float`): Exponent of singular kernel.
+
+        Kwargs: name (type) - default
+            * **out** (:class:`~numpy.ndarray`) - `None`: Preallocated
+              array the weights are written to.  It becomes
+              :code:`weights` and bypasses the weight cache.
         '''
-        alpha = check_value(alpha, self.alpha, 'fractional order - alpha')
-        check_alpha(alpha=alpha)
+        if alpha is None:
+            # validated when stored
+            alpha = self.alpha
+        else:
+            check_alpha(alpha=alpha)
         self.alpha = alpha
-        self.weights = self._rs_weights(grid=self.grid,
-                                        singularity=self.singularity,
-                                        alpha=alpha)
 
-    def integrate(self, f=None):
+        def compute(out):
+            self._rs_weights(grid=self.grid, singularity=self.singularity,
+                             alpha=alpha, out=out, work=self._work)
+        with _workdps(self):
+            self.weights = _reuse_weights(
+                cache=self._weight_cache,
+                key=(self.lower, self.upper, self.singularity, alpha),
+                like=self.points, compute=compute, out=out)
+
+    def rule(self):
+        '''
+        Immutable snapshot of the current nodes and weights.
+
+        Returns:
+            * :class:`~QuadratureRule`
+        '''
+        return _make_rule(self, self.points, self.weights)
+
+    def weight_derivative(self):
+        '''
+        Derivative of :code:`weights` with respect to :math:`\\alpha`,
+        from the closed form of the interval integrals.
+
+        Returns:
+            * :class:`~numpy.ndarray`, float precision only.
+        '''
+        _check_float(self)
+        return _rs_weight_derivative(self.singularity - self.grid,
+                                     self.weights, self.alpha)
+
+    def rebase(self, lower, upper, singularity=None, alpha=None):
+        '''
+        Remap quadrature to new limits of integration.
+
+        The grid and midpoints are affinely remapped in place from the
+        cached grid on :math:`[0, 1]`, so no new arrays are allocated.
+        Only the :math:`\\alpha`-dependent weights are recomputed.
+
+        Args:
+            * **lower** (:py:class:`float`): Lower limit of integration.
+            * **upper** (:py:class:`float`): Upper limit of integration.
+
+        Kwargs: name (type) - default
+            * **singularity** (:py:class:`float`) - `None`:
+              Location of singularity.
+            * **alpha** (:py:class:`float`) - `None`: Exponent of
+              singular kernel.
+        '''
+        singularity = check_singularity(singularity, upper)
+        if self.grading != 1.0 and singularity < upper:
+            raise ValidationError(str(
+                'Graded grids cluster toward the upper limit and require '
+                'singularity >= upper. singularity = {}, upper = {}'.format(
+                    singularity, upper)))
+        self.lower = lower
+        self.upper = upper
+        self.singularity = singularity
+        with _workdps(self):
+            np.multiply(self._unit_grid, upper - lower, out=self.grid)
+            self.grid += lower
+            np.add(self.grid[1:], self.grid[:-1], out=self.points)
+            self.points /= 2
+        self.update_weights(alpha=alpha)
+        return self
+
+    def shift(self, upper):
+        '''
+        Translate the window of integration so that it ends at **upper**.
+
+        The lower limit and singularity move by the same amount.
+
+        Args:
+            * **upper** (:py:class:`float`): New upper limit of integration.
+        '''
+        delta = upper - self.upper
+        return self.rebase(lower=self.lower + delta, upper=upper,
+                           singularity=self.singularity + delta)
+
+    def integrate(self, f=None, theta=None, chunk_size=None):
         '''
         Evaluate the integral.
 
@@ -311,19 +834,68 @@ class RiemannSum(object):
 
         Kwargs: name (type) - default
             * **f** (def) - `None`: Function handle.
+            * **theta** (array_like) - `None`: Batch of parameters passed
+              to **f** with the points.
+            * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+              **theta** per call of **f**.  By default all at once.
 
         .. note::
             The function, **f**, should output an array, with
-            shape (n,) or (n, 1).
+            shape (n,) or (n, 1).  Vector-valued integrands may output
+            shape (n, k), in which case all k channels are reduced
+            with a single matrix product and an array of shape (k,) is
+            returned.  Extended precision requires scalar integrands.
+
+            If **theta** is given, **f** is called as
+            :code:`f(points, theta)` and should output an array of shape
+            (n_theta, n), one row per parameter set.  The rows are
+            reduced with a single matrix-vector product and an array of
+            shape (n_theta,) is returned.  For space-time fields **theta**
+            holds the spatial points, shape (n_space, ...), and
+            **chunk_size** bounds the memory to chunk_size x n values.
         '''
-        f = check_value(f, self.f, 'function - f')
+        if f is None:
+            f = check_value(f, self.f, 'function - f')
         self.f = f
-        feval = f(self.points).reshape(self.weights.shape)
-        return (self.weights*feval).sum()
+        if self.precision != 'float':
+            return _mp_integrate(self, f, self.points, theta)
+        return _apply(self.weights, f, self.points, theta, chunk_size,
+                      self.compensated)
 
     @classmethod
-    def _rs_grid(cls, lower, upper, n):
-        return np.linspace(start=lower, stop=upper, num=n)
+    def _rs_grid(cls, lower, upper, n, grading=1.0):
+        if grading == 1.0:
+            return np.linspace(start=lower, stop=upper, num=n)
+        # graded toward upper, end points are kept exactly
+        grid = 1.0 - (1.0 - np.linspace(0.0, 1.0, num=n))**grading
+        grid = lower + (upper - lower)*grid
+        grid[-1] = upper
+        return grid
+
+    @classmethod
+    def _mp_rs_grid(cls, n, n_digits, grading=1.0):
+        import mpmath
+        with mpmath.workdps(n_digits):
+            grid = mpmath.linspace(0, 1, n)
+            if grading != 1.0:
+                grading = mpmath.mpf(grading)
+                grid = [1 - (1 - x)**grading for x in grid]
+            return np.array(grid, dtype=object)
+
+    @classmethod
+    def _unit_grid_of(cls, grid, precision, n_digits):
+        # normalize user grid to [0, 1]
+        if precision == 'float':
+            grid = np.asarray(grid, dtype=float)
+            unit = (grid - grid[0])/(grid[-1] - grid[0])
+            unit[-1] = 1.0
+            return unit
+        import mpmath
+        with mpmath.workdps(n_digits):
+            grid = [mpmath.mpf(x) for x in grid]
+            unit = [(x - grid[0])/(grid[-1] - grid[0]) for x in grid]
+            unit[-1] = mpmath.mpf(1)
+            return np.array(unit, dtype=object)
 
     @classmethod
     def _rs_points(cls, grid):
@@ -331,15 +903,17 @@ class RiemannSum(object):
         return (grid[1:jj+1] + grid[0:jj])/2
 
     @classmethod
-    def _rs_weights(cls, grid, singularity, alpha=0.0):
-        jj = grid.size - 1
-        term1 = (singularity - grid[1:jj+1])**(1-alpha)
-        term2 = (singularity - grid[0:jj])**(1-alpha)
-        return -1/(1-alpha)*(term1 - term2)
+    def _rs_weights(cls, grid, singularity, alpha=0.0, out=None, work=None):
+        # work holds (singularity - grid)**(1-alpha) for every grid point
+        if work is None:
+            work = np.empty_like(grid)
+        if out is None:
+            out = np.empty(grid.size - 1, dtype=grid.dtype)
+        return _kernel('rs_weights', out)(grid, singularity, alpha, out, work)
 
 
 # ---------------------
-class GaussLegendreRiemannSum(object):
+class GaussLegendreRiemannSum(_Persistent):
     '''
     Gauss-Legendre, Riemann-Sum quadrature.
 
@@ -357,27 +931,44 @@ class GaussLegendreRiemannSum(object):
         * **upper** (:py:class:`float`) - `1.0`: Upper limit of integration.
         * **alpha** (:py:class:`float`) - `0.0`: Exponent of singular kernel.
         * **f** (def) - `None`: Function handle.
+        * **precision** (:py:class:`str`) - `'float'`: Numerical precision,
+          `'float'` or `'mp'`.
+        * **n_digits** (:py:class:`int`) - `30`: Number of digits if
+          `precision='mp'`.
+        * **grading** (:py:class:`float`) - `1.0`: Grading exponent of the
+          Riemann-Sum grid, see :class:`~RiemannSum`.
+        * **compensated** (:py:class:`bool`) - `False`: Reduce float
+          weights with :func:`~.kernels.compensated_dot`, as if in twice
+          the working precision.
     '''
     def __init__(self, ndom=5, deg=4, nrs=20, percent=0.9, ts=None,
-                 lower=0.0, upper=1.0, alpha=0.0, f=None):
+                 lower=0.0, upper=1.0, alpha=0.0, f=None, precision='float',
+                 n_digits=30, grading=1.0, compensated=False):
         self.description = 'Gaussian Quadrature, Riemann-Sum'
+        self.compensated = compensated
+        self.precision = check_precision(precision)
+        self.n_digits = n_digits
+        self.alpha = alpha
+        self.percent = percent
+        self.ts = ts
+        self.f = f
+        self.lower = lower
+        self.upper = upper
         # setup GQ points/weights
-        if ts is not None:
-            switch_time = check_range(lower, upper, ts)
-        else:
-            switch_time = (upper - lower)*percent + lower
+        switch_time = _switch_time(lower, upper, percent, ts)
         self.gleg = GaussLegendre(ndom=ndom, deg=deg, lower=lower,
                                   upper=switch_time, alpha=alpha,
-                                  singularity=upper, f=f)
+                                  singularity=upper, f=f,
+                                  precision=precision, n_digits=n_digits,
+                                  compensated=compensated)
         # setup RS points/weights
         self.rs = RiemannSum(n=nrs, lower=switch_time,
-                             upper=upper, alpha=alpha, f=f)
-        self.alpha = alpha
-        self.percent = percent
-        self.f = f
+                             upper=upper, alpha=alpha, f=f,
+                             precision=precision, n_digits=n_digits,
+                             grading=grading, compensated=compensated)
         self.switch_time = switch_time
 
-    def integrate(self, f=None):
+    def integrate(self, f=None, theta=None, chunk_size=None):
         '''
         Evaluate the integral.
 
@@ -386,16 +977,36 @@ class GaussLegendreRiemannSum(object):
 
         Kwargs: name (type) - default
             * **f** (def) - `None`: Function handle.
+            * **theta** (array_like) - `None`: Batch of parameters passed
+              to **f** with the points.
+            * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+              **theta** per call of **f**.  By default all at once.
 
         .. note::
             The function, **f**, should output an array, with
-            shape (n,) or (n, 1).
+            shape (n,) or (n, 1).  Vector-valued integrands may output
+            shape (n, k), in which case all k channels are reduced
+            with a single matrix product and an array of shape (k,) is
+            returned.  Extended precision requires scalar integrands.
+
+            If **theta** is given, **f** is called as
+            :code:`f(points, theta)` and should output an array of shape
+            (n_theta, n), one row per parameter set.  The rows are
+            reduced with a single matrix-vector product and an array of
+            shape (n_theta,) is returned.  For space-time fields **theta**
+            holds the spatial points, shape (n_space, ...), and
+            **chunk_size** bounds the memory to chunk_size x n values.
         '''
-        f = check_value(f, self.f, 'function - f')
+        if f is None:
+            f = check_value(f, self.f, 'function - f')
         self.f = f
-        return self.gleg.integrate(f=f) + self.rs.integrate(f=f)
+        with _workdps(self):
+            return (self.gleg.integrate(f=f, theta=theta,
+                                        chunk_size=chunk_size)
+                    + self.rs.integrate(f=f, theta=theta,
+                                        chunk_size=chunk_size))
 
-    def update_weights(self, alpha=None):
+    def update_weights(self, alpha=None, out=None):
         '''
         Update quadrature weights.
 
@@ -406,15 +1017,101 @@ class GaussLegendreRiemannSum(object):
 
         Args:
             * **alpha** (:py:class:`float`): Exponent of singular kernel.
+
+        Kwargs: name (type) - default
+            * **out** (:class:`~numpy.ndarray`) - `None`: Preallocated
+              array holding the weights of both sub-quadratures, in
+              order.  Each sub-quadrature writes to its part of **out**.
+        '''
+        if alpha is None:
+            alpha = self.alpha
+        self.alpha = alpha
+        out1, out2 = _split(out, self.gleg.points.size)
+        self.gleg.update_weights(alpha=alpha, out=out1)
+        self.rs.update_weights(alpha=alpha, out=out2)
+
+    def rule(self):
+        '''
+        Immutable snapshot of the current nodes and weights.
+
+        Both sub-quadratures are merged into a single rule.  Extended
+        precision Gauss-Laguerre nodes and weights are rounded to float
+        if the Gauss-Legendre part is float.
+
+        Returns:
+            * :class:`~QuadratureRule`
+        '''
+        return _merge_rules(self, self.gleg.rule(), self.rs.rule())
+
+    def composite(self):
+        '''
+        Composite rule with separate base rules for both regions, which
+        is remapped to new limits, switch times and :math:`\\alpha`
+        without rebuilding the sub-quadratures.
+
+        Returns:
+            * :class:`~CompositeRule`, float precision only.
+        '''
+        return CompositeRule(self)
+
+    def weight_derivative(self):
+        '''
+        Derivative of :code:`weights` with respect to :math:`\\alpha`,
+        in the order of the nodes of :meth:`rule`.
+
+        Returns:
+            * :class:`~numpy.ndarray`, float precision only.
+        '''
+        _check_float(self)
+        return np.concatenate((self.gleg.weight_derivative(),
+                               self.rs.weight_derivative()))
+
+    def rebase(self, lower, upper, alpha=None):
+        '''
+        Remap quadrature to new limits of integration.
+
+        The switch time is recomputed from **percent**, or kept at the
+        user-defined **ts**, and both sub-quadratures are remapped in
+        place.
+
+        Args:
+            * **lower** (:py:class:`float`): Lower limit of integration.
+            * **upper** (:py:class:`float`): Upper limit of integration.
+
+        Kwargs: name (type) - default
+            * **alpha** (:py:class:`float`) - `None`: Exponent of
+              singular kernel.
         '''
-        alpha = check_value(alpha, self.alpha, 'fractional order - alpha')
+        if alpha is None:
+            alpha = self.alpha
+        switch_time = _switch_time(lower, upper, self.percent, self.ts)
         self.alpha = alpha
-        self.gleg.update_weights(alpha=alpha)
-        self.rs.update_weights(alpha=alpha)
+        self.lower = lower
+        self.upper = upper
+        self.switch_time = switch_time
+        self.gleg.rebase(lower=lower, upper=switch_time,
+                         singularity=upper, alpha=alpha)
+        self.rs.rebase(lower=switch_time, upper=upper, alpha=alpha)
+        return self
+
+    def shift(self, upper):
+        '''
+        Translate the window of integration so that it ends at **upper**.
+
+        The lower limit and a user-defined switch time move by the same
+        amount.
+
+        Args:
+            * **upper** (:py:class:`float`): New upper limit of integration.
+        '''
+        delta = upper - self.upper
+        if self.ts is not None:
+            self.ts += delta
+        return self.rebase(lower=self.lower + delta, upper=upper)
 
 
 # ---------------------
-class GaussLegendreGaussLaguerre(object):
+class GaussLegendreGaussLaguerre(_Persistent):
     '''
     Gauss-Legendre, Gauss-Laguerre quadrature.
 
@@ -433,32 +1130,49 @@ class GaussLegendreGaussLaguerre(object):
         * **alpha** (:py:class:`float`) - `0.0`: Exponent of singular kernel.
         * **f** (def) - `None`: Function handle.
         * **extend_precision** (:py:class:`bool`) - `True`: Flag to use
-          sympy extended precision.
+          extended precision for Gauss-Laguerre quadrature.
         * **n_digits** (:py:class:`int`) - `30`: Number of digits in extended
           precision.
+        * **precision** (:py:class:`str`) - `None`: Numerical precision
+          of both sub-quadratures, `'float'` or `'mp'`.  Overrides
+          **extend_precision** if defined.
+        * **compensated** (:py:class:`bool`) - `False`: Reduce float
+          weights with :func:`~.kernels.compensated_dot`, as if in twice
+          the working precision.
     '''
     def __init__(self, ndom=5, gleg_deg=4, glag_deg=20, percent=0.9, ts=None,
                  lower=0.0, upper=1.0, alpha=0.0, f=None,
-                 extend_precision=True, n_digits=30):
+                 extend_precision=True, n_digits=30, precision=None,
+                 compensated=False):
         self.description = 'Hybrid: Gauss-Legendre, Gauss-Laguerre'
+        self.compensated = compensated
+        if precision is not None:
+            precision = check_precision(precision)
+        self.n_digits = n_digits
+        self.alpha = alpha
+        self.percent = percent
+        self.ts = ts
+        self.f = f
+        self.lower = lower
+        self.upper = upper
         # setup GLeg points/weights
-        if ts is not None:
-            switch_time = check_range(lower, upper, ts)
-        else:
-            switch_time = (upper - lower)*percent + lower
+        switch_time = _switch_time(lower, upper, percent, ts)
         self.gleg = GaussLegendre(ndom=ndom, deg=gleg_deg, lower=lower,
                                   upper=switch_time, alpha=alpha,
-                                  singularity=upper, f=f)
+                                  singularity=upper, f=f,
+                                  precision=precision or 'float',
+                                  n_digits=n_digits, compensated=compensated)
         # setup GLag points/weights
         self.glag = GaussLaguerre(deg=glag_deg, lower=switch_time,
                                   upper=upper, alpha=alpha, f=f,
                                   extend_precision=extend_precision,
-                                  n_digits=n_digits)
-        self.alpha = alpha
-        self.percent = percent
-        self.f = f
+                                  n_digits=n_digits, precision=precision,
+                                  compensated=compensated)
+        # float result unless both sub-quadratures are mp
+        self.precision = precision or 'float'
+        self.switch_time = switch_time
 
-    def integrate(self, f=None):
+    def integrate(self, f=None, theta=None, chunk_size=None):
         '''
         Evaluate the integral.
 
@@ -467,16 +1181,36 @@ class GaussLegendreGaussLaguerre(object):
 
         Kwargs: name (type) - default
             * **f** (def) - `None`: Function handle.
+            * **theta** (array_like) - `None`: Batch of parameters passed
+              to **f** with the points.
+            * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+              **theta** per call of **f**.  By default all at once.
 
         .. note::
             The function, **f**, should output an array, with
-            shape (n,) or (n, 1).
+            shape (n,) or (n, 1).  Vector-valued integrands may output
+            shape (n, k), in which case all k channels are reduced
+            with a single matrix product and an array of shape (k,) is
+            returned.  Extended precision requires scalar integrands.
+
+            If **theta** is given, **f** is called as
+            :code:`f(points, theta)` and should output an array of shape
+            (n_theta, n), one row per parameter set.  The rows are
+            reduced with a single matrix-vector product and an array of
+            shape (n_theta,) is returned.  For space-time fields **theta**
+            holds the spatial points, shape (n_space, ...), and
+            **chunk_size** bounds the memory to chunk_size x n values.
         '''
-        f = check_value(f, self.f, 'function - f')
+        if f is None:
+            f = check_value(f, self.f, 'function - f')
         self.f = f
-        return self.gleg.integrate(f=f) + self.glag.integrate(f=f)
+        with _workdps(self):
+            return (self.gleg.integrate(f=f, theta=theta,
+                                        chunk_size=chunk_size)
+                    + self.glag.integrate(f=f, theta=theta,
+                                          chunk_size=chunk_size))
 
-    def update_weights(self, alpha=None):
+    def update_weights(self, alpha=None, out=None):
         '''
         Update quadrature weights.
 
@@ -487,8 +1221,589 @@ class GaussLegendreGaussLaguerre(object):
 
         Args:
             * **alpha** (:py:class:`float`): Exponent of singular kernel.
+
+        Kwargs: name (type) - default
+            * **out** (:class:`~numpy.ndarray`) - `None`: Preallocated
+              array holding the weights of both sub-quadratures, in
+              order.  Each sub-quadrature writes to its part of **out**.
         '''
-        alpha = check_value(alpha, self.alpha, 'fractional order - alpha')
+        if alpha is None:
+            alpha = self.alpha
         self.alpha = alpha
-        self.gleg.update_weights(alpha=alpha)
-        self.glag.update_weights(alpha=alpha)
+        out1, out2 = _split(out, self.gleg.points.size)
+        self.gleg.update_weights(alpha=alpha, out=out1)
+        self.glag.update_weights(alpha=alpha, out=out2)
+
+    def rule(self):
+        '''
+        Immutable snapshot of the current nodes and weights.
+
+        Both sub-quadratures are merged into a single rule.  Extended
+        precision Gauss-Laguerre nodes and weights are rounded to float
+        if the Gauss-Legendre part is float.
+
+        Returns:
+            * :class:`~QuadratureRule`
+        '''
+        return _merge_rules(self, self.gleg.rule(), self.glag.rule())
+
+    def composite(self):
+        '''
+        Composite rule with separate base rules for both regions, which
+        is remapped to new limits, switch times and :math:`\\alpha`
+        without rebuilding the sub-quadratures.
+
+        Returns:
+            * :class:`~CompositeRule`, float precision only.
+        '''
+        return CompositeRule(self)
+
+    def weight_derivative(self):
+        '''
+        Derivative of :code:`weights` with respect to :math:`\\alpha`,
+        in the order of the nodes of :meth:`rule`.
+
+        Returns:
+            * :class:`~numpy.ndarray`, float precision only.
+        '''
+        _check_float(self)
+        return np.concatenate((self.gleg.weight_derivative(),
+                               self.glag.weight_derivative()))
+
+    def rebase(self, lower, upper, alpha=None):
+        '''
+        Remap quadrature to new limits of integration.
+
+        The switch time is recomputed from **percent**, or kept at the
+        user-defined **ts**, and both sub-quadratures are remapped in
+        place.
+
+        Args:
+            * **lower** (:py:class:`float`): Lower limit of integration.
+            * **upper** (:py:class:`float`): Upper limit of integration.
+
+        Kwargs: name (type) - default
+            * **alpha** (:py:class:`float`) - `None`: Exponent of
+              singular kernel.
+        '''
+        if alpha is None:
+            alpha = self.alpha
+        switch_time = _switch_time(lower, upper, self.percent, self.ts)
+        self.alpha = alpha
+        self.lower = lower
+        self.upper = upper
+        self.switch_time = switch_time
+        self.gleg.rebase(lower=lower, upper=switch_time,
+                         singularity=upper, alpha=alpha)
+        self.glag.rebase(lower=switch_time, upper=upper, alpha=alpha)
+        return self
+
+    def shift(self, upper):
+        '''
+        Translate the window of integration so that it ends at **upper**.
+
+        The lower limit and a user-defined switch time move by the same
+        amount.
+
+        Args:
+            * **upper** (:py:class:`float`): New upper limit of integration.
+        '''
+        delta = upper - self.upper
+        if self.ts is not None:
+            self.ts += delta
+        return self.rebase(lower=self.lower + delta, upper=upper)
+
+
+# ---------------------
+class CompositeRule(object):
+    '''
+    Rule of a hybrid quadrature kept as separate base rules for the
+    regular region, :math:`[t_0, t_s]`, and the singular region,
+    :math:`[t_s, b]`.
+
+    With :math:`L = b - t_0` and :math:`q = (t_s - t_0)/L`, the nodes are
+    :math:`t_0 + L\\hat{s}_i(q)` and the weights are
+    :math:`L^{1-\\alpha}\\hat{w}_i(q, \\alpha)`, where the unit rule
+    :math:`(\\hat{s}, \\hat{w})` on :math:`[0, 1]` only depends on the
+    fraction :math:`q` and :math:`\\alpha`.  Unit weights are cached, so
+    moving the limits of integration at a fixed fraction is an affine
+    remap of the nodes and a rescaling of the weights, without any
+    powers.  Moving the switch time recomputes the singular factors of
+    the small regular region and rescales the singular region by
+    :math:`(1-q)^{1-\\alpha}`.  The singularity is always the upper limit,
+    as in the hybrid quadratures, and a graded Riemann-Sum grid stays
+    graded toward it.  Changing :math:`\\alpha` recomputes the
+    singular region once per value.  A composite rule can be passed as
+    **quadrature** to :func:`~.fod.riemannliouville` and
+    :func:`~.fod.caputo`.
+
+    Args:
+        * **quad** (:class:`~GaussLegendreRiemannSum` or
+          :class:`~GaussLegendreGaussLaguerre`): Hybrid quadrature in
+          float precision, whose limits, switch time, :math:`\\alpha` and
+          integrand are taken over.
+    '''
+    def __init__(self, quad):
+        singular = getattr(quad, 'rs', None) or getattr(quad, 'glag', None)
+        if singular is None:
+            raise ValidationError(str(
+                'Expect hybrid quadrature, got {}'.format(
+                    type(quad).__name__)))
+        if quad.gleg.precision != 'float' or singular.precision != 'float':
+            raise ValidationError(str(
+                'Composite rules require float precision, precision = '
+                '{}'.format(singular.precision)))
+        self.description = 'Composite: ' + quad.description
+        self.f = quad.f
+        self.compensated = quad.compensated
+        self.precision = 'float'
+        self.n_digits = quad.n_digits
+        # base rules on [0, 1], shared read-only with the sub-quadratures
+        self._regular = (quad.gleg._unit_points, quad.gleg._unit_weights)
+        if isinstance(singular, RiemannSum):
+            grid = singular._unit_grid
+            self._singular = ('rs', singular._rs_points(grid), grid)
+        else:
+            self._singular = ('laguerre', singular.points,
+                              singular.initial_weights)
+        self._singular_cache = LRUCache(maxsize=WEIGHT_CACHE_SIZE)
+        self._weight_cache = LRUCache(maxsize=WEIGHT_CACHE_SIZE)
+        size = self._regular[0].size
+        self.points = np.empty(size + self._singular[1].size)
+        self.weights = np.empty_like(self.points)
+        self.alpha = quad.alpha
+        self.rebase(lower=quad.lower, upper=quad.upper,
+                    switch_time=quad.switch_time)
+
+    def rebase(self, lower, upper, switch_time=None, alpha=None):
+        '''
+        Remap the rule to new limits of integration.
+
+        Args:
+            * **lower** (:py:class:`float`): Lower limit of integration.
+            * **upper** (:py:class:`float`): Upper limit of integration.
+
+        Kwargs: name (type) - default
+            * **switch_time** (:py:class:`float`) - `None`: Time to switch
+              to the singular region.  By default it keeps the current
+              fraction, **percent**, of the interval.
+            * **alpha** (:py:class:`float`) - `None`: Exponent of
+              singular kernel.
+        '''
+        if alpha is None:
+            alpha = self.alpha
+        else:
+            check_alpha(alpha)
+        if switch_time is not None:
+            check_range(lower, upper, switch_time)
+            self.percent = (switch_time - lower)/(upper - lower)
+        self.alpha = alpha
+        self.lower = lower
+        self.upper = upper
+        self.singularity = upper
+        span = upper - lower
+        self.switch_time = span*self.percent + lower
+        unit_points, unit_weights = self._unit_rule(self.percent, alpha)
+        np.multiply(unit_points, span, out=self.points)
+        self.points += lower
+        np.multiply(unit_weights, span**(1 - alpha), out=self.weights)
+        return self
+
+    def shift(self, upper):
+        '''
+        Translate the window of integration so that it ends at **upper**.
+
+        Args:
+            * **upper** (:py:class:`float`): New upper limit of integration.
+        '''
+        return self.rebase(lower=self.lower + upper - self.upper,
+                           upper=upper)
+
+    def update_weights(self, alpha=None):
+        '''
+        Update quadrature weights for a new :math:`\\alpha`.
+
+        Args:
+            * **alpha** (:py:class:`float`): Exponent of singular kernel.
+        '''
+        return self.rebase(lower=self.lower, upper=self.upper, alpha=alpha)
+
+    def rule(self):
+        '''
+        Immutable snapshot of the current nodes and weights.
+
+        Returns:
+            * :class:`~QuadratureRule`
+        '''
+        # nodes also depend on the switch time, so they are not shared
+        return QuadratureRule(points=self.points.copy(),
+                              weights=self.weights.copy(), lower=self.lower,
+                              upper=self.upper, singularity=self.upper,
+                              alpha=self.alpha, precision=self.precision)
+
+    def weight_derivative(self):
+        '''
+        Derivative of :code:`weights` with respect to :math:`\\alpha`,
+        in the order of :code:`points`.  Each region is differentiated
+        as its sub-quadrature, see :meth:`GaussLegendre.weight_derivative`
+        and :meth:`RiemannSum.weight_derivative` or
+        :meth:`GaussLaguerre.weight_derivative`.
+
+        Returns:
+            * :class:`~numpy.ndarray`
+        '''
+        size = self._regular[0].size
+        out = np.empty_like(self.weights)
+        np.multiply(-np.log(self.upper - self.points[:size]),
+                    self.weights[:size], out=out[:size])
+        kind, points, base = self._singular
+        span = self.upper - self.switch_time
+        if kind == 'rs':
+            out[size:] = _rs_weight_derivative(
+                span*(1 - base), self.weights[size:], self.alpha)
+        else:
+            np.multiply(-np.log(span*(1 - points)), self.weights[size:],
+                        out=out[size:])
+        return out
+
+    def integrate(self, f=None, theta=None, chunk_size=None):
+        '''
+        Evaluate the integral.
+
+        Kwargs: name (type) - default
+            * **f** (def) - `None`: Function handle.
+            * **theta** (array_like) - `None`: Batch of parameters passed
+              to **f** with the points.
+            * **chunk_size** (:py:class:`int`) - `None`: Number of rows of
+              **theta** per call of **f**.  By default all at once.
+        '''
+        if f is None:
+            f = check_value(f, self.f, 'function - f')
+        self.f = f
+        return _apply(self.weights, f, self.points, theta, chunk_size,
+                      self.compensated)
+
+    def _unit_rule(self, percent, alpha):
+        # nodes and weights on [0, 1] for switch fraction **percent**
+        key = (percent, alpha)
+        rule = self._weight_cache.get(key)
+        if rule is not None:
+            return rule
+        points = np.empty_like(self.points)
+        weights = np.empty_like(self.weights)
+        regular_points, regular_weights = self._regular
+        size = regular_points.size
+        np.multiply(regular_points, percent, out=points[:size])
+        _kernel('singular_weights', weights)(
+            regular_weights*percent, points[:size], 1.0, alpha,
+            weights[:size])
+        singular_points = self._singular[1]
+        np.multiply(singular_points, 1 - percent, out=points[size:])
+        points[size:] += percent
+        np.multiply(self._singular_weights(alpha), (1 - percent)**(1 - alpha),
+                    out=weights[size:])
+        rule = (_read_only(points), _read_only(weights))
+        self._weight_cache.put(key, rule)
+        return rule
+
+    def _singular_weights(self, alpha):
+        # singular region weights on [0, 1], singular at 1
+        weights = self._singular_cache.get(alpha)
+        if weights is None:
+            kind, points, base = self._singular
+            weights = np.empty_like(points)
+            if kind == 'rs':
+                # base is the grid of the Riemann-Sum
+                _kernel('rs_weights', weights)(base, 1.0, alpha, weights,
+                                               np.empty_like(base))
+            else:
+                _kernel('laguerre_weights', weights)(base, points, 1.0,
+                                                     alpha, weights)
+            self._singular_cache.put(alpha, weights)
+        return weights
+
+
+def _numeric(f):
+    # compile sympy expressions once, function handles are used as is
+    if is_expression(f):
+        return compile_integrand(f, backend='numpy')
+    return f
+
+
+def _switch_time(lower, upper, percent, ts):
+    # time at which hybrid methods hand off to the singular quadrature
+    if ts is not None:
+        return check_range(lower, upper, ts)
+    return (upper - lower)*percent + lower
+
+
+def _reuse_weights(cache, key, like, compute, out=None):
+    '''
+    Return cached weight vector for **key** or compute a new one.
+
+    Cached vectors are read-only, since they are handed out as
+    :code:`weights` and shared by every later request for **key**.
+    Evicted vectors are dropped rather than recycled, so references held
+    by the caller never change.  A user supplied **out** is always
+    written to and never cached.
+    '''
+    if out is not None:
+        if out.shape != like.shape or out.dtype != like.dtype:
+            raise ValidationError(str(
+                'Invalid output array: expect shape {} and dtype {}, '
+                'got {} and {}'.format(like.shape, like.dtype,
+                                       out.shape, out.dtype)))
+        compute(out)
+        return out
+    weights = cache.get(key)
+    if weights is not None:
+        return weights
+    weights = np.empty_like(like)
+    compute(weights)
+    weights.setflags(write=False)
+    cache.put(key, weights)
+    return weights
+
+
+def _unit_rule(quad, key, build):
+    '''
+    Return read-only base arrays for **key**, building them once.
+
+    **build** returns a tuple of arrays that do not depend on
+    :math:`\\alpha` or the limits of integration.  The key is recorded
+    on **quad** so the arrays can be saved with it.
+    '''
+    quad._unit_key = key
+    arrays = UNIT_RULES.get(key)
+    if arrays is None:
+        arrays = tuple(_read_only(array) for array in build())
+        UNIT_RULES.put(key, arrays)
+    return arrays
+
+
+def _read_only(array):
+    # read-only view, the data is shared with **array**
+    array = np.asarray(array)
+    if array.flags.writeable:
+        array = array.view()
+        array.flags.writeable = False
+    return array
+
+
+def _digest(array):
+    # content key of user-defined arrays
+    if array.dtype == object:
+        data = str([x.man_exp for x in array]).encode()
+    else:
+        data = array.tobytes()
+    return hashlib.sha1(data).hexdigest()
+
+
+def _make_rule(quad, points, weights):
+    '''
+    Snapshot of **quad** with read-only copies of **points** and
+    **weights**.  Rules taken at the same limits share one points array.
+    '''
+    key = (quad.lower, quad.upper, quad.singularity)
+    cached = getattr(quad, '_rule_points', None)
+    if cached is None or cached[0] != key:
+        cached = (key, _read_only(points.copy()))
+        quad._rule_points = cached
+    return QuadratureRule(points=cached[1], weights=weights.copy(),
+                          lower=quad.lower, upper=quad.upper,
+                          singularity=quad.singularity, alpha=quad.alpha,
+                          precision=quad.precision, n_digits=quad.n_digits)
+
+
+def _check_float(quad):
+    if quad.precision != 'float':
+        raise ValidationError(str(
+            'Weight derivatives require float precision, '
+            'precision = {}'.format(quad.precision)))
+
+
+def _gradient(quad, f, jacobian=None):
+    '''
+    Integral of **f**, its derivative with respect to :math:`\\alpha` and
+    the integral of **jacobian**.
+
+    The weights and their derivative are stacked and reduced against the
+    stacked evaluations of **f** and **jacobian** with one matrix product.
+    '''
+    _check_float(quad)
+    rule = quad.rule()
+    n = rule.points.size
+    weights = np.vstack((rule.weights, quad.weight_derivative()))
+    feval = np.asarray(_numeric(f)(rule.points), dtype=float).reshape(n, -1)
+    k = feval.shape[1]
+    if jacobian is not None:
+        jeval = np.asarray(jacobian(rule.points), dtype=float).reshape(n, -1)
+        feval = np.hstack((feval, jeval))
+    out = weights @ feval
+    dparams = out[0, k:] if jacobian is not None else None
+    if k == 1:
+        return out[0, 0], out[1, 0], dparams
+    return out[0, :k], out[1, :k], dparams
+
+
+def _rs_weight_derivative(work, weights, alpha):
+    '''
+    Derivative of Riemann-Sum **weights** with respect to
+    :math:`\\alpha`, from the distances **work** of the grid to the
+    singularity.  **work** is overwritten.
+    '''
+    beta = 1 - alpha
+    # u**beta*log(u) vanishes at the singularity
+    inside = work > 0
+    work[inside] = work[inside]**beta*np.log(work[inside])
+    work[~inside] = 0.0
+    return (weights - (work[:-1] - work[1:]))/beta
+
+
+def _merge_rules(quad, rule1, rule2):
+    # single rule from the sub-quadratures of a hybrid method
+    points = [rule1.points, rule2.points]
+    weights = [rule1.weights, rule2.weights]
+    if rule1.points.dtype != rule2.points.dtype:
+        points = [np.asarray(p, dtype=float) for p in points]
+        weights = [np.asarray(w, dtype=float) for w in weights]
+    return QuadratureRule(points=np.concatenate(points),
+                          weights=np.concatenate(weights),
+                          lower=quad.lower, upper=quad.upper,
+                          singularity=quad.upper, alpha=quad.alpha,
+                          precision=quad.precision, n_digits=quad.n_digits)
+
+
+def _split(out, size):
+    # views of a preallocated weight array for two sub-quadratures
+    if out is None:
+        return None, None
+    return out[:size], out[size:]
+
+
+def _kernel(name, out):
+    # compiled kernels for float arrays, NumPy for mpf object arrays
+    if out.dtype == object:
+        return getattr(kernels, '_np_' + name)
+    return getattr(kernels, name)
+
+
+def _evaluate(f, points, theta=None):
+    # integrand on all nodes, (n,) for scalar and (n, k) for vector output
+    if theta is not None:
+        return _batch(f(points, theta), points.size)
+    return _columns(_numeric(f)(points), points.size)
+
+
+def _batch(feval, n):
+    # (n_theta, n) rows as an (n, n_theta) view, so _reduce keeps a
+    # single matrix-vector product and returns one value per row
+    feval = np.asarray(feval, dtype=float)
+    if feval.ndim != 2 or feval.shape[1] != n:
+        raise ValidationError(str('Expect f(points, theta) with shape '
+                                  '(n_theta, {}). shape = {}'.format(
+                                      n, feval.shape)))
+    return feval.T
+
+
+def _columns(feval, n):
+    # (n,) for scalar and (n, k) for vector output
+    feval = np.asarray(feval).reshape(n, -1)
+    if feval.shape[1] == 1:
+        return feval.ravel()
+    return feval
+
+
+def _apply(weights, f, points, theta=None, chunk_size=None,
+           compensated=False):
+    '''
+    Weighted sum of **f** on **points**.  Batches of parameters are
+    evaluated and reduced **chunk_size** rows at a time, so at most
+    chunk_size x n function values are held in memory.
+    '''
+    if theta is None or chunk_size is None:
+        return _reduce(weights, _evaluate(f, points, theta), compensated)
+    chunk_size = check_node_type(chunk_size)
+    if chunk_size < 1:
+        raise ValidationError(str('Invalid chunk size! Expect '
+                                  'chunk_size >= 1. chunk_size = {}'.format(
+                                      chunk_size)))
+    out = np.empty(len(theta))
+    for start in range(0, len(theta), chunk_size):
+        chunk = theta[start:start + chunk_size]
+        out[start:start + chunk_size] = _reduce(
+            weights, _evaluate(f, points, chunk), compensated)
+    return out
+
+
+def _reduce(weights, feval, compensated=False):
+    # weighted sum of function evaluations
+    if compensated:
+        if feval.ndim == 1:
+            return np.float64(kernels.compensated_dot(weights, feval))
+        return kernels._np_compensated_dot(weights, feval)
+    if feval.ndim == 1:
+        return np.float64(kernels.dot(weights, feval))
+    # one matrix product serves every channel
+    return weights @ feval
+
+
+def _workdps(quad):
+    # mpmath working precision for extended precision quadrature
+    if quad.precision == 'float':
+        return contextlib.nullcontext()
+    import mpmath
+    return mpmath.workdps(quad.n_digits)
+
+
+def _scalar(quad, value):
+    # promote float limits to mpf for extended precision arithmetic
+    if quad.precision == 'float':
+        return value
+    import mpmath
+    return mpmath.mpf(value)
+
+
+def _mp_rule(family, deg, n_digits):
+    '''
+    Return Gauss rule as mpf object arrays.
+
+    Rules are generated once per (family, degree, digits) and shared by
+    all quadrature objects.  Legendre rules are defined on
+    :math:`[-1, 1]`, Laguerre rules on :math:`[0, \\infty)`.
+    '''
+    key = (family, deg, n_digits)
+    rule = MP_RULES.get(key)
+    if rule is None:
+        import mpmath
+        from sympy.integrals import quadrature as sp_quadrature
+        if family == 'legendre':
+            points, weights = sp_quadrature.gauss_legendre(deg, n_digits)
+        else:
+            points, weights = sp_quadrature.gauss_gen_laguerre(
+                n=deg, n_digits=n_digits, alpha=0)
+        with mpmath.workdps(n_digits):
+            rule = (np.array([mpmath.mpf(p) for p in points], dtype=object),
+                    np.array([mpmath.mpf(w) for w in weights], dtype=object))
+        MP_RULES.put(key, rule)
+    return rule
+
+
+def _mp_integrate(quad, f, evalpoints, theta=None):
+    '''
+    Evaluate integrand on mpf nodes and reduce with :code:`mpmath.fdot`.
+
+    Integrands that can be evaluated symbolically are compiled for mpmath
+    once; other function handles are called node by node.  Legacy
+    extended precision objects return a :py:class:`float`.
+    '''
+    if theta is not None:
+        raise ValidationError('Batched parameters require float precision.')
+    import mpmath
+    func = compile_integrand(f, backend='mpmath')
+    with mpmath.workdps(quad.n_digits):
+        feval = np.frompyfunc(func, 1, 1)(evalpoints)
+        s = mpmath.fdot(quad.weights, feval)
+    if quad.precision == 'extended':
+        return float(s)
+    return s
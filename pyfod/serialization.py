@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+'''
+This module stores quadrature objects so they are built once per
+deployment rather than once per process.
+
+:func:`~save` writes a quadrature object or :class:`~.QuadratureRule` to
+a versioned `.npz` file.  For quadrature objects the file holds the
+settings and the base nodes and weights on the unit interval.
+:func:`~load` registers those arrays in
+:data:`~.quadrature.UNIT_RULES` before the object is constructed, so
+expensive rules, e.g., extended precision Gauss-Laguerre, are not
+generated again.  Extended precision values are stored exactly as
+mantissa and exponent.
+
+:func:`~share` copies the points and weights of a float rule into a
+block of :mod:`multiprocessing.shared_memory`.  Worker processes call
+:func:`~attach_shared` with the block name to obtain a
+:class:`~.QuadratureRule` whose arrays map the block directly, without
+copying or unpickling.
+
+Functions:
+    * :func:`~save`
+    * :func:`~load`
+    * :func:`~share`
+    * :func:`~attach_shared`
+    * :func:`~detach_shared`
+'''
+import json
+import numpy as np
+from pyfod import __version__
+from pyfod import quadrature as qm
+from pyfod.utilities import ValidationError
+
+
+# Version of the file and shared memory layout
+FORMAT_VERSION = 1
+# Shared memory blocks attached by this process, keyed by name
+ATTACHED = {}
+# Names of blocks created by this process
+OWNED = set()
+_HEADER = 8
+
+
+def save(obj, file):
+    '''
+    Save quadrature object or rule to a `.npz` file.
+
+    The integrand is not saved.
+
+    Args:
+        * **obj**: Quadrature object or :class:`~.QuadratureRule`.
+        * **file** (:py:class:`str` or file): Destination, see
+          :func:`numpy.savez`.
+    '''
+    meta = dict(format_version=FORMAT_VERSION, pyfod_version=__version__,
+                cls=type(obj).__name__)
+    arrays = dict()
+    if isinstance(obj, qm.QuadratureRule):
+        meta['settings'] = {name: getattr(obj, name)
+                            for name in obj.__slots__[2:]}
+        arrays['points'] = _encode(obj.points)
+        arrays['weights'] = _encode(obj.weights)
+    else:
+        meta['settings'] = _settings(obj)
+        meta['units'] = []
+        for ii, quad in enumerate(_components(obj)):
+            meta['units'].append(list(quad._unit_key))
+            for jj, array in enumerate(_unit_arrays(quad)):
+                arrays['unit_{}_{}'.format(ii, jj)] = _encode(array)
+    np.savez(file, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def load(file):
+    '''
+    Load quadrature object or rule saved with :func:`~save`.
+
+    Args:
+        * **file** (:py:class:`str` or file): Source, see :func:`numpy.load`.
+
+    Returns:
+        * Quadrature object or :class:`~.QuadratureRule`.
+
+    Raises:
+        * :class:`~.utilities.ValidationError` for files written by a
+          newer format version or of unknown class.
+    '''
+    with np.load(file) as data:
+        meta = json.loads(str(data['meta']))
+        _check_version(meta['format_version'])
+        settings = meta['settings']
+        if meta['cls'] == 'QuadratureRule':
+            n_digits = settings['n_digits']
+            return qm.QuadratureRule(
+                points=_decode(data['points'], n_digits),
+                weights=_decode(data['weights'], n_digits), **settings)
+        for ii, key in enumerate(meta['units']):
+            key = tuple(key)
+            if key not in qm.UNIT_RULES:
+                arrays = []
+                jj = 0
+                while 'unit_{}_{}'.format(ii, jj) in data:
+                    arrays.append(qm._read_only(_decode(
+                        data['unit_{}_{}'.format(ii, jj)], key[-1])))
+                    jj += 1
+                qm.UNIT_RULES.put(key, tuple(arrays))
+    if 'grid' in settings:
+        settings['grid'] = _decode(np.array(settings['grid']),
+                                   settings['n_digits'])
+    try:
+        cls = getattr(qm, meta['cls'])
+    except AttributeError:
+        raise ValidationError(str('Unknown quadrature class: {}'.format(
+            meta['cls']))) from None
+    return cls(**settings)
+
+
+def share(obj, name=None):
+    '''
+    Copy points and weights of a float rule into shared memory.
+
+    The caller owns the block: keep the returned handle alive while
+    workers use it, then call :code:`close()` and :code:`unlink()`.
+
+    Args:
+        * **obj**: Quadrature object or :class:`~.QuadratureRule`.
+
+    Kwargs: name (type) - default
+        * **name** (:py:class:`str`) - `None`: Name of the block.  A
+          unique name is generated if `None`.
+
+    Returns:
+        * :class:`multiprocessing.shared_memory.SharedMemory`, its
+          :code:`name` is passed to :func:`~attach_shared`.
+    '''
+    from multiprocessing import shared_memory
+    rule = obj if isinstance(obj, qm.QuadratureRule) else obj.rule()
+    if rule.precision != 'float':
+        raise ValidationError('Only float rules can be shared')
+    meta = dict(format_version=FORMAT_VERSION, n=rule.points.size,
+                settings={name: getattr(rule, name)
+                          for name in rule.__slots__[2:]})
+    header = json.dumps(meta).encode()
+    # align arrays to 8 bytes after the length-prefixed header
+    offset = _HEADER + -(-len(header)//8)*8
+    shm = shared_memory.SharedMemory(
+        name=name, create=True, size=offset + 16*rule.points.size)
+    shm.buf[:_HEADER] = len(header).to_bytes(_HEADER, 'little')
+    shm.buf[_HEADER:_HEADER + len(header)] = header
+    points, weights = _views(shm.buf, offset, rule.points.size)
+    points[:] = rule.points
+    weights[:] = rule.weights
+    OWNED.add(shm.name)
+    return shm
+
+
+def attach_shared(name):
+    '''
+    Map a rule created with :func:`~share` without copying it.
+
+    The block stays attached until :func:`~detach_shared` is called.
+
+    Args:
+        * **name** (:py:class:`str`): Name of the shared memory block.
+
+    Returns:
+        * :class:`~.QuadratureRule` with read-only arrays in shared memory.
+    '''
+    shm = ATTACHED.get(name)
+    if shm is None:
+        shm = _open(name)
+        ATTACHED[name] = shm
+    size = int.from_bytes(bytes(shm.buf[:_HEADER]), 'little')
+    meta = json.loads(bytes(shm.buf[_HEADER:_HEADER + size]).decode())
+    _check_version(meta['format_version'])
+    offset = _HEADER + -(-size//8)*8
+    points, weights = _views(shm.buf, offset, meta['n'])
+    return qm.QuadratureRule(points=points, weights=weights,
+                             **meta['settings'])
+
+
+def detach_shared(name):
+    '''
+    Close a block attached with :func:`~attach_shared`.
+
+    Rules mapping the block must be deleted first.
+
+    Args:
+        * **name** (:py:class:`str`): Name of the shared memory block.
+    '''
+    shm = ATTACHED.pop(name, None)
+    if shm is not None:
+        shm.close()
+
+
+def _open(name):
+    # attach without letting a resource tracker unlink the owner's block
+    import multiprocessing
+    from multiprocessing import resource_tracker
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+    # multiprocessing children share the owner's tracker, an unrelated
+    # process has its own, which would unlink the block on exit
+    if name not in OWNED and multiprocessing.parent_process() is None:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _views(buf, offset, n):
+    points = np.ndarray((n,), dtype=np.float64, buffer=buf, offset=offset)
+    weights = np.ndarray((n,), dtype=np.float64, buffer=buf,
+                         offset=offset + 8*n)
+    return points, weights
+
+
+def _check_version(version):
+    if version > FORMAT_VERSION:
+        raise ValidationError(str(
+            'Unsupported format version {}, this version of pyfod reads '
+            'up to {}'.format(version, FORMAT_VERSION)))
+
+
+def _unit_arrays(quad):
+    # base arrays held by **quad**, in the order of its UNIT_RULES entry
+    if isinstance(quad, qm.GaussLegendre):
+        return quad._unit_points, quad._unit_weights
+    if isinstance(quad, qm.GaussLaguerre):
+        return quad.points, quad.initial_weights
+    return quad._unit_grid,
+
+
+def _components(quad):
+    # objects holding unit-interval base arrays
+    if hasattr(quad, '_unit_key'):
+        return [quad]
+    return [quad.gleg, getattr(quad, 'rs', None) or quad.glag]
+
+
+def _settings(quad):
+    # constructor arguments reproducing the current state of **quad**
+    if isinstance(quad, qm.GaussLegendre):
+        settings = dict(ndom=quad.ndom, deg=quad.deg,
+                        singularity=quad.singularity)
+    elif isinstance(quad, qm.GaussLaguerre):
+        settings = dict(deg=quad.deg, singularity=quad.singularity)
+    elif isinstance(quad, qm.RiemannSum):
+        settings = dict(n=quad.n, singularity=quad.singularity,
+                        grading=quad.grading)
+        if quad.custom_grid:
+            settings['grid'] = _encode(quad._unit_grid).tolist()
+    elif isinstance(quad, qm.GaussLegendreRiemannSum):
+        settings = dict(ndom=quad.gleg.ndom, deg=quad.gleg.deg,
+                        nrs=quad.rs.n, percent=quad.percent, ts=quad.ts,
+                        grading=quad.rs.grading)
+    else:
+        settings = dict(ndom=quad.gleg.ndom, gleg_deg=quad.gleg.deg,
+                        glag_deg=quad.glag.deg, percent=quad.percent,
+                        ts=quad.ts)
+    settings.update(lower=quad.lower, upper=quad.upper, alpha=quad.alpha,
+                    n_digits=quad.n_digits, compensated=quad.compensated)
+    precision = _components(quad)[-1].precision
+    if isinstance(quad, (qm.GaussLaguerre, qm.GaussLegendreGaussLaguerre)):
+        settings['extend_precision'] = precision == 'extended'
+    if precision != 'extended':
+        settings['precision'] = precision
+    return settings
+
+
+def _encode(array):
+    # mpf values as exact 'mantissa exponent' strings
+    if array.dtype != object:
+        return array
+    return np.array(['{} {}'.format(*x.man_exp) for x in array])
+
+
+def _decode(array, n_digits):
+    if array.dtype.kind != 'U':
+        return array
+    import mpmath
+    out = np.empty(array.size, dtype=object)
+    # values were generated with n_digits and are restored without rounding
+    with mpmath.workdps(n_digits):
+        for ii, value in enumerate(array):
+            man, exp = value.split()
+            out[ii] = mpmath.mpf((int(man), int(exp)))
+    return out
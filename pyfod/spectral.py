@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+'''
+This module evaluates fractional derivatives of smooth functions with a
+spectral method.
+
+The function is sampled once at the nodes of a polynomial basis on
+:math:`[t_0, T]`, Chebyshev-Lobatto points for `'chebyshev'` or
+Gauss-Legendre points for `'legendre'`, and replaced by its interpolant
+:math:`p`.  The Caputo derivative of the interpolant,
+
+.. math::
+
+    D_C^\\alpha[p(t)] = \\frac{1}{\\Gamma(1-\\beta)}\\int_{t_0}^t
+    (t-s)^{-\\beta}p^{(n)}(s)ds, \\quad \\beta = \\alpha - n + 1,
+
+has a polynomial integrand, so it is integrated exactly with
+Gauss-Jacobi quadrature for the weight :math:`(1-x)^{-\\beta}`.  The
+Riemann-Liouville derivative adds the boundary terms
+
+.. math::
+
+    \\sum_{k=0}^{n-1}\\frac{p^{(k)}(t_0)}{\\Gamma(k+1-\\alpha)}
+    (t-t_0)^{k-\\alpha}.
+
+Together these form a fractional differentiation matrix mapping the
+samples to derivatives at the target times.  Matrices are built on
+:math:`[-1, 1]`, scaled by :math:`((T-t_0)/2)^{-\\alpha}`, and kept in a
+bounded LRU cache, so derivatives at many target times cost one
+matrix-vector product.  For analytic functions the error decreases
+exponentially with the degree.
+
+Classes:
+    * :class:`~SpectralDerivative`
+'''
+import math
+import numpy as np
+from numpy.polynomial import chebyshev
+from numpy.polynomial import legendre
+from pyfod import fod
+from pyfod.quadrature import _columns
+from pyfod.quadrature import _digest
+from pyfod.quadrature import _numeric
+from pyfod.utilities import LRUCache
+from pyfod.utilities import ValidationError
+from pyfod.utilities import check_node_type
+
+
+# Unit-interval differentiation matrices keyed by
+# (basis, degree, alpha, definition, targets)
+MATRICES = LRUCache(maxsize=32)
+# Polynomial modules and function prefixes
+BASES = dict(chebyshev=(chebyshev, 'cheb'), legendre=(legendre, 'leg'))
+
+
+class SpectralDerivative(object):
+    '''
+    Spectral fractional derivative calculator.
+
+    Kwargs: name (type) - default
+        * **lower** (:py:class:`float`) - `0.0`: Lower limit - should be
+          zero.
+        * **upper** (:py:class:`float`) - `1.0`: End of the interval on
+          which the function is expanded.
+        * **degree** (:py:class:`int`) - `32`: Polynomial degree, the
+          function is sampled at degree+1 nodes.
+        * **basis** (:py:class:`str`) - `'chebyshev'`: `'chebyshev'` or
+          `'legendre'`.
+    '''
+    def __init__(self, lower=0.0, upper=1.0, degree=32, basis='chebyshev'):
+        if basis not in BASES:
+            raise ValidationError(str(
+                'Invalid basis: {}. Please specify chebyshev or '
+                'legendre.'.format(basis)))
+        if not upper > lower:
+            raise ValidationError(str('Invalid interval! Expect upper > '
+                                      'lower. [{}, {}]'.format(lower, upper)))
+        self.description = 'Spectral'
+        self.lower = lower
+        self.upper = upper
+        self.degree = check_node_type(degree)
+        self.basis = basis
+        self.unit_nodes = _unit_nodes(basis, self.degree)
+        self.nodes = lower + (upper - lower)*(self.unit_nodes + 1)/2
+
+    def matrix(self, alpha, targets, definition='caputo'):
+        '''
+        Fractional differentiation matrix.
+
+        Args:
+            * **alpha** (:py:class:`float`): Order of fractional
+              derivative, :math:`\\alpha \\ge 0`.
+            * **targets** (array_like): Times in :math:`(t_0, T]` at which
+              the derivative is evaluated.
+
+        Kwargs: name (type) - default
+            * **definition** (:py:class:`str`) - `'caputo'`: `'caputo'` or
+              `'riemannliouville'`.
+
+        Returns:
+            * :class:`~numpy.ndarray` of shape (targets, degree+1),
+              read-only.
+        '''
+        if not alpha >= 0:
+            raise ValidationError(str('Invalid value! alpha must be '
+                                      'non-negative. alpha = {}'.format(
+                                          alpha)))
+        if definition not in ('caputo', 'riemannliouville'):
+            raise ValidationError(str(
+                'Invalid definition: {}. Please specify caputo or '
+                'riemannliouville.'.format(definition)))
+        half = (self.upper - self.lower)/2
+        unit = np.atleast_1d(np.asarray(targets, dtype=float) - self.lower)
+        unit = unit/half - 1
+        key = (self.basis, self.degree, float(alpha), definition,
+               _digest(unit))
+        mat = MATRICES.get(key)
+        if mat is None:
+            mat = _unit_matrix(self.basis, self.degree, alpha, definition,
+                               unit)
+            mat.flags.writeable = False
+            MATRICES.put(key, mat)
+        return half**(-alpha)*mat
+
+    def derivative(self, f, alpha, targets=None, definition='caputo'):
+        '''
+        Evaluate fractional derivative.
+
+        Args:
+            * **f** (def): Function handle, or array of values at
+              :code:`nodes` with shape (degree+1,) or (degree+1, k).
+            * **alpha** (:py:class:`float`): Order of fractional derivative.
+
+        Kwargs: name (type) - default
+            * **targets** (array_like) - `None`: Times at which the
+              derivative is evaluated.  If `None`, **upper** is used.
+            * **definition** (:py:class:`str`) - `'caputo'`: `'caputo'` or
+              `'riemannliouville'`.
+
+        Returns: :py:class:`dict`
+            * `fd`: Fractional derivative, a :py:class:`float` for a
+              single target time, otherwise an array of shape (targets,)
+              or (targets, k).
+        '''
+        if targets is None:
+            targets = self.upper
+        fd = self.matrix(alpha, targets, definition) @ self.values(f)
+        if np.ndim(targets) == 0:
+            fd = fd[0]
+            return dict(fd=float(fd) if np.ndim(fd) == 0 else fd)
+        return dict(fd=fd)
+
+    def values(self, f):
+        '''
+        Function values at :code:`nodes`.
+        '''
+        if callable(f):
+            return _columns(_numeric(f)(self.nodes), self.nodes.size)
+        values = np.asarray(f, dtype=float)
+        if values.shape[0] != self.nodes.size:
+            raise ValidationError(str('Expect {} values, one per node. '
+                                      'shape = {}'.format(self.nodes.size,
+                                                          values.shape)))
+        return values
+
+
+def _unit_nodes(basis, degree):
+    if basis == 'chebyshev':
+        # Chebyshev-Lobatto points in ascending order
+        return -np.cos(np.pi*np.arange(degree + 1)/degree)
+    return legendre.leggauss(degree + 1)[0]
+
+
+def _unit_matrix(basis, degree, alpha, definition, unit):
+    '''
+    Differentiation matrix on :math:`[-1, 1]` from nodal values to
+    derivatives at **unit** targets.
+    '''
+    from scipy.special import rgamma, roots_jacobi
+    poly, prefix = BASES[basis]
+    vander = getattr(poly, prefix + 'vander')
+    der = getattr(poly, prefix + 'der')
+    val = getattr(poly, prefix + 'val')
+    n, beta = fod._order(alpha)
+    # nodal values to coefficients
+    coef = np.linalg.inv(vander(_unit_nodes(basis, degree), degree))
+    eye = np.eye(degree + 1)
+    out = np.zeros((unit.size, degree + 1))
+    if n <= degree:
+        # Gauss-Jacobi rule exact for the integrand of degree - n
+        x, w = roots_jacobi(degree//2 + 1, -beta, 0.0)
+        s = -1 + np.outer(unit + 1, 1 + x)/2
+        basis_values = vander(s.ravel(), degree - n).reshape(
+            unit.size, x.size, degree - n + 1)
+        rows = np.einsum('q,tqk->tk', w, basis_values)
+        rows *= ((unit + 1)/2)[:, None]**(1 - beta)
+        out += rows @ der(eye, n) @ coef/math.gamma(1 - beta)
+    if definition == 'riemannliouville':
+        for k in range(n):
+            boundary = val(-1.0, der(eye, k)) @ coef
+            out += np.outer((unit + 1)**(k - alpha)*rgamma(k + 1 - alpha),
+                            boundary)
+    return out
@@ -0,0 +1,195 @@
+'''
+This module compiles sympy_ integrands into numerical callables.
+
+Functions written with sympy are required for extended precision
+quadrature, but evaluating them node by node keeps the whole calculation
+symbolic.  Instead, an integrand is converted to a sympy expression,
+compiled with :code:`sympy.lambdify` for either the NumPy or the mpmath
+backend, and the compiled callable is cached per expression.  Function
+handles are traced on every call, so handles whose globals or closures
+change are never served a stale expression.
+
+An integrand can be provided as
+
+    * a sympy expression with a single free symbol, e.g.,
+      :code:`sp.exp(2*t)`, or
+    * a function handle that returns a sympy expression when called
+      with a sympy symbol, e.g., :code:`lambda t: sp.exp(2*t)`.
+
+Function handles that cannot be evaluated symbolically are returned
+unchanged.  Sympy is imported on first use, and :func:`~is_expression`
+never imports it.
+
+Functions:
+    * :func:`~is_expression`
+    * :func:`~symbolic_form`
+    * :func:`~compile_integrand`
+    * :func:`~compile_derivative`
+    * :func:`~as_function`
+
+.. _sympy: https://www.sympy.org/en/index.html
+'''
+import sys
+import numpy as np
+from pyfod.utilities import LRUCache
+from pyfod.utilities import ValidationError
+
+
+# Compiled callables keyed by (expression, backend)
+COMPILED = LRUCache(maxsize=64)
+
+
+def is_expression(f):
+    '''
+    Check if **f** is a sympy expression without importing sympy.
+
+    A sympy expression can only exist if sympy has already been imported.
+    '''
+    sp = sys.modules.get('sympy')
+    return sp is not None and isinstance(f, sp.Expr)
+
+
+def symbolic_form(f):
+    '''
+    Convert integrand to a sympy expression in a single variable.
+
+    Args:
+        * **f** (def or sympy expression): Integrand.
+
+    Returns:
+        * sympy expression in :code:`t`, or `None` if **f** cannot be
+          evaluated symbolically.
+    '''
+    import sympy as sp
+    if isinstance(f, sp.Expr):
+        free = list(f.free_symbols)
+        if len(free) > 1:
+            return None
+        return f.subs(free[0], _symbol()) if free else f
+    if not callable(f):
+        return None
+    try:
+        expr = f(_symbol())
+    except Exception:
+        # numerical function handles fail on symbolic input
+        return None
+    if isinstance(expr, sp.Expr):
+        return expr
+    return None
+
+
+def compile_integrand(f, backend='numpy'):
+    '''
+    Compile integrand, caching the resulting callable per expression.
+
+    Args:
+        * **f** (def or sympy expression): Integrand.
+
+    Kwargs: name (type) - default
+        * **backend** (:py:class:`str`) - `'numpy'`: Module used by
+          :code:`sympy.lambdify`, i.e., `'numpy'` or `'mpmath'`.
+
+    Returns:
+        * Compiled callable, or **f** itself if it cannot be evaluated
+          symbolically.
+    '''
+    if not is_expression(f) and not callable(f):
+        return f
+    expr = symbolic_form(f)
+    if expr is None:
+        return f
+    key = (expr, backend)
+    func = COMPILED.get(key)
+    if func is None:
+        func = _lambdify(expr, backend)
+        COMPILED.put(key, func)
+    return func
+
+
+def compile_derivative(f, backend='numpy', order=1):
+    '''
+    Differentiate integrand, compile it, and cache the result per
+    expression.
+
+    Args:
+        * **f** (def or sympy expression): Function to differentiate.
+
+    Kwargs: name (type) - default
+        * **backend** (:py:class:`str`) - `'numpy'`: Module used by
+          :code:`sympy.lambdify`, i.e., `'numpy'`, `'mpmath'` or `'sympy'`.
+        * **order** (:py:class:`int`) - `1`: Order of derivative.
+
+    Returns:
+        * Compiled derivative.
+
+    Raises:
+        * :class:`~.utilities.ValidationError` if **f** cannot be
+          evaluated symbolically.
+    '''
+    expr = symbolic_form(f)
+    if expr is None:
+        raise ValidationError(str('Function cannot be differentiated '
+                                  'symbolically: {}'.format(f)))
+    key = (expr, backend, 'derivative', order)
+    func = COMPILED.get(key)
+    if func is None:
+        func = _lambdify(expr.diff(_symbol(), order), backend)
+        COMPILED.put(key, func)
+    return func
+
+
+def as_function(f, order=0):
+    '''
+    Function handle of a sympy compatible function, or of its
+    derivative, for definitions that call it directly, e.g., to take
+    finite differences.
+
+    Arrays and floats are evaluated with the compiled NumPy callable.
+    Any other input, e.g., a sympy symbol, is substituted symbolically,
+    so extended precision quadrature can still trace the handle and
+    compile it for mpmath.
+
+    Args:
+        * **f** (def or sympy expression): Function in a single variable.
+
+    Kwargs: name (type) - default
+        * **order** (:py:class:`int`) - `0`: Order of derivative.
+
+    Returns:
+        * Function handle.
+
+    Raises:
+        * :class:`~.utilities.ValidationError` if **f** cannot be
+          evaluated symbolically.
+    '''
+    expr = symbolic_form(f)
+    if expr is None:
+        raise ValidationError(str('Function cannot be evaluated '
+                                  'symbolically: {}'.format(f)))
+    if order:
+        expr = expr.diff(_symbol(), order)
+    numeric = compile_integrand(expr, backend='numpy')
+
+    def function(t):
+        if isinstance(t, (np.ndarray, float, int)):
+            return numeric(t)
+        return expr.subs(_symbol(), t)
+    return function
+
+
+def _symbol():
+    # integration variable of compiled expressions
+    import sympy as sp
+    return sp.Symbol('t', real=True)
+
+
+def _lambdify(expr, backend):
+    import sympy as sp
+    func = sp.lambdify(_symbol(), expr, modules=backend)
+    if backend != 'numpy':
+        return func
+
+    def vectorized(x):
+        # constant expressions lambdify to scalars
+        return np.broadcast_to(func(x), np.shape(x))
+    return vectorized
@@ -1,6 +1,33 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import sys
+'''
+Input checks and small helpers shared by the pyfod modules.
+
+Invalid input raises a subclass of :class:`PyfodError`.  The checks are
+applied when objects are built or when a new value is supplied, so calls
+that reuse stored settings skip validation.
+'''
+from collections import OrderedDict
+import numpy as np
+
+
+class PyfodError(Exception):
+    '''
+    Base class of all pyfod errors.
+    '''
+
+
+class ValidationError(PyfodError, ValueError):
+    '''
+    Invalid user input, e.g., a value outside its domain or an unknown
+    option.
+    '''
+
+
+class MissingValueError(ValidationError):
+    '''
+    Required value was neither provided nor stored.
+    '''
 
 
 def check_alpha(alpha):
@@ -14,14 +41,11 @@ def check_alpha(alpha):
         * **alpha** (:py:class:`float`): Order of fractional derivative.
 
     Raises:
-        * System exit for `ZeroDivisionError`.
+        * :class:`ValidationError` if **alpha** is 1.
     '''
-    try:
-        1/(1-alpha)
-    except ZeroDivisionError as err:
-        print('Invalid value! The value of alpha cannot'
-              'be 1.0. alpha = {}:\n\t{}'.format(alpha, err))
-        raise SystemExit
+    if alpha == 1:
+        raise ValidationError(str('Invalid value! The value of alpha '
+                                  'cannot be 1.0. alpha = {}'.format(alpha)))
 
 
 def check_value(value, default_value, varname=None):
@@ -49,13 +73,13 @@ def check_value(value, default_value, varname=None):
     else
 
     Raises:
-        * System exist for no value defined.
+        * :class:`MissingValueError` for no value defined.
     '''
     if value is None:
         value = default_value
     if value is None:
-        sys.exit(str('No value defined. '
-                     'Provide value for {}'.format(varname)))
+        raise MissingValueError(str('No value defined. '
+                                    'Provide value for {}'.format(varname)))
     return value
 
 
@@ -76,12 +100,14 @@ def check_range(lower, upper, value):
     else
 
     Raises:
-        * System exit for value out of domain.
+        * :class:`ValidationError` for value out of domain.
     '''
     if lower <= value <= upper:
         return value
     else:
-        sys.exit(str('Switch time out of domain.'))
+        raise ValidationError(str('Switch time out of domain. '
+                                  '{} not in [{}, {}]'.format(
+                                      value, lower, upper)))
 
 
 def check_input(value, varname=None):
@@ -101,11 +127,11 @@ def check_input(value, varname=None):
     If not properly defined
 
     Raises:
-        * System exist for no value defined.
+        * :class:`MissingValueError` for no value defined.
     '''
     if value is None:
-        sys.exit(str('No value defined. '
-                     'Provide value for {}.'.format(varname)))
+        raise MissingValueError(str('No value defined. '
+                                    'Provide value for {}.'.format(varname)))
 
 
 def check_singularity(singularity, upper):
@@ -130,6 +156,74 @@ def check_singularity(singularity, upper):
         return singularity
 
 
+def check_precision(precision):
+    '''
+    Check that numerical precision is supported.
+
+    Args:
+        * **precision** (:py:class:`str`): Either `'float'` for double
+          precision or `'mp'` for mpmath arbitrary precision.
+
+    If supported,
+
+    Returns:
+        * **precision** (:py:class:`str`)
+
+    else
+
+    Raises:
+        * :class:`ValidationError` for unknown precision.
+    '''
+    if precision in ('float', 'mp'):
+        return precision
+    raise ValidationError(str('Invalid precision: {}. '
+                              'Please specify float or mp.'.format(precision)))
+
+
+def check_grading(grading):
+    '''
+    Check that grading exponent is positive.
+
+    Args:
+        * **grading** (:py:class:`float`): Grading exponent of grid.
+
+    Returns:
+        * **grading** (:py:class:`float`)
+
+    Raises:
+        * :class:`ValidationError` if **grading** is not positive.
+    '''
+    if not grading > 0:
+        raise ValidationError(str('Invalid value! grading must be positive. '
+                                  'grading = {}'.format(grading)))
+    return float(grading)
+
+
+def check_grid(grid):
+    '''
+    Check that grid is one-dimensional and strictly increasing.
+
+    Args:
+        * **grid** (array_like): Grid points.
+
+    Returns:
+        * **grid** (:class:`~numpy.ndarray`)
+
+    Raises:
+        * :class:`ValidationError` for fewer than two points or points
+          that are not strictly increasing.
+    '''
+    grid = np.asarray(grid)
+    if grid.ndim != 1 or grid.size < 2:
+        raise ValidationError(str('Invalid grid! Expect at least two '
+                                  'points in a 1-D array. shape = {}'.format(
+                                      grid.shape)))
+    if not all(grid[1:] > grid[:-1]):
+        raise ValidationError('Invalid grid! Points must be strictly '
+                              'increasing.')
+    return grid
+
+
 def check_node_type(n):
     '''
     Check that number of nodes is an integer.
@@ -141,3 +235,96 @@ def check_node_type(n):
         * `int(n)`
     '''
     return int(n)
+
+
+def fft_convolve(kernel, signal):
+    '''
+    Full linear convolution along the first axis using real FFTs.
+
+    Args:
+        * **kernel** (:class:`~numpy.ndarray`): Shape (n,).
+        * **signal** (:class:`~numpy.ndarray`): Shape (m,) or (m, k).
+
+    Returns:
+        * :class:`~numpy.ndarray` of shape (n + m - 1,) or
+          (n + m - 1, k).
+    '''
+    size = kernel.shape[0] + signal.shape[0] - 1
+    # pad to a power of two to keep transforms fast
+    nfft = 1 << (size - 1).bit_length()
+    fk = np.fft.rfft(kernel, nfft)
+    fs = np.fft.rfft(signal, nfft, axis=0)
+    if signal.ndim > 1:
+        fk = fk.reshape((-1,) + (1,)*(signal.ndim - 1))
+    return np.fft.irfft(fk*fs, nfft, axis=0)[:size]
+
+
+class LRUCache(object):
+    '''
+    Bounded least-recently-used cache.
+
+    Values are stored against hashable keys.  Once the cache holds
+    **maxsize** entries, adding a new entry evicts the entry that was
+    least recently used.  The evicted value is returned to the caller,
+    which allows buffers to be recycled rather than reallocated.
+
+    Kwargs: name (type) - default
+        * **maxsize** (:py:class:`int`) - `8`: Maximum number of entries.
+    '''
+    def __init__(self, maxsize=8):
+        self.maxsize = check_node_type(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        '''
+        Return value stored for **key**, or **default** if missing.
+        '''
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        '''
+        Store **value** for **key**.
+
+        Returns:
+            * Evicted value if the cache overflowed, otherwise `None`.
+        '''
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            return self._data.popitem(last=False)[1]
+        return None
+
+    def pop_oldest(self):
+        '''
+        Remove and return the least recently used value.
+        '''
+        return self._data.popitem(last=False)[1]
+
+    def full(self):
+        '''
+        Check if cache holds **maxsize** entries.
+        '''
+        return len(self._data) >= self.maxsize
+
+    def clear(self):
+        '''
+        Remove all entries and reset statistics.
+        '''
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
@@ -38,7 +38,8 @@ setup(
     packages=find_packages(),
     zip_safe=False,
     install_requires=['numpy>=1.14', 'scipy>=1.0', 'sympy>=1.3'],
-    extras_require = {'docs':['sphinx']},
+    extras_require = {'docs':['sphinx'], 'numba':['numba']},
+    entry_points={'console_scripts': ['pyfod=pyfod.cli:main']},
     classifiers=['License :: OSI Approved :: MIT License',
                    'Natural Language :: English',
                    'Operating System :: MacOS :: MacOS X',
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import unittest
+import numpy as np
+from pyfod import aio
+from pyfod.fod import caputo, riemannliouville
+from pyfod.quadrature import GaussLegendre, RiemannSum
+from pyfod.utilities import ValidationError
+
+
+def fexp(t):
+    return np.exp(2*t)
+
+
+class Simulator:
+    # stand-in for a latency-bound service, records concurrent calls
+    def __init__(self, func=fexp):
+        self.func = func
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def __call__(self, points):
+        self.active += 1
+        self.calls += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.001*(points.size % 3))
+        self.active -= 1
+        return self.func(points)
+
+
+def fvec(t):
+    return np.column_stack((np.exp(2*t), np.cos(t)))
+
+
+class Integrate(unittest.TestCase):
+
+    def test_matches_sync(self):
+        quad = GaussLegendre(ndom=20, deg=4, lower=0, upper=1)
+        sim = Simulator()
+        value = asyncio.run(aio.integrate(quad, sim, chunk_size=7,
+                                          concurrency=3))
+        self.assertAlmostEqual(value, quad.integrate(f=fexp), places=12,
+                               msg='Expect same integral as sync path')
+        self.assertEqual(sim.calls, -(-quad.points.size//7),
+                         msg='Expect one call per chunk')
+        self.assertLessEqual(sim.peak, 3,
+                             msg='Expect bounded concurrency')
+        self.assertGreater(sim.peak, 1, msg='Expect concurrent calls')
+
+    def test_deterministic(self):
+        # later chunks complete first, partial sums keep chunk order
+        quad = GaussLegendre(ndom=50, deg=4, lower=0, upper=1)
+
+        async def reverse(points):
+            await asyncio.sleep(0.001*(1.0 - points[0]))
+            return fexp(points)
+        value = asyncio.run(aio.integrate(quad, reverse, chunk_size=10,
+                                          concurrency=20))
+        total = 0.0
+        for start in range(0, quad.points.size, 10):
+            stop = start + 10
+            total = total + np.dot(quad.weights[start:stop],
+                                   fexp(quad.points[start:stop]))
+        self.assertEqual(value, total, msg='Expect sum in chunk order')
+
+    def test_rule_and_vector(self):
+        rule = RiemannSum(n=50, lower=0, upper=1, alpha=0.4).rule()
+        value = asyncio.run(aio.integrate(rule, Simulator(fvec)))
+        self.assertEqual(value.shape, (2,), msg='Expect one value per channel')
+        self.assertTrue(np.allclose(value, rule.integrate(fvec)),
+                        msg='Expect same integral as sync path')
+
+    def test_invalid(self):
+        quad = RiemannSum(n=10, lower=0, upper=1, precision='mp')
+        with self.assertRaises(ValidationError):
+            asyncio.run(aio.integrate(quad, Simulator()))
+        quad = RiemannSum(n=10, lower=0, upper=1)
+        with self.assertRaises(ValidationError):
+            asyncio.run(aio.integrate(quad, Simulator(), concurrency=0))
+
+
+class Derivatives(unittest.TestCase):
+
+    def test_riemannliouville(self):
+        for quadrature in ['rs', 'glegrs', 'gleg']:
+            sim = Simulator()
+            out = asyncio.run(aio.riemannliouville(
+                sim, 0.0, 1.0, alpha=0.1, quadrature=quadrature,
+                concurrency=4))
+            ref = riemannliouville(fexp, 0.0, 1.0, alpha=0.1,
+                                   quadrature=quadrature)
+            self.assertAlmostEqual(out['fd'], ref['fd'], places=6,
+                                   msg=quadrature)
+            self.assertLessEqual(sim.peak, 4, msg='Expect shared limit')
+
+    def test_riemannliouville_object(self):
+        quad = GaussLegendre(ndom=5, deg=4, lower=0, upper=1)
+        out = asyncio.run(aio.riemannliouville(
+            Simulator(), 0.0, 1.0, alpha=0.5, quadrature=quad))
+        self.assertNotEqual(out['q1'].upper, out['q2'].upper,
+                            msg='Expect one rule per limit')
+        ref = riemannliouville(fexp, 0.0, 1.0, alpha=0.5, quadrature=quad)
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=8)
+
+    def test_caputo(self):
+        for derivative in [None, 'parts']:
+            out = asyncio.run(aio.caputo(Simulator(), 0.0, 1.0, alpha=0.9,
+                                         derivative=derivative))
+            ref = caputo(fexp, 0.0, 1.0, alpha=0.9, derivative=derivative)
+            self.assertAlmostEqual(out['fd'], ref['fd'], places=8,
+                                   msg=derivative)
+        ref = caputo(fexp, 0.0, 1.0, alpha=0.9, df=lambda t: 2*fexp(t))
+
+        async def df(t):
+            return 2*fexp(t)
+        out = asyncio.run(aio.caputo(Simulator(), 0.0, 1.0, alpha=0.9, df=df))
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=8)
+        with self.assertRaises(ValidationError):
+            asyncio.run(aio.caputo(Simulator(), 0.0, 1.0,
+                                   derivative='sympy'))
+
+    def test_higher_order(self):
+        for func, sync in [(aio.riemannliouville, riemannliouville),
+                           (aio.caputo, caputo)]:
+            out = asyncio.run(func(Simulator(), 0.0, 1.0, alpha=1.5,
+                                   dt=1e-3))
+            ref = sync(fexp, 0.0, 1.0, alpha=1.5, dt=1e-3)
+            self.assertAlmostEqual(out['fd'], ref['fd'], places=6)
+        # Caputo of integer order is the classical derivative
+        for alpha in (1.0, 2.0):
+            out = asyncio.run(aio.caputo(Simulator(), 0.0, 1.0, alpha=alpha,
+                                         dt=1e-3))
+            ref = caputo(fexp, 0.0, 1.0, alpha=alpha, dt=1e-3)
+            self.assertAlmostEqual(out['fd'], ref['fd'], places=10)
+            self.assertAlmostEqual(out['fd'], 2**alpha*fexp(1.0), delta=0.1)
+
+    def test_caputo_vector(self):
+        out = asyncio.run(aio.caputo(Simulator(fvec), 0.0, 1.0, alpha=0.5,
+                                     derivative='parts'))
+        ref = caputo(fvec, 0.0, 1.0, alpha=0.5, derivative='parts')
+        self.assertTrue(np.allclose(out['fd'], ref['fd']),
+                        msg='Expect one derivative per channel')
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import unittest
+import numpy as np
+from pyfod.cache import EvaluationCache
+from pyfod.fod import caputo, riemannliouville
+from pyfod.utilities import ValidationError
+
+
+class Counter:
+    # integrand recording the number of nodes it was evaluated on
+    def __init__(self, func=np.exp):
+        self.func = func
+        self.nodes = 0
+        self.calls = 0
+
+    def __call__(self, t):
+        self.calls += 1
+        self.nodes += np.size(t)
+        return self.func(t)
+
+
+class EvaluationCacheTesting(unittest.TestCase):
+
+    def test_missing_nodes(self):
+        f = Counter()
+        cache = EvaluationCache(f)
+        a = np.arange(11)/8
+        self.assertTrue(np.allclose(cache(a), np.exp(a)))
+        b = (np.arange(11) + 5)/8
+        self.assertTrue(np.allclose(cache(b), np.exp(b)))
+        self.assertEqual(f.calls, 2, msg='Expect one call per batch')
+        self.assertEqual(f.nodes, 11 + 5, msg='Expect only new nodes')
+        info = cache.info()
+        self.assertEqual(info['hits'], 6)
+        self.assertEqual(info['misses'], 16)
+        self.assertAlmostEqual(cache.hit_rate, 6/22)
+        cache(a)
+        self.assertEqual(f.calls, 2, msg='Expect no call if all nodes hit')
+
+    def test_duplicates_and_scalar(self):
+        f = Counter()
+        cache = EvaluationCache(f)
+        out = cache(np.array([0.2, 0.2, 0.3]))
+        self.assertEqual(f.nodes, 2, msg='Expect duplicates evaluated once')
+        self.assertEqual(out.shape, (3,))
+        self.assertAlmostEqual(cache(0.3), np.exp(0.3))
+        self.assertEqual(f.nodes, 2)
+
+    def test_eviction(self):
+        f = Counter()
+        cache = EvaluationCache(f, maxsize=5)
+        cache(np.arange(10.0))
+        self.assertEqual(cache.info()['size'], 5, msg='Expect bounded size')
+        cache(np.arange(5.0, 10.0))
+        self.assertEqual(f.nodes, 10, msg='Expect most recent nodes kept')
+        cache(np.arange(2.0))
+        self.assertEqual(f.nodes, 12, msg='Expect old nodes evicted')
+
+    def test_resolution(self):
+        f = Counter()
+        cache = EvaluationCache(f, resolution=1e-6)
+        cache(np.array([0.1, 0.2]))
+        out = cache(np.array([0.1 + 1e-9, 0.2 - 1e-9]))
+        self.assertEqual(f.nodes, 2, msg='Expect quantized nodes to match')
+        self.assertTrue(np.allclose(out, np.exp([0.1, 0.2])))
+        with self.assertRaises(ValidationError):
+            EvaluationCache(f, resolution=0)
+
+    def test_vector(self):
+        def fvec(t):
+            return np.column_stack((np.exp(t), np.cos(t)))
+        cache = EvaluationCache(fvec)
+        cache(np.linspace(0, 1, 5))
+        out = cache(np.linspace(0, 2, 9))
+        self.assertEqual(out.shape, (9, 2))
+        self.assertTrue(np.allclose(out, fvec(np.linspace(0, 2, 9))))
+
+    def test_riemannliouville_sweep(self):
+        f = Counter()
+        cache = EvaluationCache(f)
+        kwargs = dict(quadrature='rs', n=101, alpha=0.5, dt=1e-2)
+        for upper in [1.0, 1.01]:
+            out = riemannliouville(cache, 0.0, upper, **kwargs)
+            ref = riemannliouville(np.exp, 0.0, upper, **kwargs)
+            self.assertAlmostEqual(out['fd'], ref['fd'], places=12)
+        self.assertGreater(cache.hit_rate, 0.2,
+                           msg='Expect F(t_j) to reuse nodes of F(t_j+1)')
+        self.assertLess(f.nodes, 4*101)
+
+    def test_caputo(self):
+        cache = EvaluationCache(np.exp)
+        out = caputo(cache, 0.0, 1.0, alpha=0.5, derivative='parts')
+        ref = caputo(np.exp, 0.0, 1.0, alpha=0.5, derivative='parts')
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=12)
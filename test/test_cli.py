@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+import sympy as sp
+from pyfod import cli
+from pyfod.fod import caputo as cap
+from pyfod.fod import riemannliouville as rlou
+from pyfod.utilities import ValidationError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASKS = [
+    dict(name='exp', method='caputo', function='exp(2*t)',
+         alpha=[0.1, 0.5], time=dict(start=0.5, stop=1.0, num=3),
+         settings=dict(nrs=100)),
+    dict(name='sin', method='riemannliouville', function='sin(t)',
+         alpha=0.5, time=[1.0], settings=dict(nrs=100)),
+    dict(name='data', method='caputo', data='data.csv', alpha=0.5,
+         time=[1.0], quadrature='rs', settings=dict(n=200), dt=1e-3),
+    dict(name='gl', method='grunwaldletnikov', function='exp(2*t)',
+         alpha=0.5, time=[1.0], n=200),
+]
+
+
+class BatchTesting(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        t = np.linspace(0.0, 2.0, 2001)
+        np.savetxt(os.path.join(self.dir, 'data.csv'),
+                   np.column_stack((t, np.exp(2*t))), delimiter=',')
+        self.tasks = os.path.join(self.dir, 'tasks.json')
+        with open(self.tasks, 'w') as stream:
+            json.dump(dict(tasks=TASKS), stream)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_npz(self):
+        out = os.path.join(self.dir, 'out.npz')
+        progress = io.StringIO()
+        summary = cli.run(cli.load_tasks(self.tasks), out, progress=progress)
+        self.assertEqual(summary['groups'], 3,
+                         msg='Expect GLegRS tasks to share a group')
+        self.assertEqual(summary['derivatives'], 9)
+        self.assertTrue('4 tasks in 3 quadrature groups' in
+                        progress.getvalue())
+        with np.load(out) as data:
+            self.assertEqual(data['exp_fd'].shape, (2, 3))
+            self.assertTrue(np.allclose(data['exp_time'], [0.5, 0.75, 1.0]))
+            ref = cap(f=lambda t: np.exp(2*t), lower=0.0, upper=0.75,
+                      alpha=0.5, nrs=100)
+            self.assertAlmostEqual(data['exp_fd'][1, 1], ref['fd'],
+                                   places=10)
+            ref = rlou(f=np.sin, lower=0.0, upper=1.0, alpha=0.5, nrs=100)
+            self.assertAlmostEqual(data['sin_fd'][0, 0], ref['fd'],
+                                   places=10)
+            # sampled data is interpolated
+            ref = cap(f=lambda t: np.exp(2*t), lower=0.0, upper=1.0,
+                      alpha=0.5, quadrature='rs', n=200, dt=1e-3)
+            self.assertAlmostEqual(data['data_fd'][0, 0], ref['fd'],
+                                   delta=1e-2)
+
+    def test_csv_and_workers(self):
+        tasks = os.path.join(self.dir, 'tasks.csv')
+        with open(tasks, 'w', newline='') as stream:
+            rows = csv.writer(stream)
+            rows.writerow(['name', 'method', 'function', 'alpha', 'time',
+                           'settings', 'dt'])
+            rows.writerow(['a', 'caputo', 'exp(2*t)', '0.1;0.5', '0.5:1:3',
+                           '{"nrs": 100}', '1e-4'])
+            rows.writerow(['b', 'riemannliouville', 'sin(t)', '0.5', '1.0',
+                           '{"nrs": 100}', ''])
+        out = os.path.join(self.dir, 'out.csv')
+        serial = os.path.join(self.dir, 'serial.npz')
+        loaded = cli.load_tasks(tasks)
+        self.assertEqual(loaded[0]['dt'], 1e-4)
+        cli.run(loaded, out, workers=2, progress=None)
+        cli.run(loaded, serial, progress=None)
+        with open(out, newline='') as stream:
+            rows = list(csv.DictReader(stream))
+        self.assertEqual(len(rows), 7, msg='Expect one row per derivative')
+        with np.load(serial) as data:
+            for row in rows:
+                if row['task'] == 'a' and row['alpha'] == '0.5' and \
+                        row['time'] == '1.0':
+                    self.assertEqual(float(row['fd']), data['a_fd'][1, 2])
+
+    def test_glag_function(self):
+        # expressions are compiled for the mpmath Gauss-Laguerre nodes
+        out = os.path.join(self.dir, 'out.npz')
+        tasks = [dict(name='glag', method='riemannliouville',
+                      function='exp(2*t)', alpha=0.5, time=[1.0],
+                      quadrature='glag', settings=dict(deg=10)),
+                 dict(name='hybrid', method='caputo', function='exp(2*t)',
+                      alpha=0.5, time=[1.0], quadrature='GLegGLag',
+                      derivative='sympy', settings=dict(glag_deg=10))]
+        with open(self.tasks, 'w') as stream:
+            json.dump(tasks, stream)
+        summary = cli.run(cli.load_tasks(self.tasks), out, progress=None)
+        self.assertEqual(summary['failed'], [])
+        t = sp.Symbol('t')
+        with np.load(out) as data:
+            ref = rlou(f=sp.exp(2*t), lower=0.0, upper=1.0,
+                       alpha=0.5, quadrature='glag', deg=10)
+            self.assertAlmostEqual(data['glag_fd'][0, 0], float(ref['fd']),
+                                   places=10)
+            ref = cap(f=sp.exp(2*t), lower=0.0, upper=1.0, alpha=0.5,
+                      quadrature='GLegGLag', derivative='sympy', glag_deg=10)
+            self.assertAlmostEqual(data['hybrid_fd'][0, 0],
+                                   float(ref['fd']), places=10)
+
+    def test_failed_task(self):
+        out = os.path.join(self.dir, 'out.csv')
+        bad = dict(name='bad', method='caputo', function='exp(2*t)',
+                   alpha=0.5, time=[1.0], derivative='hello')
+        with open(self.tasks, 'w') as stream:
+            json.dump([bad], stream)
+        progress = io.StringIO()
+        summary = cli.run(cli.load_tasks(self.tasks), out, progress=progress)
+        self.assertEqual(summary['failed'], ['bad'])
+        self.assertTrue('bad: failed: ValidationError' in progress.getvalue())
+        self.assertFalse(os.path.exists(out),
+                         msg='Expect no output without results')
+        # other tasks still complete, the console script reports failure
+        with open(self.tasks, 'w') as stream:
+            json.dump([bad] + TASKS[:2], stream)
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        proc = subprocess.run([sys.executable, '-m', 'pyfod', self.tasks,
+                               '-o', out, '-q'], env=env,
+                              capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 1)
+        self.assertTrue('tasks failed: bad' in proc.stderr)
+        with open(out, newline='') as stream:
+            self.assertEqual(len(list(csv.DictReader(stream))), 7)
+
+    def test_invalid(self):
+        for task in [dict(method='hello', function='t', alpha=0.5, time=1),
+                     dict(method='caputo', alpha=0.5, time=1),
+                     dict(method='caputo', function='t', time=1)]:
+            with open(self.tasks, 'w') as stream:
+                json.dump([task], stream)
+            with self.assertRaises(ValidationError):
+                cli.load_tasks(self.tasks)
+        with self.assertRaises(ValidationError):
+            cli.run([], os.path.join(self.dir, 'out.npz'), workers=0)
+
+    def test_console(self):
+        out = os.path.join(self.dir, 'out.npz')
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        proc = subprocess.run([sys.executable, '-m', 'pyfod', self.tasks,
+                               '-o', out, '-q'], env=env,
+                              capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, msg=proc.stderr)
+        self.assertEqual(proc.stderr, '')
+        with np.load(out) as data:
+            self.assertEqual(len(data.files), 12)
+        proc = subprocess.run([sys.executable, '-m', 'pyfod', 'missing.json'],
+                              env=env, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 1)
+        self.assertTrue('pyfod: error' in proc.stderr)
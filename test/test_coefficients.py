@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import math
+import unittest
+import mpmath
+import numpy as np
+import sympy as sp
+from pyfod import coefficients as co
+
+
+class GammaTesting(unittest.TestCase):
+
+    def setUp(self):
+        co.clear()
+
+    def test_gamma(self):
+        self.assertEqual(co.gamma(0.5), math.gamma(0.5),
+                         msg='Expect math.gamma')
+        co.gamma(0.5)
+        self.assertEqual(co.GAMMA.hits, 1, msg='Expect cached value')
+        value = co.gamma(0.5, precision='mp', n_digits=40)
+        self.assertTrue(isinstance(value, mpmath.mpf), msg='Expect mpf')
+        self.assertEqual(len(co.GAMMA), 2,
+                         msg='Expect separate entry per precision')
+
+
+class GLWeightsTesting(unittest.TestCase):
+
+    def setUp(self):
+        co.clear()
+
+    def test_values(self):
+        w = co.gl_weights(0.5, 10)
+        ref = [(-1)**m*float(sp.binomial(0.5, m)) for m in range(10)]
+        self.assertTrue(np.allclose(w, ref, rtol=1e-14, atol=0),
+                        msg='Expect binomial weights')
+        self.assertFalse(w.flags.writeable, msg='Expect read-only')
+
+    def test_incremental(self):
+        co.gl_weights(0.3, 10)
+        w = co.gl_weights(0.3, 15)
+        self.assertEqual(w.size, 15, msg='Expect requested size')
+        self.assertEqual(len(co.GL_WEIGHTS), 1,
+                         msg='Expect vector extended, not duplicated')
+        self.assertTrue(np.allclose(w, co._extend(None, 0.3, 15,
+                                                  'float', None)),
+                        msg='Expect same weights as from scratch')
+        self.assertEqual(co.gl_weights(0.3, 12).size, 12,
+                         msg='Expect slice of stored vector')
+
+    def test_mp(self):
+        w = co.gl_weights(0.5, 8, precision='mp', n_digits=40)
+        self.assertEqual(w.dtype, object, msg='Expect mpf entries')
+        with mpmath.workdps(40):
+            self.assertEqual(w[3], -mpmath.binomial(mpmath.mpf(0.5), 3),
+                             msg='Expect exact recurrence')
+
+    def test_lru(self):
+        for alpha in np.linspace(0.1, 0.9, co.GL_WEIGHTS.maxsize + 1):
+            co.gl_weights(alpha, 4)
+        self.assertEqual(len(co.GL_WEIGHTS), co.GL_WEIGHTS.maxsize,
+                         msg='Expect bounded store')
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import math
+import unittest
+import numpy as np
+import pyfod
+from pyfod.fde import solve_fde
+from pyfod.utilities import ValidationError
+
+
+def gsq(t, y, alpha=0.5):
+    # right hand side with exact solution y = t**2
+    return 2/math.gamma(3 - alpha)*t**(2 - alpha)
+
+
+def grelax(t, y):
+    return -y
+
+
+class SolveFDE(unittest.TestCase):
+
+    def test_exact_solution(self):
+        errors = []
+        for n in [50, 100]:
+            out = solve_fde(gsq, 0.0, 0.0, 1.0, n=n, alpha=0.5)
+            self.assertEqual(out['y'].shape, (n + 1,),
+                             msg='Expect one value per time point')
+            errors.append(np.abs(out['y'] - out['t']**2).max())
+        self.assertLess(errors[0], 1e-4, msg='Expect accurate solution')
+        self.assertLess(errors[1], errors[0]/3,
+                        msg='Expect convergence with refinement')
+
+    def test_fft_history(self):
+        a = solve_fde(grelax, 1.0, 0.0, 2.0, n=300, alpha=0.3, block=4)
+        b = solve_fde(grelax, 1.0, 0.0, 2.0, n=300, alpha=0.3, block=400)
+        self.assertTrue(np.allclose(a['y'], b['y'], rtol=0, atol=1e-13),
+                        msg='Expect FFT and direct history to agree')
+
+    def test_mittag_leffler(self):
+        # y = E_{1/2}(-t^{1/2}) = exp(t)erfc(sqrt(t))
+        out = solve_fde(grelax, 1.0, 0.0, 2.0, n=1000, alpha=0.5)
+        exact = math.exp(2.0)*math.erfc(math.sqrt(2.0))
+        self.assertAlmostEqual(out['y'][-1], exact, places=5)
+
+    def test_system(self):
+        def g(t, y):
+            return np.array([-y[0], -2*y[1]])
+        out = solve_fde(g, [1.0, 1.0], 0.0, 1.0, n=64, alpha=0.7)
+        self.assertEqual(out['y'].shape, (65, 2), msg='Expect (n+1, k)')
+        ref = solve_fde(grelax, 1.0, 0.0, 1.0, n=64, alpha=0.7)
+        self.assertTrue(np.allclose(out['y'][:, 0], ref['y']),
+                        msg='Expect channels to be independent')
+
+    def test_invalid_alpha(self):
+        with self.assertRaises(ValidationError):
+            solve_fde(grelax, 1.0, 0.0, 1.0, alpha=1.0)
+
+    def test_package_attribute(self):
+        self.assertTrue(pyfod.solve_fde is solve_fde,
+                        msg='Expect solver exported by package')
@@ -4,6 +4,9 @@ from pyfod import fod
 from pyfod.fod import riemannliouville as rlou
 from pyfod.fod import caputo as cap
 from pyfod.fod import grunwaldletnikov as glet
+from pyfod import quadrature as qm
+from pyfod.utilities import ValidationError
+import mpmath
 import numpy as np
 import sympy as sp
 
@@ -20,7 +23,7 @@ def fsp(t):
 class SelectQuadratureMethodTesting(unittest.TestCase):
 
     def test_selection(self):
-        with self.assertRaises(SystemExit):
+        with self.assertRaises(ValidationError):
             fod._select_quadrature_method(quadrature='hello')
 
 
@@ -52,6 +55,34 @@ class RiemannLiouville(unittest.TestCase):
         self.assertTrue(isinstance(out['fd'], float),
                         msg='Expect float return')
 
+    def test_fod_mp(self):
+        out = rlou(f=fsp, alpha=0.5, lower=0.0, upper=1.0, dt=1e-3,
+                   quadrature='gleg', precision='mp')
+        self.assertTrue(isinstance(out['fd'], mpmath.mpf),
+                        msg='Expect mpf return')
+        ref = rlou(f=fexp, alpha=0.5, lower=0.0, upper=1.0, dt=1e-3,
+                   quadrature='gleg')
+        self.assertAlmostEqual(float(out['fd']), ref['fd'], places=6)
+
+    def test_fod_with_quadrature_object(self):
+        Q = qm.RiemannSum(n=100, lower=0.0, upper=1.0)
+        out = rlou(f=fexp, alpha=0.5, lower=0.0, upper=0.5,
+                   quadrature=Q)
+        self.check_contents(out)
+        self.assertTrue(out['q1'] is Q, msg='Expect object reused')
+        ref = rlou(f=fexp, alpha=0.5, lower=0.0, upper=0.5,
+                   quadrature='rs', n=100)
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=6)
+
+    def test_fod_vector(self):
+        def f(t):
+            return np.exp(np.outer(t, [1.0, 2.0]))
+        out = rlou(f=f, alpha=0.5, lower=0.0, upper=1.0)
+        self.assertEqual(out['fd'].shape, (2,),
+                         msg='Expect one derivative per channel')
+        ref = rlou(f=fexp, alpha=0.5, lower=0.0, upper=1.0)
+        self.assertAlmostEqual(out['fd'][1], ref['fd'], places=10)
+
 
 # --------------------------
 class Caputo(unittest.TestCase):
@@ -81,6 +112,53 @@ class Caputo(unittest.TestCase):
         self.assertTrue(isinstance(out['fd'], float),
                         msg='Expect float return')
 
+    def test_derivative_sources(self):
+        ref = cap(f=fexp, alpha=0.5, lower=0.0, upper=1.0, nrs=1000)
+        out = cap(f=fexp, alpha=0.5, lower=0.0, upper=1.0, nrs=1000,
+                  derivative='parts')
+        self.check_contents(out)
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=2)
+        out = cap(f=fsp, alpha=0.5, lower=0.0, upper=1.0, nrs=1000,
+                  derivative='sympy')
+        self.check_contents(out)
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=2)
+        out = cap(f=fsp, alpha=0.5, lower=0.0, upper=1.0,
+                  derivative='sympy', quadrature='glag')
+        self.check_contents(out)
+        out = cap(f=fexp, alpha=0.5, lower=0.0, upper=1.0,
+                  df=lambda t: 2*np.exp(2*t), derivative='parts')
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=1)
+        with self.assertRaises(ValidationError):
+            cap(f=fexp, alpha=0.5, lower=0.0, upper=1.0,
+                derivative='unknown')
+
+    def test_fod_mp(self):
+        for derivative in ['fd', 'sympy', 'parts']:
+            out = cap(f=fsp, alpha=0.5, lower=0.0, upper=1.0,
+                      precision='mp', derivative=derivative)
+            self.assertTrue(isinstance(out['fd'], mpmath.mpf),
+                            msg='Expect mpf return')
+
+    def test_fod_with_quadrature_object(self):
+        Q = qm.GaussLegendre(ndom=10, deg=4)
+        out = cap(f=fexp, alpha=0.5, lower=0.0, upper=0.5, quadrature=Q)
+        self.check_contents(out)
+        ref = cap(f=fexp, alpha=0.5, lower=0.0, upper=0.5,
+                  quadrature='gleg', ndom=10, deg=4)
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=8)
+
+    def test_fod_vector(self):
+        def f(t):
+            return np.exp(np.outer(t, [1.0, 2.0]))
+        for derivative in ['fd', 'parts']:
+            out = cap(f=f, alpha=0.5, lower=0.0, upper=1.0,
+                      derivative=derivative)
+            self.assertEqual(out['fd'].shape, (2,),
+                             msg='Expect one derivative per channel')
+            ref = cap(f=fexp, alpha=0.5, lower=0.0, upper=1.0,
+                      derivative=derivative)
+            self.assertAlmostEqual(out['fd'][1], ref['fd'], places=10)
+
 
 # --------------------------
 class GrunwaldLetnikov(unittest.TestCase):
@@ -99,10 +177,289 @@ class GrunwaldLetnikov(unittest.TestCase):
         out = glet(f=fexp, alpha=alpha, lower=lower,
                    upper=upper)
         self.check_contents(out)
-        self.assertTrue(out['fd'].is_Float,
-                        msg='Expect sympy float return')
+        self.assertTrue(isinstance(out['fd'], float),
+                        msg='Expect float return')
         out = glet(f=fsp, alpha=alpha, lower=lower,
                    upper=upper)
         self.check_contents(out)
-        self.assertTrue(out['fd'].is_Float,
-                        msg='Expect sympy float return')
+        self.assertTrue(isinstance(out['fd'], float),
+                        msg='Expect float return')
+
+    def test_binomial_weights(self):
+        # reference from the symbolic binomial series
+        dt = 1e-2
+        ref = sum((-1.0)**m*float(sp.binomial(0.5, m))*fexp(1.0 - m*dt)
+                  for m in range(100))/dt**0.5
+        out = glet(f=fexp, alpha=0.5, lower=0.0, upper=1.0)
+        self.assertAlmostEqual(out['fd'], ref, places=10)
+        out = glet(f=fsp, alpha=0.5, lower=0.0, upper=1.0, precision='mp')
+        self.assertTrue(isinstance(out['fd'], mpmath.mpf),
+                        msg='Expect mpf return')
+        self.assertAlmostEqual(float(out['fd']), ref, places=10)
+
+    def test_closure_state(self):
+        # handles are evaluated as given, not traced once and cached
+        scale = [1.0]
+
+        def f(t):
+            return scale[0]*t**2
+        a = glet(f=f, alpha=0.5, lower=0.0, upper=1.0)['fd']
+        scale[0] = 3.0
+        b = glet(f=f, alpha=0.5, lower=0.0, upper=1.0)['fd']
+        self.assertAlmostEqual(b, 3*a, places=10)
+
+
+# --------------------------
+class HigherOrder(unittest.TestCase):
+    # D^1.5[t^2] = Gamma(3)/Gamma(1.5) t^0.5 for all three definitions
+    exact = 2/mpmath.gamma(1.5)
+
+    @classmethod
+    def fsq(cls, t):
+        return t**2
+
+    def test_order(self):
+        self.assertEqual(fod._order(0.5), (1, 0.5))
+        self.assertEqual(fod._order(1.0), (2, 0.0))
+        self.assertEqual(fod._order(2.25), (3, 0.25))
+        self.assertEqual(fod._stencil(3), [1, -3, 3, -1])
+        self.assertEqual(fod._integer_order(0.0), 0)
+        self.assertEqual(fod._integer_order(1.5), 0)
+        self.assertEqual(fod._integer_order(2.0), 2)
+
+    def test_riemannliouville(self):
+        out = rlou(f=self.fsq, alpha=1.5, lower=0.0, upper=1.0, dt=1e-3,
+                   nrs=2000)
+        self.assertAlmostEqual(out['fd'], self.exact, delta=2e-3)
+        self.assertEqual(len(out['integrals']), 3,
+                         msg='Expect one integral per stencil point')
+        Q = qm.RiemannSum(n=2000)
+        out = rlou(f=self.fsq, alpha=1.5, lower=0.0, upper=1.0, dt=1e-3,
+                   quadrature=Q)
+        self.assertAlmostEqual(out['fd'], self.exact, delta=2e-3)
+        self.assertEqual(Q.alpha, 0.5, msg='Expect kernel exponent 0.5')
+        # integer order reduces to the ordinary derivative
+        out = rlou(f=np.exp, alpha=1.0, lower=0.0, upper=1.0)
+        self.assertAlmostEqual(out['fd'], np.e, delta=1e-3)
+        self.assertTrue(out['q1'] is out['q2'],
+                        msg='Expect one object remapped to each limit')
+        self.assertEqual(out['q1'].upper, 1.0)
+        out = rlou(f=self.fsq, alpha=2.0, lower=0.0, upper=1.0, dt=1e-3)
+        self.assertAlmostEqual(out['fd'], 2.0, delta=1e-3)
+
+    def test_caputo(self):
+        out = cap(f=self.fsq, alpha=1.5, lower=0.0, upper=1.0, dt=1e-3,
+                  nrs=2000)
+        self.assertAlmostEqual(out['fd'], self.exact, delta=1e-4)
+        t = sp.Symbol('t')
+        out = cap(f=t**3, alpha=1.5, lower=0.0, upper=1.0, nrs=2000,
+                  derivative='sympy')
+        self.assertAlmostEqual(out['fd'], 6/mpmath.gamma(2.5), delta=1e-4)
+        out = cap(f=self.fsq, alpha=1.5, lower=0.0, upper=1.0, nrs=2000,
+                  df=lambda t: 2*np.ones_like(t))
+        self.assertAlmostEqual(out['fd'], self.exact, delta=1e-4)
+        with self.assertRaises(ValidationError):
+            cap(f=self.fsq, alpha=1.5, lower=0.0, upper=1.0,
+                derivative='parts')
+
+    def test_caputo_integer(self):
+        # classical derivatives, not f^(m)(t) - f^(m)(t0)
+        out = cap(f=self.fsq, alpha=2.0, lower=0.0, upper=1.0, dt=1e-3)
+        self.assertAlmostEqual(out['fd'], 2.0, delta=1e-3)
+        out = cap(f=self.fsq, alpha=1.0, lower=0.0, upper=1.0)
+        self.assertAlmostEqual(out['fd'], 2.0, delta=1e-3)
+        t = sp.Symbol('t')
+        out = cap(f=t**2, alpha=1.0, lower=0.0, upper=0.5,
+                  derivative='sympy')
+        self.assertAlmostEqual(out['fd'], 1.0, places=12)
+        out = cap(f=t**2, alpha=2.0, lower=0.0, upper=1.0,
+                  derivative='sympy')
+        self.assertAlmostEqual(out['fd'], 2.0, places=12)
+        out = cap(f=self.fsq, alpha=2.0, lower=0.0, upper=1.0,
+                  df=lambda t: 2*np.ones_like(t))
+        self.assertEqual(out['fd'], 2.0)
+        # continuous in alpha
+        near = cap(f=self.fsq, alpha=1.999, lower=0.0, upper=1.0, dt=1e-3,
+                   nrs=2000)
+        self.assertAlmostEqual(near['fd'], 2.0, delta=1e-2)
+        with self.assertRaises(ValidationError):
+            cap(f=self.fsq, alpha=1.0, lower=0.0, upper=1.0, gradient=True)
+
+    def test_grunwaldletnikov(self):
+        out = glet(f=self.fsq, alpha=1.5, lower=0.0, upper=1.0, n=2000)
+        self.assertAlmostEqual(out['fd'], self.exact, delta=1e-3)
+
+
+class BatchedParameters(unittest.TestCase):
+
+    theta = np.array([1.0, 2.0, 0.5])
+
+    @classmethod
+    def f(cls, t, theta):
+        return np.exp(np.outer(theta, t))
+
+    def check(self, calculator, **kwargs):
+        out = calculator(f=self.f, lower=0.0, upper=1.0,
+                         theta=self.theta, **kwargs)
+        self.assertEqual(out['fd'].shape, (3,),
+                         msg='Expect one derivative per theta')
+        for k, c in enumerate(self.theta):
+            ref = calculator(f=lambda t: np.exp(c*t), lower=0.0, upper=1.0,
+                             **kwargs)
+            self.assertAlmostEqual(out['fd'][k], ref['fd'], places=6)
+
+    def test_riemannliouville(self):
+        self.check(rlou, alpha=0.5)
+        self.check(rlou, alpha=1.5, quadrature=qm.RiemannSum(n=200))
+
+    def test_caputo(self):
+        self.check(cap, alpha=0.5)
+        self.check(cap, alpha=1.5)
+        self.check(cap, alpha=0.5, derivative='parts')
+        with self.assertRaises(ValidationError):
+            cap(f=self.f, lower=0.0, upper=1.0, alpha=0.5,
+                theta=self.theta, derivative='sympy')
+
+    def test_grunwaldletnikov(self):
+        self.check(glet, alpha=0.5)
+        with self.assertRaises(ValidationError):
+            glet(f=self.f, lower=0.0, upper=1.0, alpha=0.5,
+                 theta=self.theta, precision='mp')
+
+
+class Gradients(unittest.TestCase):
+
+    p = 1.3
+
+    @classmethod
+    def f(cls, t, p=None):
+        return np.exp((cls.p if p is None else p)*t)
+
+    @classmethod
+    def jacobian(cls, t):
+        return (t*np.exp(cls.p*t)).reshape(-1, 1)
+
+    def check(self, calculator, alpha, places=6, **kwargs):
+        out = calculator(f=self.f, lower=0.0, upper=1.0, alpha=alpha,
+                         jacobian=self.jacobian, **kwargs)
+        h = 1e-5
+        da = (calculator(f=self.f, lower=0.0, upper=1.0, alpha=alpha + h,
+                         **kwargs)['fd']
+              - calculator(f=self.f, lower=0.0, upper=1.0, alpha=alpha - h,
+                           **kwargs)['fd'])/(2*h)
+        dp = (calculator(f=lambda t: self.f(t, self.p + h), lower=0.0,
+                         upper=1.0, alpha=alpha, **kwargs)['fd']
+              - calculator(f=lambda t: self.f(t, self.p - h), lower=0.0,
+                           upper=1.0, alpha=alpha, **kwargs)['fd'])/(2*h)
+        self.assertAlmostEqual(out['dfd_dalpha'], da, places=places)
+        self.assertEqual(out['dfd_dparams'].shape, (1,))
+        self.assertAlmostEqual(out['dfd_dparams'][0], dp, places=places)
+
+    def test_caputo(self):
+        for alpha in [0.0, 0.3, 0.8]:
+            self.check(cap, alpha, nrs=200)
+            self.check(cap, alpha, quadrature='rs', n=300)
+            self.check(cap, alpha, nrs=200, derivative='parts')
+
+    def test_riemannliouville(self):
+        for alpha in [0.3, 0.8]:
+            self.check(rlou, alpha, places=4, nrs=200)
+            self.check(rlou, alpha, places=4, quadrature='gleg')
+
+    def test_gradient_only(self):
+        out = cap(f=self.f, lower=0.0, upper=1.0, alpha=0.5, gradient=True)
+        self.assertTrue('dfd_dalpha' in out)
+        self.assertFalse('dfd_dparams' in out)
+        ref = cap(f=self.f, lower=0.0, upper=1.0, alpha=0.5)
+        self.assertAlmostEqual(out['fd'], ref['fd'], places=12)
+
+    def test_composite(self):
+        Q = qm.GaussLegendreRiemannSum(nrs=100)
+        for func in [cap, rlou]:
+            out = func(f=self.f, lower=0.0, upper=1.0, alpha=0.5,
+                       quadrature=Q.composite(), gradient=True)
+            ref = func(f=self.f, lower=0.0, upper=1.0, alpha=0.5,
+                       quadrature=Q, gradient=True)
+            self.assertAlmostEqual(out['dfd_dalpha'], ref['dfd_dalpha'],
+                                   places=6)
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError):
+            cap(f=self.f, lower=0.0, upper=1.0, alpha=0.5, gradient=True,
+                precision='mp')
+        with self.assertRaises(ValidationError):
+            rlou(f=lambda t, theta: np.exp(np.outer(theta, t)), lower=0.0,
+                 upper=1.0, alpha=0.5, gradient=True, theta=[1.0, 2.0])
+        with self.assertRaises(ValidationError):
+            cap(f=lambda t, theta: np.exp(np.outer(theta, t)), lower=0.0,
+                upper=1.0, alpha=0.5, gradient=True, theta=[1.0, 2.0],
+                derivative='parts')
+
+
+class AutoStep(unittest.TestCase):
+
+    def test_error_estimate(self):
+        # alpha = 0 gives f(t) and f(t) - f(t0)
+        for calculator, exact in [(rlou, np.exp(2.0)),
+                                  (cap, np.exp(2.0) - 1)]:
+            out = calculator(f=fexp, lower=0.0, upper=1.0, auto_dt=True,
+                             nrs=2000)
+            error = abs(out['fd'] - exact)
+            self.assertLess(error, 1e-6, msg='Expect better than dt=1e-4')
+            self.assertLess(error, 10*out['error'])
+            self.assertLess(out['dt'], 1e-4)
+
+    def test_exact_quotient(self):
+        # the difference quotient of a linear function is exact, so the
+        # pilot step is kept
+        out = cap(f=lambda t: 3*t, lower=0.0, upper=2.0, alpha=0.5,
+                  auto_dt=True)
+        self.assertAlmostEqual(out['dt'], 2*fod.AUTO_DT_PILOT)
+        out = rlou(f=fexp, lower=0.0, upper=1.0, alpha=1.5, auto_dt=True,
+                   quadrature=qm.RiemannSum(n=2000))
+        self.assertEqual(len(out['integrals']), 3)
+        self.assertIs(out['q1'], out['q2'])
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError):
+            cap(f=fexp, lower=0.0, upper=1.0, alpha=0.5, auto_dt=True,
+                derivative='parts')
+        with self.assertRaises(ValidationError):
+            rlou(f=fexp, lower=0.0, upper=1.0, alpha=0.5, auto_dt=True,
+                 gradient=True)
+        with self.assertRaises(ValidationError):
+            rlou(f=fsp, lower=0.0, upper=1.0, alpha=0.5, auto_dt=True,
+                 quadrature='rs', precision='mp')
+
+
+class SpaceTime(unittest.TestCase):
+
+    @classmethod
+    def field(cls, t, x):
+        # u(x, t) = exp(|x| t) on a 2-D mesh of shape (n_space, 2)
+        return np.exp(np.outer(np.hypot(x[:, 0], x[:, 1]), t))
+
+    def test_field(self):
+        grid = np.linspace(0.0, 1.0, 7)
+        mesh = np.array([(a, b) for a in grid for b in grid])
+        for calculator in [rlou, cap, glet]:
+            full = calculator(f=self.field, lower=0.0, upper=1.0, alpha=0.5,
+                              theta=mesh)
+            out = calculator(f=self.field, lower=0.0, upper=1.0, alpha=0.5,
+                             theta=mesh, chunk_size=10)
+            self.assertEqual(out['fd'].shape, (49,),
+                             msg='Expect one derivative per mesh point')
+            self.assertTrue(np.allclose(out['fd'], full['fd'], rtol=1e-10))
+            c = np.hypot(*mesh[17])
+            ref = calculator(f=lambda t: np.exp(c*t), lower=0.0, upper=1.0,
+                             alpha=0.5)
+            self.assertAlmostEqual(out['fd'][17], ref['fd'], places=6)
+
+    def test_parts(self):
+        x = np.linspace(0.0, 1.0, 9).reshape(-1, 1)
+        out = cap(f=lambda t, x: np.exp(np.outer(x[:, 0], t)), lower=0.0,
+                  upper=1.0, alpha=0.5, theta=x, chunk_size=4,
+                  derivative='parts')
+        ref = cap(f=lambda t, x: np.exp(np.outer(x[:, 0], t)), lower=0.0,
+                  upper=1.0, alpha=0.5, theta=x, derivative='parts')
+        self.assertTrue(np.allclose(out['fd'], ref['fd'], rtol=1e-10))
@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import os
+import subprocess
+import sys
 import unittest
 import pyfod
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 
 class ImportPyfod(unittest.TestCase):
 
@@ -11,4 +16,24 @@ class ImportPyfod(unittest.TestCase):
         self.assertTrue(isinstance(version, str),
                         msg='Expect string output')
         self.assertEqual(len(version.split('.')), 3,
-                         msg='Expect #.#.# format')
\ No newline at end of file
+                         msg='Expect #.#.# format')
+
+
+class LazyImports(unittest.TestCase):
+
+    def test_float_integral_skips_optional_imports(self):
+        script = str(
+            'import sys\n'
+            'import numpy as np\n'
+            'from pyfod import fod\n'
+            'fod.riemannliouville(np.exp, 0.0, 1.0, alpha=0.5)\n'
+            'fod.caputo(np.exp, 0.0, 1.0, alpha=0.5, quadrature=\'GLegGLag\','
+            ' extend_precision=False)\n'
+            'fod.grunwaldletnikov(np.exp, 0.0, 1.0, alpha=0.5)\n'
+            'print(sorted(m for m in (\'sympy\', \'mpmath\', \'scipy\')'
+            ' if m in sys.modules))')
+        out = subprocess.run([sys.executable, '-c', script],
+                             capture_output=True, text=True, check=True,
+                             cwd=ROOT)
+        self.assertEqual(out.stdout.strip(), '[]',
+                         msg='Expect no optional modules')
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import math
+import unittest
+import numpy as np
+import sympy as sp
+import pyfod
+from pyfod import quadrature as qm
+from pyfod.integral import fractional_integral
+from pyfod.utilities import ValidationError
+
+
+def flin(t):
+    return t
+
+
+def exact_lin(t, order):
+    # I^order[t] = t^(1 + order)/Gamma(2 + order)
+    return t**(1 + order)/math.gamma(2 + order)
+
+
+class Scalar(unittest.TestCase):
+
+    def test_orders(self):
+        for order in [0.3, 1.0, 1.7]:
+            out = fractional_integral(flin, 0.0, 2.0, order, nrs=2000)
+            self.assertAlmostEqual(out['fi'], exact_lin(2.0, order),
+                                   delta=1e-4, msg=str(order))
+            self.assertTrue(isinstance(out['fi'], float))
+
+    def test_quadrature_object(self):
+        Q = qm.GaussLegendre(ndom=4, deg=4)
+        out = fractional_integral(flin, 0.0, 2.0, 2.0, quadrature=Q)
+        self.assertIs(out['q1'], Q, msg='Expect object reused')
+        self.assertAlmostEqual(out['fi'], exact_lin(2.0, 2.0), places=12)
+
+    def test_extended_precision(self):
+        t = sp.Symbol('t')
+        out = fractional_integral(t, 0.0, 2.0, 0.5, quadrature='rs',
+                                  n=200, precision='mp')
+        self.assertAlmostEqual(float(out['fi']), exact_lin(2.0, 0.5),
+                               delta=1e-3)
+
+
+class Series(unittest.TestCase):
+
+    def test_exact_for_linear(self):
+        for order in [0.3, 0.5, 1.0, 1.7]:
+            out = fractional_integral(flin, 0.0, 2.0, order, mode='series',
+                                      steps=100)
+            self.assertEqual(out['fi'].shape, (101,))
+            self.assertTrue(np.allclose(out['fi'],
+                                        exact_lin(out['t'], order),
+                                        rtol=0, atol=1e-13),
+                            msg='Expect trapezoidal rule exact')
+
+    def test_matches_scalar(self):
+        out = fractional_integral(np.exp, 0.0, 1.0, 0.5, mode='series',
+                                  steps=2000)
+        ref = fractional_integral(np.exp, 0.0, 1.0, 0.5, nrs=4000)
+        self.assertAlmostEqual(out['fi'][-1], ref['fi'], delta=1e-5)
+        mid = fractional_integral(np.exp, 0.0, 0.5, 0.5, nrs=4000)
+        self.assertAlmostEqual(out['fi'][1000], mid['fi'], delta=1e-5)
+
+    def test_samples_and_vector(self):
+        t = np.linspace(0.0, 1.0, 65)
+        samples = np.column_stack((np.exp(t), t))
+        out = fractional_integral(samples, 0.0, 1.0, 0.5, mode='series')
+        self.assertEqual(out['fi'].shape, (65, 2),
+                         msg='Expect one column per channel')
+        ref = fractional_integral(np.exp, 0.0, 1.0, 0.5, mode='series',
+                                  steps=64)
+        self.assertTrue(np.allclose(out['fi'][:, 0], ref['fi']))
+        self.assertTrue(np.allclose(out['fi'][:, 1], exact_lin(t, 0.5)))
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError):
+            fractional_integral(flin, 0.0, 1.0, 0.0)
+        with self.assertRaises(ValidationError):
+            fractional_integral(flin, 0.0, 1.0, 0.5, mode='hello')
+        with self.assertRaises(ValidationError):
+            fractional_integral([1.0], 0.0, 1.0, 0.5, mode='series')
+
+    def test_lazy_attribute(self):
+        self.assertTrue(pyfod.fractional_integral is fractional_integral,
+                        msg='Expect top-level function')
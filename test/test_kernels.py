@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import unittest
+from fractions import Fraction
+import numpy as np
+from pyfod import kernels
+from pyfod import quadrature as qm
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+# --------------------------
+class KernelBackends(unittest.TestCase):
+
+    def tearDown(self):
+        kernels.use_numba(False)
+
+    def evaluate(self):
+        gleg = qm.GaussLegendre(ndom=3, deg=4, alpha=0.4)
+        rs = qm.RiemannSum(n=20, alpha=0.4)
+        glag = qm.GaussLaguerre(deg=6, alpha=0.4, extend_precision=False)
+        return [gleg.weights.copy(), rs.weights.copy(), glag.weights.copy(),
+                gleg.integrate(f=f), rs.integrate(f=f), glag.integrate(f=f)]
+
+    def test_backends_agree(self):
+        self.assertFalse(kernels.use_numba(False),
+                         msg='Expect NumPy backend')
+        ref = self.evaluate()
+        if not kernels.use_numba(True):
+            self.skipTest('numba is not installed')
+        for a, b in zip(ref, self.evaluate()):
+            self.assertTrue(np.allclose(a, b), msg='Expect equal output')
+
+    def test_rs_weights(self):
+        grid = np.linspace(0, 1, 11)
+        out = np.empty(10)
+        w = kernels.rs_weights(grid, 1.0, 0.5, out, np.empty(11))
+        self.assertTrue(w is out, msg='Expect output written in place')
+        self.assertAlmostEqual(w.sum(), 2.0, msg='Expect int (1-s)^-0.5')
+
+    def test_reduction_type(self):
+        rs = qm.RiemannSum(n=20)
+        self.assertTrue(isinstance(rs.integrate(f=f), np.float64),
+                        msg='Expect numpy float')
+
+    def test_compensated_dot(self):
+        # ill-conditioned sum, the exact result is far below the terms
+        rng = np.random.RandomState(0)
+        w = rng.uniform(0, 1, 1001)
+        feval = rng.uniform(-1, 1, 1001)*10.0**rng.randint(-8, 8, 1001)
+        feval[-1] = -float(sum(Fraction(a)*Fraction(b)
+                               for a, b in zip(w[:-1], feval[:-1])))/w[-1]
+        exact = float(sum(Fraction(a)*Fraction(b) for a, b in zip(w, feval)))
+        tol = 1e-12*abs(exact)
+        self.assertGreater(abs(np.dot(w, feval) - exact), tol)
+        cols = np.column_stack((feval, 2*feval))
+        self.assertTrue(np.allclose(
+            kernels._np_compensated_dot(w, cols), [exact, 2*exact],
+            rtol=1e-12, atol=0), msg='Expect one sum per column')
+        for numba in [False, True]:
+            if kernels.use_numba(numba) != numba:
+                self.skipTest('numba is not installed')
+            self.assertAlmostEqual(kernels.compensated_dot(w, feval), exact,
+                                   delta=tol, msg=str(numba))
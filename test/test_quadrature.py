@@ -1,7 +1,11 @@
+import mpmath
+import pickle
 import numpy as np
 import sympy as sp
 import unittest
 from pyfod import quadrature as qm
+from pyfod.utilities import MissingValueError
+from pyfod.utilities import ValidationError
 
 
 # --------------------------
@@ -182,7 +186,7 @@ class Integrate_non_extended(unittest.TestCase):
 
     def test_no_f(self):
         GQ = qm.GaussLaguerre(extend_precision=False)
-        with self.assertRaises(SystemExit):
+        with self.assertRaises(MissingValueError):
             GQ.integrate()
 
     def test_with_f(self):
@@ -205,7 +209,7 @@ class Integrate_with_extended(unittest.TestCase):
 
     def test_no_f(self):
         GQ = qm.GaussLaguerre()
-        with self.assertRaises(SystemExit):
+        with self.assertRaises(MissingValueError):
             GQ.integrate()
 
     def test_with_f(self):
@@ -285,6 +289,55 @@ class RiemannSumTesting(unittest.TestCase):
         self.different_alphas(alpha=0.5)
         self.different_alphas(alpha=0.99)
 
+    def test_graded_grid(self):
+        RS = qm.RiemannSum(n=11, lower=1.0, upper=3.0, grading=2.0)
+        unit = 1 - (1 - np.linspace(0, 1, 11))**2
+        self.assertTrue(np.allclose(RS.grid, 1.0 + 2.0*unit),
+                        msg='Expect grid graded toward upper limit')
+        self.assertEqual(RS.grid[-1], 3.0, msg='Expect exact end point')
+        # exact: int_0^1 (1-s)^(-1/2) exp(2s) ds
+        exact = 8.839439240908756
+        errors = [abs(qm.RiemannSum(n=81, alpha=0.5, grading=grading)
+                      .integrate(f=self.f) - exact)
+                  for grading in [1.0, 2.0]]
+        self.assertLess(errors[1], errors[0]/10,
+                        msg='Expect graded grid to be more accurate')
+        with self.assertRaises(ValidationError):
+            qm.RiemannSum(grading=0.0)
+        # the grid is graded toward upper, the singularity must not be
+        # inside the interval
+        RS = qm.RiemannSum(n=11, alpha=0.5, grading=2.0, singularity=1.5)
+        self.assertEqual(RS.singularity, 1.5)
+        with self.assertRaises(ValidationError):
+            qm.RiemannSum(n=11, alpha=0.5, grading=2.0, singularity=0.5)
+        with self.assertRaises(ValidationError):
+            RS.rebase(lower=0.0, upper=2.0, singularity=1.0)
+
+    def test_user_grid(self):
+        grid = np.array([0.0, 0.5, 0.8, 0.95, 1.0])
+        RS = qm.RiemannSum(grid=grid, alpha=0.5)
+        self.assertEqual(RS.n, 5, msg='Expect n taken from grid')
+        self.assertTrue(np.array_equal(RS.grid, grid))
+        values = ((1 - grid[:-1])**0.5 - (1 - grid[1:])**0.5)/0.5
+        self.assertTrue(np.allclose(RS.weights, values),
+                        msg='Expect exact kernel weights on user grid')
+        RS.rebase(lower=2.0, upper=4.0)
+        self.assertTrue(np.allclose(RS.grid, 2.0 + 2.0*grid),
+                        msg='Expect grid remapped affinely')
+        RS2 = qm.RiemannSum(grid=2.0 + 2.0*grid, lower=2.0, upper=4.0)
+        self.assertIs(RS2._unit_grid, RS._unit_grid,
+                      msg='Expect unit grid shared')
+        for bad in [[0.0], [0.0, 1.0, 0.5], [[0.0, 1.0]]]:
+            with self.assertRaises(ValidationError):
+                qm.RiemannSum(grid=bad)
+
+    def test_user_grid_mp(self):
+        RS = qm.RiemannSum(grid=['0', '0.25', '1'], precision='mp')
+        self.assertEqual(RS.grid[1], mpmath.mpf('0.25'))
+        value = RS.integrate(f=sp.exp(2*sp.Symbol('t')))
+        self.assertTrue(isinstance(value, mpmath.mpf), msg='Expect mpf')
+        self.assertAlmostEqual(float(value), (np.exp(2) - 1)/2, delta=0.5)
+
 
 # --------------------------
 class GaussLegendreLaguerreTesting(unittest.TestCase):
@@ -373,3 +426,440 @@ class GaussRiemannSumTesting(unittest.TestCase):
         Q = qm.GaussLegendreRiemannSum(lower=0.0, upper=1.0)
         a = Q.integrate(f=self.f)
         self.assertTrue(isinstance(a, float), msg='Expect float')
+
+
+# --------------------------
+class RebaseTesting(unittest.TestCase):
+
+    @classmethod
+    def f(cls, t):
+        return np.exp(2*t)
+
+    def compare(self, Q, fresh):
+        self.assertTrue(np.allclose(Q.points, fresh.points),
+                        msg='Expect points to match new object')
+        self.assertTrue(np.allclose(Q.weights, fresh.weights),
+                        msg='Expect weights to match new object')
+        self.assertAlmostEqual(Q.integrate(f=self.f),
+                               fresh.integrate(f=self.f))
+
+    def test_gauss_legendre(self):
+        Q = qm.GaussLegendre(ndom=4, deg=3, lower=0.0, upper=1.0, alpha=0.3)
+        points = Q.points
+        Q.rebase(lower=0.5, upper=2.0)
+        self.assertTrue(Q.points is points, msg='Expect nodes in place')
+        self.compare(Q, qm.GaussLegendre(ndom=4, deg=3, lower=0.5,
+                                         upper=2.0, alpha=0.3))
+        Q.shift(upper=3.0)
+        self.assertEqual(Q.lower, 1.5, msg='Expect window translated')
+        self.compare(Q, qm.GaussLegendre(ndom=4, deg=3, lower=1.5,
+                                         upper=3.0, alpha=0.3))
+
+    def test_riemann_sum(self):
+        Q = qm.RiemannSum(n=20, lower=0.0, upper=1.0, alpha=0.5)
+        grid = Q.grid
+        Q.rebase(lower=0.0, upper=2.0, alpha=0.2)
+        self.assertTrue(Q.grid is grid, msg='Expect grid in place')
+        self.compare(Q, qm.RiemannSum(n=20, lower=0.0, upper=2.0,
+                                      alpha=0.2))
+        Q.shift(upper=2.5)
+        self.compare(Q, qm.RiemannSum(n=20, lower=0.5, upper=2.5,
+                                      alpha=0.2))
+
+    def test_gauss_laguerre(self):
+        Q = qm.GaussLaguerre(deg=10, lower=0.0, upper=1.0, alpha=0.5,
+                             extend_precision=False)
+        Q.rebase(lower=1.0, upper=3.0)
+        self.compare(Q, qm.GaussLaguerre(deg=10, lower=1.0, upper=3.0,
+                                         alpha=0.5, extend_precision=False))
+
+    def test_hybrids(self):
+        Q = qm.GaussLegendreRiemannSum(lower=0.0, upper=1.0, alpha=0.5)
+        Q.rebase(lower=0.0, upper=2.0)
+        fresh = qm.GaussLegendreRiemannSum(lower=0.0, upper=2.0, alpha=0.5)
+        self.assertEqual(Q.switch_time, fresh.switch_time,
+                         msg='Expect switch time to be recomputed')
+        self.compare(Q.gleg, fresh.gleg)
+        self.compare(Q.rs, fresh.rs)
+        Q = qm.GaussLegendreGaussLaguerre(lower=0.0, upper=1.0, ts=0.8,
+                                          extend_precision=False)
+        Q.shift(upper=2.0)
+        self.assertEqual(Q.glag.lower, 1.8, msg='Expect ts translated')
+
+    def test_weight_cache(self):
+        Q = qm.GaussLegendre(ndom=4, deg=3, lower=0.0, upper=1.0, alpha=0.3)
+        weights = Q.weights
+        Q.rebase(lower=0.0, upper=0.9)
+        self.assertFalse(Q.weights is weights, msg='Expect new target')
+        Q.rebase(lower=0.0, upper=1.0)
+        self.assertTrue(Q.weights is weights,
+                        msg='Expect cached weights for repeated target')
+        for ii in range(2*qm.WEIGHT_CACHE_SIZE):
+            Q.rebase(lower=0.0, upper=2.0 + ii)
+        self.assertEqual(len(Q._weight_cache), qm.WEIGHT_CACHE_SIZE,
+                         msg='Expect cache to be bounded')
+
+    def test_cached_weights_read_only(self):
+        Q = qm.GaussLegendre(ndom=4, deg=3, lower=0.0, upper=1.0, alpha=0.3)
+        a = Q.integrate(f=np.exp)
+        held = Q.weights
+        expected = held.copy()
+        with self.assertRaises(ValueError):
+            Q.weights *= 2
+        # edit a private copy, then round-trip through a rebase
+        Q.weights = 2*Q.weights
+        Q.rebase(lower=0.0, upper=2.0)
+        Q.rebase(lower=0.0, upper=1.0)
+        self.assertEqual(Q.integrate(f=np.exp), a)
+        for ii in range(2*qm.WEIGHT_CACHE_SIZE):
+            Q.rebase(lower=0.0, upper=2.0 + ii)
+        self.assertTrue(np.array_equal(held, expected),
+                        msg='Expect held weights unchanged after eviction')
+
+
+# --------------------------
+class MPPrecisionTesting(unittest.TestCase):
+
+    @classmethod
+    def fsp(cls, t):
+        return sp.exp(2*t)
+
+    @classmethod
+    def f(cls, t):
+        return np.exp(2*t)
+
+    def check_mp(self, Q, Qf):
+        a = Q.integrate(f=self.fsp)
+        self.assertTrue(isinstance(a, mpmath.mpf), msg='Expect mpf')
+        self.assertAlmostEqual(float(a), Qf.integrate(f=self.f), places=8)
+        if hasattr(Q, 'weights'):
+            self.assertEqual(Q.weights.dtype, object,
+                             msg='Expect object array of mpf')
+
+    def test_classes(self):
+        self.check_mp(
+            qm.GaussLegendre(ndom=2, deg=6, alpha=0.5, precision='mp'),
+            qm.GaussLegendre(ndom=2, deg=6, alpha=0.5))
+        self.check_mp(qm.RiemannSum(n=20, alpha=0.5, precision='mp'),
+                      qm.RiemannSum(n=20, alpha=0.5))
+        self.check_mp(
+            qm.GaussLaguerre(deg=8, alpha=0.5, precision='mp'),
+            qm.GaussLaguerre(deg=8, alpha=0.5, extend_precision=False))
+        self.check_mp(
+            qm.GaussLegendreRiemannSum(alpha=0.5, precision='mp'),
+            qm.GaussLegendreRiemannSum(alpha=0.5))
+
+    def test_rebase(self):
+        Q = qm.GaussLegendre(ndom=2, deg=6, alpha=0.5, precision='mp')
+        Q.rebase(lower=1.0, upper=2.0)
+        Qf = qm.GaussLegendre(ndom=2, deg=6, lower=1.0, upper=2.0,
+                              alpha=0.5)
+        self.assertAlmostEqual(float(Q.integrate(f=self.fsp)),
+                               Qf.integrate(f=self.f), places=10)
+
+    def test_rule_cache(self):
+        qm.GaussLegendre(deg=7, precision='mp', n_digits=35)
+        self.assertTrue(('legendre', 7, 35) in qm.MP_RULES,
+                        msg='Expect rule cached')
+
+    def test_legacy_extended(self):
+        Q = qm.GaussLaguerre(deg=8, alpha=0.5)
+        self.assertEqual(Q.precision, 'extended',
+                         msg='Expect extended precision by default')
+        self.assertTrue(isinstance(Q.integrate(f=self.fsp), float),
+                        msg='Expect float')
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError):
+            qm.RiemannSum(precision='double')
+
+
+# --------------------------
+class ValidationTesting(unittest.TestCase):
+
+    def test_update_weights(self):
+        for Q in [qm.GaussLegendre(alpha=0.5), qm.RiemannSum(alpha=0.5)]:
+            with self.assertRaises(ValidationError):
+                Q.update_weights(alpha=1.0)
+            self.assertEqual(Q.alpha, 0.5, msg='Expect stored alpha kept')
+
+    def test_switch_time(self):
+        with self.assertRaises(ValidationError):
+            qm.GaussLegendreRiemannSum(ts=2.0)
+
+    def test_stored_function(self):
+        Q = qm.RiemannSum(alpha=0.5, f=np.exp)
+        self.assertEqual(Q.integrate(), Q.integrate(f=np.exp),
+                         msg='Expect stored function used')
+
+
+# --------------------------
+class VectorIntegrandTesting(unittest.TestCase):
+
+    @classmethod
+    def f(cls, t):
+        return np.exp(np.outer(t, [1.0, 2.0, 3.0]))
+
+    def check_channels(self, Q):
+        a = Q.integrate(f=self.f)
+        self.assertEqual(a.shape, (3,), msg='Expect one value per channel')
+        for k, c in enumerate([1.0, 2.0, 3.0]):
+            self.assertAlmostEqual(
+                a[k], Q.integrate(f=lambda t: np.exp(c*t)), places=12)
+
+    def test_classes(self):
+        self.check_channels(qm.GaussLegendre(ndom=2, deg=4, alpha=0.5))
+        self.check_channels(qm.RiemannSum(n=20, alpha=0.5))
+        self.check_channels(
+            qm.GaussLaguerre(deg=8, alpha=0.5, extend_precision=False))
+        self.check_channels(qm.GaussLegendreRiemannSum(alpha=0.5))
+        self.check_channels(
+            qm.GaussLegendreGaussLaguerre(alpha=0.5, extend_precision=False))
+
+    def test_column_output_is_scalar(self):
+        Q = qm.RiemannSum(n=20, alpha=0.5)
+        a = Q.integrate(f=lambda t: np.exp(t).reshape(-1, 1))
+        self.assertTrue(isinstance(a, float), msg='Expect float')
+
+
+# --------------------------
+class WeightDerivativeTesting(unittest.TestCase):
+
+    def check_derivative(self, make):
+        h = 1e-6
+        exact = make(0.4).weight_derivative()
+        approx = (make(0.4 + h).rule().weights
+                  - make(0.4 - h).rule().weights)/(2*h)
+        self.assertTrue(np.allclose(exact, approx, rtol=1e-7, atol=1e-9))
+
+    def test_classes(self):
+        self.check_derivative(lambda a: qm.GaussLegendre(alpha=a, upper=2.0))
+        self.check_derivative(lambda a: qm.RiemannSum(
+            n=50, alpha=a, upper=2.0, grading=2.0))
+        self.check_derivative(lambda a: qm.GaussLaguerre(
+            deg=8, alpha=a, upper=2.0, extend_precision=False))
+        self.check_derivative(lambda a: qm.GaussLegendreRiemannSum(
+            alpha=a, upper=2.0))
+        self.check_derivative(lambda a: qm.GaussLegendreGaussLaguerre(
+            glag_deg=8, alpha=a, upper=2.0, extend_precision=False))
+
+    def test_composite(self):
+        for Q in [qm.GaussLegendreRiemannSum(nrs=50, upper=2.0),
+                  qm.GaussLegendreGaussLaguerre(
+                      glag_deg=8, upper=2.0, extend_precision=False)]:
+            C = Q.composite()
+            self.check_derivative(lambda a: C.rebase(
+                lower=0.5, upper=2.0, switch_time=1.5, alpha=a))
+            Q.ts = 1.5
+            Q.rebase(lower=0.5, upper=2.0, alpha=0.4)
+            C.update_weights(alpha=0.4)
+            self.assertTrue(np.allclose(C.weight_derivative(),
+                                        Q.weight_derivative(), rtol=1e-12))
+
+    def test_mp_invalid(self):
+        with self.assertRaises(ValidationError):
+            qm.RiemannSum(alpha=0.5, precision='mp').weight_derivative()
+
+
+# --------------------------
+class BatchedParameterTesting(unittest.TestCase):
+
+    @classmethod
+    def f(cls, t, theta):
+        return np.exp(np.outer(theta, t))
+
+    def check_batch(self, Q):
+        theta = np.array([1.0, 2.0, 3.0, 0.5])
+        a = Q.integrate(f=self.f, theta=theta)
+        self.assertEqual(a.shape, (4,), msg='Expect one value per theta')
+        for k, c in enumerate(theta):
+            self.assertAlmostEqual(
+                a[k], Q.integrate(f=lambda t: np.exp(c*t)), places=12)
+
+    def test_classes(self):
+        self.check_batch(qm.GaussLegendre(ndom=2, deg=4, alpha=0.5))
+        self.check_batch(qm.RiemannSum(n=20, alpha=0.5))
+        self.check_batch(
+            qm.GaussLaguerre(deg=8, alpha=0.5, extend_precision=False))
+        self.check_batch(qm.GaussLegendreRiemannSum(alpha=0.5))
+        self.check_batch(
+            qm.GaussLegendreGaussLaguerre(alpha=0.5, extend_precision=False))
+        self.check_batch(qm.RiemannSum(n=20, alpha=0.5).rule())
+
+    def test_chunks(self):
+        theta = np.linspace(0.5, 2.0, 11)
+        calls = []
+
+        def f(t, theta):
+            calls.append(len(theta))
+            return self.f(t, theta)
+        for Q in [qm.GaussLegendre(ndom=2, deg=4, alpha=0.5),
+                  qm.GaussLegendreRiemannSum(alpha=0.5)]:
+            a = Q.integrate(f=self.f, theta=theta)
+            del calls[:]
+            b = Q.integrate(f=f, theta=theta, chunk_size=4)
+            self.assertTrue(np.allclose(a, b, rtol=1e-14, atol=0))
+            self.assertLessEqual(max(calls), 4,
+                                 msg='Expect at most 4 rows per call')
+
+    def test_invalid(self):
+        Q = qm.RiemannSum(n=20, alpha=0.5)
+        with self.assertRaises(ValidationError):
+            Q.integrate(f=lambda t, theta: np.exp(t), theta=[1.0])
+        with self.assertRaises(ValidationError):
+            Q.integrate(f=self.f, theta=[1.0], chunk_size=0)
+        Q = qm.RiemannSum(n=20, alpha=0.5, precision='mp')
+        with self.assertRaises(ValidationError):
+            Q.integrate(f=self.f, theta=[1.0])
+
+
+# --------------------------
+class CompensatedTesting(unittest.TestCase):
+
+    @classmethod
+    def f(cls, t):
+        return np.sin(200*t)
+
+    def check_exact(self, Q):
+        # reference sum of the float products in extended precision
+        a = Q.integrate(f=self.f)
+        rule = Q.rule()
+        feval = self.f(rule.points)
+        with mpmath.workdps(40):
+            ref = mpmath.fdot([mpmath.mpf(w) for w in rule.weights],
+                              [mpmath.mpf(v) for v in feval])
+        self.assertEqual(a, float(ref), msg=Q.description)
+
+    def test_classes(self):
+        kwargs = dict(alpha=0.5, compensated=True)
+        self.check_exact(qm.GaussLegendre(ndom=20, deg=10, **kwargs))
+        self.check_exact(qm.RiemannSum(n=2000, **kwargs))
+        self.check_exact(
+            qm.GaussLaguerre(deg=8, extend_precision=False, **kwargs))
+        self.check_exact(qm.GaussLegendreRiemannSum(nrs=2000, **kwargs))
+        self.check_exact(qm.GaussLegendreGaussLaguerre(
+            glag_deg=8, extend_precision=False, **kwargs))
+
+    def test_options(self):
+        Q = qm.RiemannSum(n=2000, alpha=0.5)
+        rule = Q.rule()
+        a = rule.integrate(f=self.f, compensated=True)
+        Q.compensated = True
+        self.assertEqual(a, Q.integrate(f=self.f))
+        theta = np.array([1.0, 2.0])
+        b = Q.integrate(f=lambda t, theta: np.outer(theta, self.f(t)),
+                        theta=theta, chunk_size=1)
+        self.assertTrue(np.allclose(b, [a, 2*a], rtol=1e-15, atol=0))
+
+
+# --------------------------
+class CompositeRuleTesting(unittest.TestCase):
+
+    @classmethod
+    def f(cls, t):
+        return np.exp(2*t)
+
+    def check_match(self, Q, C):
+        a, b = Q.rule(), C.rule()
+        self.assertTrue(np.allclose(a.points, b.points, rtol=1e-14, atol=0))
+        self.assertTrue(np.allclose(a.weights, b.weights, rtol=1e-12,
+                                    atol=0), msg=Q.description)
+        self.assertAlmostEqual(C.integrate(f=self.f), Q.integrate(f=self.f),
+                               places=10)
+
+    def test_hybrids(self):
+        for Q in [qm.GaussLegendreRiemannSum(nrs=50, percent=0.95,
+                                             alpha=0.9),
+                  qm.GaussLegendreGaussLaguerre(
+                      glag_deg=8, alpha=0.5, extend_precision=False)]:
+            C = Q.composite()
+            self.check_match(Q, C)
+            Q.rebase(lower=0.5, upper=3.0, alpha=0.3)
+            C.rebase(lower=0.5, upper=3.0, alpha=0.3)
+            self.check_match(Q, C)
+            Q.ts = 2.0
+            Q.rebase(lower=0.5, upper=3.0)
+            C.rebase(lower=0.5, upper=3.0, switch_time=2.0)
+            self.assertEqual(C.switch_time, 2.0)
+            self.check_match(Q, C)
+            self.check_match(Q.shift(4.0), C.shift(4.0))
+
+    def test_rescaled_weights(self):
+        C = qm.GaussLegendreRiemannSum(nrs=20, alpha=0.5).composite()
+        unit = C.weights.copy()
+        C.rebase(lower=0.0, upper=4.0)
+        self.assertEqual(len(C._weight_cache), 1,
+                         msg='Expect unit rule reused at same fraction')
+        self.assertTrue(np.allclose(C.weights, 2*unit, rtol=1e-14, atol=0))
+        self.assertEqual(C.switch_time, 3.6)
+        C.update_weights(alpha=0.2)
+        self.assertEqual(len(C._singular_cache), 2)
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError):
+            qm.CompositeRule(qm.RiemannSum())
+        with self.assertRaises(ValidationError):
+            qm.GaussLegendreGaussLaguerre().composite()
+        C = qm.GaussLegendreRiemannSum().composite()
+        with self.assertRaises(ValidationError):
+            C.rebase(lower=0.0, upper=1.0, switch_time=2.0)
+
+
+# --------------------------
+class QuadratureRuleTesting(unittest.TestCase):
+
+    @classmethod
+    def f(cls, t):
+        return np.exp(2*t)
+
+    def test_rule(self):
+        for Q in [qm.GaussLegendre(alpha=0.5), qm.RiemannSum(alpha=0.5),
+                  qm.GaussLaguerre(alpha=0.5, extend_precision=False),
+                  qm.GaussLegendreRiemannSum(alpha=0.5),
+                  qm.GaussLegendreGaussLaguerre(alpha=0.5,
+                                                extend_precision=False)]:
+            rule = Q.rule()
+            self.assertAlmostEqual(rule.integrate(self.f),
+                                   Q.integrate(self.f), places=12)
+            self.assertFalse(rule.weights.flags.writeable,
+                             msg='Expect read-only weights')
+            self.assertFalse(hasattr(rule, '__dict__'),
+                             msg='Expect slots only')
+            with self.assertRaises(AttributeError):
+                rule.alpha = 0.1
+
+    def test_shared_arrays(self):
+        Q1 = qm.GaussLegendre(ndom=3, deg=4, alpha=0.2)
+        Q2 = qm.GaussLegendre(ndom=3, deg=4, alpha=0.7, upper=2.0)
+        self.assertTrue(Q1._unit_points is Q2._unit_points,
+                        msg='Expect base points shared across objects')
+        self.assertFalse(Q1._unit_points.flags.writeable,
+                         msg='Expect read-only base points')
+        r1 = Q1.rule()
+        r2 = Q1.update_weights(alpha=0.4) or Q1.rule()
+        self.assertTrue(r1.points is r2.points,
+                        msg='Expect points shared at same limits')
+        self.assertNotEqual(r1.weights[0], r2.weights[0],
+                            msg='Expect weights of each alpha')
+
+    def test_rule_pickle(self):
+        rule = qm.RiemannSum(n=10, alpha=0.5).rule()
+        copy = pickle.loads(pickle.dumps(rule))
+        self.assertEqual(copy.integrate(self.f), rule.integrate(self.f),
+                         msg='Expect identical rule')
+
+    def test_update_weights_out(self):
+        Q = qm.GaussLegendre(ndom=2, deg=3, alpha=0.3)
+        out = np.empty(6)
+        Q.update_weights(alpha=0.6, out=out)
+        self.assertTrue(Q.weights is out, msg='Expect weights in out')
+        ref = qm.GaussLegendre(ndom=2, deg=3, alpha=0.6)
+        self.assertTrue(np.allclose(out, ref.weights),
+                        msg='Expect weights of new alpha')
+        with self.assertRaises(ValidationError):
+            Q.update_weights(out=np.empty(5))
+        H = qm.GaussLegendreRiemannSum(ndom=2, deg=3, nrs=5, alpha=0.3)
+        out = np.empty(10)
+        H.update_weights(alpha=0.6, out=out)
+        self.assertTrue(np.shares_memory(H.rs.weights, out),
+                        msg='Expect sub-quadratures to write into out')
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+import sympy as sp
+from pyfod import quadrature as qm
+from pyfod import serialization as se
+from pyfod.utilities import ValidationError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+t = sp.Symbol('t')
+FSP = sp.exp(2*t)
+
+
+def f(t):
+    return np.exp(2*t)
+
+
+class SaveLoadTesting(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'rule.npz')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def roundtrip(self, Q):
+        Q.save(self.path)
+        return type(Q).load(self.path)
+
+    def test_classes(self):
+        for Q in [qm.GaussLegendre(ndom=3, deg=4, alpha=0.3, upper=2.0),
+                  qm.GaussLaguerre(deg=6, alpha=0.3, extend_precision=False),
+                  qm.RiemannSum(n=12, alpha=0.3, singularity=1.5),
+                  qm.RiemannSum(n=12, alpha=0.3, grading=2.5),
+                  qm.RiemannSum(grid=[0.0, 0.3, 0.9, 1.0], alpha=0.3),
+                  qm.GaussLegendreRiemannSum(alpha=0.3, ts=0.5),
+                  qm.GaussLegendreGaussLaguerre(alpha=0.3,
+                                                extend_precision=False),
+                  qm.GaussLegendre(alpha=0.4).rule()]:
+            Q2 = self.roundtrip(Q)
+            self.assertEqual(type(Q2), type(Q), msg='Expect same class')
+            self.assertEqual(Q2.integrate(f), Q.integrate(f),
+                             msg='Expect identical result')
+
+    def test_extended_precision(self):
+        for Q in [qm.GaussLaguerre(deg=8, alpha=0.5, n_digits=40),
+                  qm.RiemannSum(n=10, alpha=0.5, precision='mp'),
+                  qm.RiemannSum(grid=['0', '0.1', '1'], alpha=0.5,
+                                precision='mp')]:
+            Q2 = self.roundtrip(Q)
+            self.assertEqual(list(Q2.weights), list(Q.weights),
+                             msg='Expect exact weights')
+            self.assertEqual(Q2.integrate(FSP), Q.integrate(FSP),
+                             msg='Expect exact values')
+
+    def test_load_skips_rule_generation(self):
+        qm.GaussLegendre(deg=7, precision='mp', n_digits=41).save(self.path)
+        qm.UNIT_RULES.clear()
+        qm.MP_RULES.clear()
+        qm.GaussLegendre.load(self.path)
+        self.assertFalse(('legendre', 7, 41) in qm.MP_RULES,
+                         msg='Expect base rule taken from file')
+
+    def test_evicted_unit_rule(self):
+        # the object keeps its base arrays after the shared cache drops them
+        for Q in [qm.GaussLegendreRiemannSum(alpha=0.3),
+                  qm.GaussLaguerre(deg=6, alpha=0.3, extend_precision=False)]:
+            qm.UNIT_RULES.clear()
+            self.assertEqual(self.roundtrip(Q).integrate(f), Q.integrate(f))
+
+    def test_invalid(self):
+        qm.RiemannSum().save(self.path)
+        with self.assertRaises(ValidationError):
+            qm.GaussLegendre.load(self.path)
+        with np.load(self.path) as data:
+            arrays = dict(data)
+        meta = json.loads(str(arrays['meta']))
+        meta['format_version'] = se.FORMAT_VERSION + 1
+        arrays['meta'] = np.array(json.dumps(meta))
+        np.savez(self.path, **arrays)
+        with self.assertRaises(ValidationError):
+            se.load(self.path)
+
+
+class SharedMemoryTesting(unittest.TestCase):
+
+    def test_attach_shared(self):
+        Q = qm.GaussLegendreRiemannSum(alpha=0.3)
+        shm = se.share(Q)
+        try:
+            rule = se.attach_shared(shm.name)
+            self.assertEqual(rule.integrate(f), Q.integrate(f),
+                             msg='Expect same rule')
+            self.assertFalse(rule.weights.flags.writeable,
+                             msg='Expect read-only view')
+            del rule
+            se.detach_shared(shm.name)
+            script = str('import numpy as np\n'
+                         'from pyfod import serialization as se\n'
+                         'print(repr(se.attach_shared({!r}).integrate('
+                         'np.exp)))'.format(shm.name))
+            out = subprocess.run([sys.executable, '-c', script], cwd=ROOT,
+                                 capture_output=True, text=True, check=True)
+            self.assertEqual(float(out.stdout), Q.integrate(np.exp),
+                             msg='Expect rule mapped by other process')
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_mp_rule(self):
+        with self.assertRaises(ValidationError):
+            se.share(qm.RiemannSum(precision='mp'))
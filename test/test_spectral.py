@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import math
+import unittest
+import numpy as np
+from pyfod import spectral
+from pyfod.spectral import SpectralDerivative
+from pyfod.utilities import ValidationError
+
+
+def fexp(t):
+    return np.exp(2*t)
+
+
+def caputo_exp(alpha, t):
+    # termwise Caputo derivative of the Taylor series of exp(2t)
+    return sum(2**k*t**(k - alpha)/math.gamma(k + 1 - alpha)
+               for k in range(1, 60))
+
+
+class SpectralDerivativeTesting(unittest.TestCase):
+
+    def test_polynomial_exact(self):
+        SD = SpectralDerivative(degree=8)
+        for alpha in [0.0, 0.3, 0.9, 1.5]:
+            out = SD.derivative(lambda t: t**2, alpha)
+            self.assertAlmostEqual(out['fd'], 2/math.gamma(3 - alpha),
+                                   places=10, msg=str(alpha))
+            self.assertTrue(isinstance(out['fd'], float))
+
+    def test_exponential_convergence(self):
+        exact = caputo_exp(0.5, 1.0)
+        errors = [abs(SpectralDerivative(degree=deg).derivative(
+            fexp, 0.5)['fd'] - exact) for deg in [4, 8, 16]]
+        self.assertLess(errors[1], errors[0]*1e-3)
+        self.assertLess(errors[2], 1e-12)
+        SD = SpectralDerivative(degree=16, basis='legendre')
+        self.assertAlmostEqual(SD.derivative(fexp, 0.5)['fd'], exact,
+                               places=10)
+
+    def test_riemannliouville(self):
+        SD = SpectralDerivative(lower=0.0, upper=2.0, degree=24)
+        targets = np.array([0.5, 1.0, 2.0])
+        out = SD.derivative(fexp, 0.5, targets=targets,
+                            definition='riemannliouville')
+        # RL adds f(0) t^(-alpha)/Gamma(1-alpha) to Caputo
+        exact = [caputo_exp(0.5, t) + t**-0.5/math.gamma(0.5)
+                 for t in targets]
+        self.assertTrue(np.allclose(out['fd'], exact, rtol=1e-11),
+                        msg='Expect one derivative per target')
+
+    def test_matrix_cache(self):
+        spectral.MATRICES.clear()
+        a = SpectralDerivative(lower=0.0, upper=1.0, degree=10)
+        b = SpectralDerivative(lower=1.0, upper=3.0, degree=10)
+        ma = a.matrix(0.4, [0.5, 1.0])
+        mb = b.matrix(0.4, [2.0, 3.0])
+        self.assertEqual(len(spectral.MATRICES), 1,
+                         msg='Expect matrix shared by scaled intervals')
+        self.assertTrue(np.allclose(mb, ma*2**-0.4))
+
+    def test_values_and_vector(self):
+        SD = SpectralDerivative(degree=12)
+        values = np.column_stack((fexp(SD.nodes), SD.nodes))
+        out = SD.derivative(values, 0.5, targets=[0.5, 1.0])
+        self.assertEqual(out['fd'].shape, (2, 2))
+        self.assertAlmostEqual(out['fd'][1, 1], 1/math.gamma(1.5))
+        with self.assertRaises(ValidationError):
+            SD.derivative(values[:-1], 0.5)
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError):
+            SpectralDerivative(basis='hermite')
+        with self.assertRaises(ValidationError):
+            SpectralDerivative(lower=1.0, upper=0.0)
+        SD = SpectralDerivative()
+        with self.assertRaises(ValidationError):
+            SD.matrix(-0.5, 1.0)
+        with self.assertRaises(ValidationError):
+            SD.matrix(0.5, 1.0, definition='hello')
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import unittest
+import numpy as np
+import sympy as sp
+import mpmath
+from pyfod import symbolic as sy
+from pyfod.utilities import ValidationError
+from pyfod import quadrature as qm
+
+
+def fnp(t):
+    return np.exp(2*t)
+
+
+def fsp(t):
+    return sp.exp(2*t)
+
+
+# --------------------------
+class SymbolicForm(unittest.TestCase):
+
+    def test_forms(self):
+        x = sp.Symbol('x')
+        self.assertTrue(isinstance(sy.symbolic_form(fsp), sp.Expr),
+                        msg='Expect sympy expression')
+        self.assertTrue(isinstance(sy.symbolic_form(sp.exp(x)), sp.Expr),
+                        msg='Expect sympy expression')
+        self.assertEqual(sy.symbolic_form(sp.Integer(2)), 2,
+                         msg='Expect constant expression')
+        self.assertEqual(sy.symbolic_form(sp.Symbol('y')*x), None,
+                         msg='Expect None for two free symbols')
+        self.assertEqual(sy.symbolic_form(lambda t: 1.0 if t > 0 else 0),
+                         None, msg='Expect None for numerical function')
+        self.assertEqual(sy.symbolic_form(2.0), None,
+                         msg='Expect None for non-callable')
+
+
+# --------------------------
+class CompileIntegrand(unittest.TestCase):
+
+    def test_numpy_backend(self):
+        func = sy.compile_integrand(fsp)
+        t = np.linspace(0, 1, 5)
+        self.assertTrue(np.allclose(func(t), fnp(t)),
+                        msg='Expect compiled function to match')
+        self.assertTrue(sy.compile_integrand(fsp) is func,
+                        msg='Expect cached callable')
+        const = sy.compile_integrand(lambda t: 0*t + 3)
+        self.assertEqual(const(t).shape, t.shape,
+                         msg='Expect constant broadcast to nodes')
+
+    def test_mpmath_backend(self):
+        func = sy.compile_integrand(fsp, backend='mpmath')
+        self.assertTrue(isinstance(func(mpmath.mpf(1)), mpmath.mpf),
+                        msg='Expect mpf output')
+
+    def test_not_symbolic(self):
+        self.assertTrue(sy.compile_integrand(fnp) is fnp,
+                        msg='Expect function handle returned')
+        self.assertEqual(sy.compile_integrand(None), None,
+                         msg='Expect non-callable returned')
+
+    def test_derivative(self):
+        dfunc = sy.compile_derivative(fsp)
+        self.assertTrue(np.allclose(dfunc(np.array([0.5])), 2*fnp(0.5)),
+                        msg='Expect derivative of exp(2t)')
+        with self.assertRaises(ValidationError):
+            sy.compile_derivative(fnp)
+
+    def test_as_function(self):
+        t = sp.Symbol('t')
+        func = sy.as_function(sp.exp(2*t), order=1)
+        self.assertTrue(np.allclose(func(np.array([0.5])), 2*fnp(0.5)),
+                        msg='Expect numpy evaluation of derivative')
+        self.assertEqual(func(mpmath.mpf('0.5')), 2*mpmath.exp(1),
+                         msg='Expect symbolic evaluation of mpf')
+        with self.assertRaises(ValidationError):
+            sy.as_function(fnp)
+
+    def test_closure_state(self):
+        # handles are traced on every call, expressions are cached
+        scale = [1]
+
+        def f(t):
+            return scale[0]*t
+        Q = qm.GaussLegendre(precision='mp')
+        self.assertAlmostEqual(float(Q.integrate(f=f)), 0.5)
+        dfunc = sy.compile_derivative(lambda t: scale[0]*t**2)
+        scale[0] = 3
+        self.assertAlmostEqual(float(Q.integrate(f=f)), 1.5)
+        self.assertAlmostEqual(
+            float(sy.compile_derivative(lambda t: scale[0]*t**2)(1.0)),
+            3*float(dfunc(1.0)))
+
+    def test_quadrature(self):
+        t = sp.Symbol('t')
+        Q = qm.GaussLegendre(alpha=0.5)
+        self.assertAlmostEqual(Q.integrate(f=sp.exp(2*t)),
+                               Q.integrate(f=fnp),
+                               msg='Expect expression compiled to numpy')
+        Q = qm.GaussLaguerre(alpha=0.5)
+        self.assertAlmostEqual(Q.integrate(f=fsp),
+                               Q.integrate(f=lambda s: sp.exp(2*s)
+                                           if s > -1 else 0),
+                               msg='Expect compiled and node-by-node match')
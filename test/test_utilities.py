@@ -7,6 +7,7 @@ Created on Fri Jul 19 10:14:07 2018
 """
 
 import unittest
+import numpy as np
 from pyfod import utilities as ut
 
 
@@ -17,7 +18,7 @@ def f(t):
 class Utilities(unittest.TestCase):
 
     def test_check_alpha(self):
-        with self.assertRaises(SystemExit):
+        with self.assertRaises(ut.ValidationError):
             ut.check_alpha(alpha=1.0)
         self.assertEqual(ut.check_alpha(alpha=0.5), None, msg='Expect None')
 
@@ -35,15 +36,65 @@ class Utilities(unittest.TestCase):
         self.assertTrue(isinstance(a, int), msg='Expect int')
 
     def test_check_values(self):
-        with self.assertRaises(SystemExit):
+        with self.assertRaises(ut.MissingValueError):
             ut.check_value(None, None)
         a = ut.check_value(value=f, default_value=None)
         self.assertEqual(a, f, msg='Expect user defined return')
         a = ut.check_value(value=None, default_value=f)
         self.assertEqual(a, f, msg='Expect default return')
 
+    def test_check_precision(self):
+        with self.assertRaises(ut.ValidationError):
+            ut.check_precision('double')
+        self.assertEqual(ut.check_precision('mp'), 'mp', msg='Expect mp')
+
     def test_check_range(self):
-        with self.assertRaises(SystemExit):
+        with self.assertRaises(ut.ValidationError):
             ut.check_range(0., 1., 2.)
         a = ut.check_range(0., 1., 0.5)
         self.assertEqual(a, 0.5, msg='Expect default return')
+
+
+class LRUCacheTesting(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = ut.LRUCache(maxsize=2)
+        self.assertEqual(cache.put('a', 1), None, msg='Expect no eviction')
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1, msg='Expect stored value')
+        self.assertEqual(cache.put('c', 3), 2,
+                         msg='Expect least recently used evicted')
+        self.assertFalse('b' in cache, msg='Expect b evicted')
+        self.assertEqual(cache.get('b', 'none'), 'none',
+                         msg='Expect default')
+        self.assertEqual((cache.hits, cache.misses), (1, 1),
+                         msg='Expect statistics updated')
+        self.assertTrue(cache.full(), msg='Expect full cache')
+        self.assertEqual(cache.pop_oldest(), 1, msg='Expect a removed')
+        cache.clear()
+        self.assertEqual(len(cache), 0, msg='Expect empty cache')
+
+
+class FFTConvolveTesting(unittest.TestCase):
+
+    def test_fft_convolve(self):
+        kernel = np.array([1.0, 0.5, 0.25])
+        signal = np.arange(5.0)
+        self.assertTrue(np.allclose(ut.fft_convolve(kernel, signal),
+                                    np.convolve(kernel, signal)),
+                        msg='Expect linear convolution')
+        out = ut.fft_convolve(kernel, np.stack((signal, 2*signal), axis=1))
+        self.assertEqual(out.shape, (7, 2), msg='Expect (n + m - 1, k)')
+        self.assertTrue(np.allclose(out[:, 1], 2*np.convolve(kernel, signal)),
+                        msg='Expect channels convolved independently')
+
+
+class ExceptionTesting(unittest.TestCase):
+
+    def test_hierarchy(self):
+        self.assertTrue(issubclass(ut.ValidationError, ut.PyfodError),
+                        msg='Expect pyfod error')
+        self.assertTrue(issubclass(ut.ValidationError, ValueError),
+                        msg='Expect ValueError for existing handlers')
+        self.assertTrue(issubclass(ut.MissingValueError, ut.ValidationError),
+                        msg='Expect validation error')